@@ -0,0 +1,22 @@
+"""v10 doctor updated_at
+
+Revision ID: v10_doctor_updated_at
+Revises: v9_patient_doctor_indexes
+Create Date: 2026-10-19 00:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = 'v10_doctor_updated_at'
+down_revision = 'v9_patient_doctor_indexes'
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    # Patient ETags include the update time of the doctors they embed
+    op.add_column('doctors', sa.Column('updated_at', sa.DateTime(), nullable=True))
+
+def downgrade():
+    op.drop_column('doctors', 'updated_at')
@@ -0,0 +1,28 @@
+"""v11 pending clinical records index
+
+Revision ID: v11_pending_records_index
+Revises: v10_doctor_updated_at
+Create Date: 2026-10-19 00:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = 'v11_pending_records_index'
+down_revision = 'v10_doctor_updated_at'
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    # Processing queue depth/age for /metrics without scanning the table
+    op.create_index(
+        'ix_clinical_records_pending',
+        'clinical_records',
+        ['created_at'],
+        unique=False,
+        postgresql_where=sa.text("processing_status = 'pending'")
+    )
+
+def downgrade():
+    op.drop_index('ix_clinical_records_pending', table_name='clinical_records')
@@ -0,0 +1,22 @@
+"""v12 clinical record trace id
+
+Revision ID: v12_record_trace_id
+Revises: v11_pending_records_index
+Create Date: 2026-10-19 00:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = 'v12_record_trace_id'
+down_revision = 'v11_pending_records_index'
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    # Trace of the last processing_status change, to find slow records' spans
+    op.add_column('clinical_records', sa.Column('processing_trace_id', sa.String(length=32), nullable=True))
+
+def downgrade():
+    op.drop_column('clinical_records', 'processing_trace_id')
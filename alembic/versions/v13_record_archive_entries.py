@@ -0,0 +1,35 @@
+"""v13 clinical record archive entries
+
+Revision ID: v13_record_archive_entries
+Revises: v12_record_trace_id
+Create Date: 2026-10-19 00:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = 'v13_record_archive_entries'
+down_revision = 'v12_record_trace_id'
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    # Which archive holds each archived record; archive id ranges overlap
+    # when records are back-dated. Archives made before this table have no
+    # entries and are still found by their id range.
+    op.create_table(
+        'clinical_record_archive_entries',
+        sa.Column('record_id', sa.Integer(), nullable=False),
+        sa.Column('archive_id', sa.Integer(), sa.ForeignKey('clinical_record_archives.id'), nullable=False),
+        sa.PrimaryKeyConstraint('record_id')
+    )
+    op.create_index(
+        op.f('ix_clinical_record_archive_entries_archive_id'),
+        'clinical_record_archive_entries',
+        ['archive_id'],
+        unique=False
+    )
+
+def downgrade():
+    op.drop_table('clinical_record_archive_entries')
@@ -0,0 +1,26 @@
+"""v14 clinical record archive entry chunks
+
+Revision ID: v14_archive_entry_chunks
+Revises: v13_record_archive_entries
+Create Date: 2026-10-19 00:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = 'v14_archive_entry_chunks'
+down_revision = 'v13_record_archive_entries'
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    # Byte range of the gzip member holding each archived record, so reads
+    # decompress one chunk instead of the file. Null for existing archives,
+    # which are still read by scanning.
+    op.add_column('clinical_record_archive_entries', sa.Column('chunk_offset', sa.BigInteger(), nullable=True))
+    op.add_column('clinical_record_archive_entries', sa.Column('chunk_length', sa.Integer(), nullable=True))
+
+def downgrade():
+    op.drop_column('clinical_record_archive_entries', 'chunk_length')
+    op.drop_column('clinical_record_archive_entries', 'chunk_offset')
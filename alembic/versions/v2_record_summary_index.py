@@ -0,0 +1,27 @@
+"""v2 clinical record summary index
+
+Revision ID: v2_record_summary_index
+Revises: v1_initial_schema
+Create Date: 2026-10-19 00:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = 'v2_record_summary_index'
+down_revision = 'v1_initial_schema'
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    # Backs the record_count / last_record_at summary subqueries
+    op.create_index(
+        'ix_clinical_records_patient_recorded',
+        'clinical_records',
+        ['patient_id', 'recorded_at'],
+        unique=False
+    )
+
+def downgrade():
+    op.drop_index('ix_clinical_records_patient_recorded', table_name='clinical_records')
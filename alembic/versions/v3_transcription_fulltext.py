@@ -0,0 +1,30 @@
+"""v3 transcription full-text search
+
+Revision ID: v3_transcription_fulltext
+Revises: v2_record_summary_index
+Create Date: 2026-10-19 00:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = 'v3_transcription_fulltext'
+down_revision = 'v2_record_summary_index'
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    # Generated column keeps the tsvector current on every insert and update
+    op.execute(
+        "ALTER TABLE clinical_records ADD COLUMN search_vector tsvector "
+        "GENERATED ALWAYS AS (to_tsvector('english', coalesce(transcription, ''))) STORED"
+    )
+    op.execute(
+        "CREATE INDEX ix_clinical_records_search_vector "
+        "ON clinical_records USING gin (search_vector)"
+    )
+
+def downgrade():
+    op.drop_index('ix_clinical_records_search_vector', table_name='clinical_records')
+    op.drop_column('clinical_records', 'search_vector')
@@ -0,0 +1,29 @@
+"""v4 patient name trigram index
+
+Revision ID: v4_patient_name_trigram
+Revises: v3_transcription_fulltext
+Create Date: 2026-10-19 00:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = 'v4_patient_name_trigram'
+down_revision = 'v3_transcription_fulltext'
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    op.create_index(
+        'ix_patients_name_trgm',
+        'patients',
+        ['name'],
+        unique=False,
+        postgresql_using='gin',
+        postgresql_ops={'name': 'gin_trgm_ops'}
+    )
+
+def downgrade():
+    op.drop_index('ix_patients_name_trgm', table_name='patients')
@@ -0,0 +1,55 @@
+"""v5 jsonb cohort indexes
+
+Revision ID: v5_jsonb_cohort_indexes
+Revises: v4_patient_name_trigram
+Create Date: 2026-10-19 00:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision = 'v5_jsonb_cohort_indexes'
+down_revision = 'v4_patient_name_trigram'
+branch_labels = None
+depends_on = None
+
+JSONB_COLUMNS = [
+    ('patients', 'risk_factors', 'ix_patients_risk_factors'),
+    ('clinical_records', 'extracted_data', 'ix_clinical_records_extracted_data'),
+]
+
+def upgrade():
+    inspector = sa.inspect(op.get_bind())
+    for table, column, index_name in JSONB_COLUMNS:
+        # Databases created from models (rather than v1) may still hold plain json
+        current_type = next(
+            c['type'] for c in inspector.get_columns(table) if c['name'] == column
+        )
+        if not isinstance(current_type, postgresql.JSONB):
+            op.alter_column(
+                table,
+                column,
+                type_=postgresql.JSONB,
+                postgresql_using=f'{column}::jsonb'
+            )
+        op.create_index(
+            index_name,
+            table,
+            [column],
+            unique=False,
+            postgresql_using='gin',
+            postgresql_ops={column: 'jsonb_path_ops'}
+        )
+
+def downgrade():
+    for table, column, index_name in JSONB_COLUMNS:
+        op.drop_index(index_name, table_name=table)
+        # Back to the plain json the v4 models map
+        op.alter_column(
+            table,
+            column,
+            type_=sa.JSON,
+            postgresql_using=f'{column}::json'
+        )
@@ -0,0 +1,74 @@
+"""v6 observations
+
+Revision ID: v6_observations
+Revises: v5_jsonb_cohort_indexes
+Create Date: 2026-10-19 00:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = 'v6_observations'
+down_revision = 'v5_jsonb_cohort_indexes'
+branch_labels = None
+depends_on = None
+
+# Same as app.crud.observation._NUMBER_PATTERN
+NUMBER_PATTERN = r'-?[0-9]+(?:\.[0-9]+)?'
+
+def upgrade():
+    op.create_table(
+        'observations',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('patient_id', sa.Integer(), sa.ForeignKey('patients.id'), nullable=False),
+        sa.Column('clinical_record_id', sa.Integer(), sa.ForeignKey('clinical_records.id')),
+        sa.Column('code', sa.String(50), nullable=False),
+        sa.Column('value_num', sa.Float()),
+        sa.Column('value_text', sa.String()),
+        sa.Column('unit', sa.String(20)),
+        sa.Column('recorded_at', sa.DateTime(), server_default=sa.text('now()'), nullable=False),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_observations_id'), 'observations', ['id'], unique=False)
+    op.create_index(
+        'ix_observations_patient_code_recorded',
+        'observations',
+        ['patient_id', 'code', 'recorded_at'],
+        unique=False
+    )
+
+    # Backfill from records extracted before this table existed, with the
+    # codes and number parsing of app.crud.observation (first number in the value)
+    op.execute(f"""
+        INSERT INTO observations (patient_id, clinical_record_id, code, value_num, unit, recorded_at)
+        SELECT cr.patient_id, cr.id, v.code, v.value::float, v.unit, coalesce(cr.recorded_at, cr.created_at)
+        FROM clinical_records cr
+        CROSS JOIN LATERAL (SELECT
+            cr.extracted_data->'vital_signs' AS vs,
+            substring(split_part(cr.extracted_data->'vital_signs'->>'blood_pressure', '/', 1) FROM '{NUMBER_PATTERN}') AS systolic,
+            substring(split_part(cr.extracted_data->'vital_signs'->>'blood_pressure', '/', 2) FROM '{NUMBER_PATTERN}') AS diastolic
+        ) AS p
+        CROSS JOIN LATERAL (VALUES
+            ('bp_systolic', CASE WHEN p.diastolic IS NOT NULL THEN p.systolic END, 'mmHg'),
+            ('bp_diastolic', CASE WHEN p.systolic IS NOT NULL THEN p.diastolic END, 'mmHg'),
+            ('heart_rate', substring(p.vs->>'heart_rate' FROM '{NUMBER_PATTERN}'), 'bpm'),
+            ('temperature', substring(p.vs->>'temperature' FROM '{NUMBER_PATTERN}'), NULL),
+            ('respiratory_rate', substring(p.vs->>'respiratory_rate' FROM '{NUMBER_PATTERN}'), 'breaths/min'),
+            ('oxygen_saturation', substring(p.vs->>'oxygen_saturation' FROM '{NUMBER_PATTERN}'), '%')
+        ) AS v(code, value, unit)
+        WHERE cr.patient_id IS NOT NULL AND v.value IS NOT NULL
+    """)
+    op.execute("""
+        INSERT INTO observations (patient_id, clinical_record_id, code, value_text, recorded_at)
+        SELECT cr.patient_id, cr.id, 'medication', m.value, coalesce(cr.recorded_at, cr.created_at)
+        FROM clinical_records cr
+        CROSS JOIN LATERAL jsonb_array_elements_text(
+            CASE WHEN jsonb_typeof(cr.extracted_data->'medications') = 'array'
+                 THEN cr.extracted_data->'medications' ELSE '[]'::jsonb END
+        ) AS m(value)
+        WHERE cr.patient_id IS NOT NULL
+    """)
+
+def downgrade():
+    op.drop_table('observations')
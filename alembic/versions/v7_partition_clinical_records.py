@@ -0,0 +1,177 @@
+"""v7 partition clinical_records by recorded_at
+
+Revision ID: v7_partition_clinical_records
+Revises: v6_observations
+Create Date: 2026-10-19 00:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = 'v7_partition_clinical_records'
+down_revision = 'v6_observations'
+branch_labels = None
+depends_on = None
+
+CLINICAL_RECORD_COLUMNS = (
+    "id, patient_id, recorded_at, created_by_id, audio_file_path, transcription, "
+    "extracted_data, is_processed, processing_status, created_at, updated_at"
+)
+
+def _create_indexes():
+    op.execute("CREATE INDEX ix_clinical_records_id ON clinical_records (id)")
+    op.execute(
+        "CREATE INDEX ix_clinical_records_patient_recorded "
+        "ON clinical_records (patient_id, recorded_at)"
+    )
+    op.execute(
+        "CREATE INDEX ix_clinical_records_search_vector "
+        "ON clinical_records USING gin (search_vector)"
+    )
+    op.execute(
+        "CREATE INDEX ix_clinical_records_extracted_data "
+        "ON clinical_records USING gin (extracted_data jsonb_path_ops)"
+    )
+
+def _drop_indexes(table):
+    for index in (
+        'ix_clinical_records_id',
+        'ix_clinical_records_patient_recorded',
+        'ix_clinical_records_search_vector',
+        'ix_clinical_records_extracted_data',
+    ):
+        op.drop_index(index, table_name=table)
+
+def upgrade():
+    # Observations keep the record id but can't reference a partitioned,
+    # partially archived table
+    op.drop_constraint('observations_clinical_record_id_fkey', 'observations', type_='foreignkey')
+    op.create_index(
+        op.f('ix_observations_clinical_record_id'), 'observations', ['clinical_record_id'], unique=False
+    )
+
+    op.rename_table('clinical_records', 'clinical_records_unpartitioned')
+    op.execute(
+        "ALTER TABLE clinical_records_unpartitioned "
+        "RENAME CONSTRAINT clinical_records_pkey TO clinical_records_unpartitioned_pkey"
+    )
+    _drop_indexes('clinical_records_unpartitioned')
+
+    # Same columns (including the id sequence default and the generated
+    # search_vector); the partition key has to be part of the primary key
+    op.execute("""
+        CREATE TABLE clinical_records (
+            LIKE clinical_records_unpartitioned INCLUDING DEFAULTS INCLUDING GENERATED
+        ) PARTITION BY RANGE (recorded_at)
+    """)
+    op.execute("ALTER TABLE clinical_records ALTER COLUMN recorded_at SET NOT NULL")
+    op.execute("ALTER TABLE clinical_records ALTER COLUMN recorded_at SET DEFAULT now()")
+    op.execute("ALTER TABLE clinical_records ADD PRIMARY KEY (id, recorded_at)")
+    op.create_foreign_key(
+        'clinical_records_patient_id_fkey', 'clinical_records', 'patients', ['patient_id'], ['id']
+    )
+    op.create_foreign_key(
+        'clinical_records_created_by_id_fkey', 'clinical_records', 'doctors', ['created_by_id'], ['id']
+    )
+    _create_indexes()
+
+    # Monthly partitions from the oldest record up to a few months ahead;
+    # app.services.record_archive keeps creating them from then on. The default
+    # partition only catches rows outside every monthly range.
+    op.execute("""
+        DO $$
+        DECLARE
+            month_start date;
+            last_month date := date_trunc('month', now() + interval '3 months');
+        BEGIN
+            SELECT date_trunc('month', min(coalesce(recorded_at, created_at)))
+            INTO month_start FROM clinical_records_unpartitioned;
+            month_start := coalesce(month_start, date_trunc('month', now()));
+            WHILE month_start <= last_month LOOP
+                EXECUTE format(
+                    'CREATE TABLE %I PARTITION OF clinical_records FOR VALUES FROM (%L) TO (%L)',
+                    'clinical_records_y' || to_char(month_start, 'YYYY') || 'm' || to_char(month_start, 'MM'),
+                    month_start,
+                    (month_start + interval '1 month')::date
+                );
+                month_start := (month_start + interval '1 month')::date;
+            END LOOP;
+        END $$
+    """)
+    op.execute("CREATE TABLE clinical_records_default PARTITION OF clinical_records DEFAULT")
+
+    op.execute(f"""
+        INSERT INTO clinical_records ({CLINICAL_RECORD_COLUMNS})
+        SELECT id, patient_id, coalesce(recorded_at, created_at, now()), created_by_id,
+            audio_file_path, transcription, extracted_data, is_processed,
+            processing_status, created_at, updated_at
+        FROM clinical_records_unpartitioned
+    """)
+    op.execute("ALTER SEQUENCE clinical_records_id_seq OWNED BY clinical_records.id")
+    op.drop_table('clinical_records_unpartitioned')
+
+    op.create_table(
+        'clinical_record_archives',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('partition_name', sa.String(100), nullable=False),
+        sa.Column('range_start', sa.DateTime(), nullable=False),
+        sa.Column('range_end', sa.DateTime(), nullable=False),
+        sa.Column('min_record_id', sa.Integer()),
+        sa.Column('max_record_id', sa.Integer()),
+        sa.Column('row_count', sa.Integer(), nullable=False),
+        sa.Column('location', sa.String(), nullable=False),
+        sa.Column('archived_at', sa.DateTime(), server_default=sa.text('now()'), nullable=False),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('partition_name')
+    )
+    op.create_index(op.f('ix_clinical_record_archives_id'), 'clinical_record_archives', ['id'], unique=False)
+    op.create_index(
+        op.f('ix_clinical_record_archives_min_record_id'), 'clinical_record_archives', ['min_record_id'], unique=False
+    )
+    op.create_index(
+        op.f('ix_clinical_record_archives_max_record_id'), 'clinical_record_archives', ['max_record_id'], unique=False
+    )
+
+def downgrade():
+    # Archived partitions are not restored; re-import their files first if needed
+    op.drop_table('clinical_record_archives')
+
+    op.rename_table('clinical_records', 'clinical_records_partitioned')
+    op.execute(
+        "ALTER TABLE clinical_records_partitioned "
+        "RENAME CONSTRAINT clinical_records_pkey TO clinical_records_partitioned_pkey"
+    )
+    _drop_indexes('clinical_records_partitioned')
+
+    op.execute("""
+        CREATE TABLE clinical_records (
+            LIKE clinical_records_partitioned INCLUDING DEFAULTS INCLUDING GENERATED
+        )
+    """)
+    op.execute("ALTER TABLE clinical_records ALTER COLUMN recorded_at DROP NOT NULL")
+    op.execute("ALTER TABLE clinical_records ADD PRIMARY KEY (id)")
+    op.create_foreign_key(
+        'clinical_records_patient_id_fkey', 'clinical_records', 'patients', ['patient_id'], ['id']
+    )
+    op.create_foreign_key(
+        'clinical_records_created_by_id_fkey', 'clinical_records', 'doctors', ['created_by_id'], ['id']
+    )
+    op.execute(f"""
+        INSERT INTO clinical_records ({CLINICAL_RECORD_COLUMNS})
+        SELECT {CLINICAL_RECORD_COLUMNS} FROM clinical_records_partitioned
+    """)
+    op.execute("ALTER SEQUENCE clinical_records_id_seq OWNED BY clinical_records.id")
+    op.execute("DROP TABLE clinical_records_partitioned CASCADE")
+    _create_indexes()
+
+    op.execute("""
+        DELETE FROM observations o
+        WHERE o.clinical_record_id IS NOT NULL
+          AND NOT EXISTS (SELECT 1 FROM clinical_records cr WHERE cr.id = o.clinical_record_id)
+    """)
+    op.drop_index(op.f('ix_observations_clinical_record_id'), table_name='observations')
+    op.create_foreign_key(
+        'observations_clinical_record_id_fkey', 'observations', 'clinical_records',
+        ['clinical_record_id'], ['id']
+    )
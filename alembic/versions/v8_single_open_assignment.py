@@ -0,0 +1,56 @@
+"""v8 single open patient assignment
+
+Revision ID: v8_single_open_assignment
+Revises: v7_partition_clinical_records
+Create Date: 2026-10-19 00:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = 'v8_single_open_assignment'
+down_revision = 'v7_partition_clinical_records'
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    # v1 never created patient_assignments; databases set up with
+    # create_all already have it
+    if 'patient_assignments' not in sa.inspect(op.get_bind()).get_table_names():
+        op.create_table(
+            'patient_assignments',
+            sa.Column('id', sa.Integer(), nullable=False),
+            sa.Column('patient_id', sa.Integer(), sa.ForeignKey('patients.id'), nullable=False),
+            sa.Column('resident_id', sa.Integer(), sa.ForeignKey('doctors.id'), nullable=False),
+            sa.Column('assigned_at', sa.DateTime()),
+            sa.Column('ended_at', sa.DateTime()),
+            sa.PrimaryKeyConstraint('id')
+        )
+        op.create_index(op.f('ix_patient_assignments_id'), 'patient_assignments', ['id'], unique=False)
+    else:
+        # Close duplicate open assignments left by concurrent assign calls,
+        # keeping the most recent one
+        op.execute("""
+            UPDATE patient_assignments pa
+            SET ended_at = now()
+            WHERE pa.ended_at IS NULL
+              AND EXISTS (
+                  SELECT 1 FROM patient_assignments newer
+                  WHERE newer.patient_id = pa.patient_id
+                    AND newer.ended_at IS NULL
+                    AND (coalesce(newer.assigned_at, '-infinity'), newer.id)
+                        > (coalesce(pa.assigned_at, '-infinity'), pa.id)
+              )
+        """)
+
+    op.create_index(
+        'uq_patient_assignments_open',
+        'patient_assignments',
+        ['patient_id'],
+        unique=True,
+        postgresql_where=sa.text('ended_at IS NULL')
+    )
+
+def downgrade():
+    op.drop_index('uq_patient_assignments_open', table_name='patient_assignments')
@@ -0,0 +1,24 @@
+"""v9 patient doctor indexes
+
+Revision ID: v9_patient_doctor_indexes
+Revises: v8_single_open_assignment
+Create Date: 2026-10-19 00:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = 'v9_patient_doctor_indexes'
+down_revision = 'v8_single_open_assignment'
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    # Access-scoped patient queries filter on the consultant or the current resident
+    op.create_index(op.f('ix_patients_consultant_id'), 'patients', ['consultant_id'], unique=False)
+    op.create_index(op.f('ix_patients_current_resident_id'), 'patients', ['current_resident_id'], unique=False)
+
+def downgrade():
+    op.drop_index(op.f('ix_patients_current_resident_id'), table_name='patients')
+    op.drop_index(op.f('ix_patients_consultant_id'), table_name='patients')
@@ -1,9 +1,12 @@
 from fastapi import APIRouter
-from app.api.endpoints import auth, doctors, patients, health
+from app.api.endpoints import admin, auth, doctors, patients, health, metrics, records
 
 api_router = APIRouter()
 
 api_router.include_router(health.router, tags=["health"])
+api_router.include_router(metrics.router, tags=["metrics"])
 api_router.include_router(auth.router, prefix="/auth", tags=["authentication"])
 api_router.include_router(doctors.router, prefix="/doctors", tags=["doctors"])
 api_router.include_router(patients.router, prefix="/patients", tags=["patients"])
+api_router.include_router(records.router, prefix="/records", tags=["clinical records"])
+api_router.include_router(admin.router, prefix="/admin", tags=["admin"])
@@ -1,5 +1,7 @@
 from typing import Generator, Optional
-from fastapi import Depends, HTTPException, status
+import hmac
+import ipaddress
+from fastapi import Depends, HTTPException, Request, status
 from fastapi.security import OAuth2PasswordBearer
 from jose import jwt
 from pydantic import ValidationError
@@ -7,9 +9,9 @@ from sqlalchemy.orm import Session
 
 from app.core import security
 from app.core.config import settings
-from app.db.database import SessionLocal
+from app.db.database import SessionLocal, replica_router
 from app.models.doctor import Doctor
-from app.crud.doctor import get_doctor
+from app.crud.doctor import get_doctor_cached
 
 reusable_oauth2 = OAuth2PasswordBearer(
     tokenUrl=f"{settings.API_V1_STR}/auth/token"
@@ -22,25 +24,101 @@ def get_db() -> Generator:
     finally:
         db.close()
 
-def get_current_doctor(
-    db: Session = Depends(get_db),
-    token: str = Depends(reusable_oauth2)
-) -> Doctor:
+def decode_token(token: str) -> security.TokenPayload:
     try:
         payload = jwt.decode(
             token, settings.SECRET_KEY, algorithms=[security.ALGORITHM]
         )
-        token_data = security.TokenPayload(**payload)
+        return security.TokenPayload(**payload)
     except (jwt.JWTError, ValidationError):
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Could not validate credentials",
         )
+
+def get_current_doctor(
+    db: Session = Depends(get_db),
+    token: str = Depends(reusable_oauth2)
+) -> Doctor:
+    token_data = decode_token(token)
     
-    doctor = get_doctor(db, doctor_id=token_data.sub)
+    doctor = get_doctor_cached(db, doctor_id=token_data.sub)
     if not doctor:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Doctor not found"
         )
+    # Lets commits on this session mark the doctor for read-your-writes
+    db.info["doctor_id"] = doctor.id
     return doctor
+
+def get_read_db(
+    db: Session = Depends(get_db),
+    current_doctor: Doctor = Depends(get_current_doctor)
+) -> Generator:
+    """
+    Session for read-only endpoints: a replica when one is healthy and the
+    doctor has no recent write, otherwise the request's primary session.
+    """
+    read_engine = replica_router.get_read_engine(current_doctor.id)
+    if read_engine is None:
+        yield db
+        return
+
+    read_db = SessionLocal(bind=read_engine)
+    try:
+        yield read_db
+    finally:
+        read_db.close()
+
+def is_admin(doctor: Doctor) -> bool:
+    return doctor.email in settings.ADMIN_EMAILS
+
+def get_current_admin(
+    current_doctor: Doctor = Depends(get_current_doctor)
+) -> Doctor:
+    if not is_admin(current_doctor):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Administrator access required"
+        )
+    return current_doctor
+
+def is_admin_token(authorization: Optional[str]) -> bool:
+    """Whether an Authorization header belongs to an admin, outside of a route."""
+    scheme, _, token = (authorization or "").partition(" ")
+    if scheme.lower() != "bearer" or not token:
+        return False
+    try:
+        token_data = decode_token(token)
+    except HTTPException:
+        return False
+    db = SessionLocal()
+    try:
+        doctor = get_doctor_cached(db, doctor_id=token_data.sub)
+        return doctor is not None and is_admin(doctor)
+    finally:
+        db.close()
+
+def _metrics_client_allowed(host: Optional[str]) -> bool:
+    try:
+        address = ipaddress.ip_address(host or "")
+    except ValueError:
+        return False
+    return any(
+        address in ipaddress.ip_network(network, strict=False)
+        for network in settings.METRICS_ALLOWED_NETWORKS
+    )
+
+def verify_metrics_access(request: Request) -> None:
+    """Let Prometheus scrape from an allowed network or with METRICS_TOKEN."""
+    scheme, _, token = request.headers.get("authorization", "").partition(" ")
+    if settings.METRICS_TOKEN and scheme.lower() == "bearer" and \
+            hmac.compare_digest(token.encode(), settings.METRICS_TOKEN.encode()):
+        return
+    if _metrics_client_allowed(request.client.host if request.client else None):
+        return
+    raise HTTPException(
+        status_code=status.HTTP_403_FORBIDDEN,
+        detail="Metrics are restricted"
+    )
@@ -0,0 +1,145 @@
+from typing import List
+from datetime import datetime
+import os
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi.responses import FileResponse
+from app.api.deps import get_current_admin
+from app.core import memory, profiling
+from app.models.doctor import Doctor
+from app.schemas.admin import (
+    AllocationDiff,
+    AllocationSite,
+    MemoryReport,
+    ProfileInfo,
+    SnapshotInfo,
+    TracemallocStatus
+)
+
+router = APIRouter()
+
+@router.get("/profiles", response_model=List[ProfileInfo])
+def list_profiles(
+    current_admin: Doctor = Depends(get_current_admin)
+) -> List[ProfileInfo]:
+    """
+    Stored request profiles, newest first.
+    """
+    profiles = []
+    for path in profiling.store.list():
+        stat = path.stat()
+        profiles.append(ProfileInfo(
+            id=path.name[:-len(profiling.PROFILE_SUFFIX)],
+            created_at=datetime.utcfromtimestamp(stat.st_mtime),
+            size_bytes=stat.st_size
+        ))
+    return profiles
+
+@router.get("/profiles/{profile_id}")
+def read_profile(
+    profile_id: str,
+    current_admin: Doctor = Depends(get_current_admin)
+):
+    """
+    Download a profile in speedscope format (https://www.speedscope.app).
+    """
+    path = profiling.store.path(profile_id)
+    if path is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Profile not found"
+        )
+    return FileResponse(path, media_type="application/json", filename=path.name)
+
+def _snapshot_or_404(snapshot_id: int):
+    snapshot = memory.get_snapshot(snapshot_id)
+    if snapshot is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Snapshot not found"
+        )
+    return snapshot
+
+@router.get("/memory", response_model=MemoryReport)
+def read_memory(
+    current_admin: Doctor = Depends(get_current_admin)
+) -> MemoryReport:
+    """
+    Memory of this worker process: RSS, what each loaded model added to it,
+    and the tracemalloc state.
+    """
+    return MemoryReport(
+        pid=os.getpid(),
+        rss_bytes=memory.rss_bytes(),
+        peak_rss_bytes=memory.peak_rss_bytes(),
+        models=memory.loaded_models(),
+        tracemalloc=memory.tracing_status(),
+        snapshots=[
+            SnapshotInfo(id=snapshot_id, taken_at=taken_at)
+            for snapshot_id, taken_at in memory.list_snapshots()
+        ]
+    )
+
+@router.post("/memory/tracemalloc/start", response_model=TracemallocStatus)
+def start_tracemalloc(
+    frames: int = Query(1, ge=1, le=50),
+    current_admin: Doctor = Depends(get_current_admin)
+) -> TracemallocStatus:
+    """
+    Start tracing allocations, keeping `frames` frames per traceback.
+    Tracing slows the worker down; stop it when done.
+    """
+    memory.start_tracing(frames)
+    return memory.tracing_status()
+
+@router.post("/memory/tracemalloc/stop", response_model=TracemallocStatus)
+def stop_tracemalloc(
+    current_admin: Doctor = Depends(get_current_admin)
+) -> TracemallocStatus:
+    """
+    Stop tracing allocations and discard the stored snapshots.
+    """
+    memory.stop_tracing()
+    return memory.tracing_status()
+
+@router.post("/memory/snapshots", response_model=SnapshotInfo)
+def create_snapshot(
+    current_admin: Doctor = Depends(get_current_admin)
+) -> SnapshotInfo:
+    """
+    Take a tracemalloc snapshot of this worker.
+    """
+    if not memory.tracing_status()["tracing"]:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="tracemalloc is not tracing; start it first"
+        )
+    snapshot_id, taken_at = memory.take_snapshot()
+    return SnapshotInfo(id=snapshot_id, taken_at=taken_at)
+
+@router.get("/memory/snapshots/{snapshot_id}/top", response_model=List[AllocationSite])
+def read_snapshot_top(
+    snapshot_id: int,
+    group_by: str = Query("lineno", pattern="^(lineno|filename|traceback)$"),
+    limit: int = Query(20, ge=1, le=200),
+    current_admin: Doctor = Depends(get_current_admin)
+) -> List[AllocationSite]:
+    """
+    Largest allocation sites in a snapshot.
+    """
+    return memory.top_allocations(_snapshot_or_404(snapshot_id), group_by=group_by, limit=limit)
+
+@router.get("/memory/snapshots/{snapshot_id}/diff/{base_id}", response_model=List[AllocationDiff])
+def read_snapshot_diff(
+    snapshot_id: int,
+    base_id: int,
+    group_by: str = Query("lineno", pattern="^(lineno|filename|traceback)$"),
+    limit: int = Query(20, ge=1, le=200),
+    current_admin: Doctor = Depends(get_current_admin)
+) -> List[AllocationDiff]:
+    """
+    Allocation sites that changed the most between snapshot `base_id` and
+    snapshot `snapshot_id`.
+    """
+    return memory.compare_snapshots(
+        _snapshot_or_404(base_id), _snapshot_or_404(snapshot_id), group_by=group_by, limit=limit
+    )
@@ -1,13 +1,19 @@
 from datetime import timedelta
 from typing import Any, Dict
-from fastapi import APIRouter, Depends, HTTPException, status, Request
+from fastapi import APIRouter, Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordRequestForm
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse
+from starlette.concurrency import run_in_threadpool
 from sqlalchemy.orm import Session
 import logging
 
-from app.core.security import verify_password, create_access_token, get_password_hash
+from app.core.security import (
+    PasswordHashingBusy,
+    create_access_token,
+    get_password_hash_async,
+    verify_password_async
+)
 from app.core.config import get_settings
 from app.api.deps import get_db, get_current_doctor
 from app.crud import doctor as crud_doctor
@@ -16,10 +22,16 @@ from app.schemas.doctor import DoctorCreate, Doctor as DoctorSchema
 
 router = APIRouter()
 logger = logging.getLogger(__name__)
-logging.basicConfig(level=logging.DEBUG)
 
 settings = get_settings()
 
+def password_hashing_busy() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        detail="Too many concurrent sign-ins, please retry shortly",
+        headers={"Retry-After": "1"},
+    )
+
 @router.options("/token")
 async def token_options():
     return JSONResponse(
@@ -33,46 +45,50 @@ async def token_options():
 
 @router.post("/token")
 async def login_for_access_token(
-    request: Request,
     form_data: OAuth2PasswordRequestForm = Depends(),
     db: Session = Depends(get_db)
 ) -> Dict[str, str]:
-    logger.debug(f"Login attempt for doctor: {form_data.username}")
-    logger.debug(f"Request headers: {dict(request.headers)}")
-    logger.debug(f"Request method: {request.method}")
-    
     try:
-        doctor = crud_doctor.get_doctor_by_email(db, email=form_data.username)
+        doctor = await run_in_threadpool(
+            crud_doctor.get_doctor_by_email, db, email=form_data.username
+        )
         if not doctor:
-            logger.warning(f"Doctor not found: {form_data.username}")
+            logger.warning("Login failed: unknown email")
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
                 detail="Incorrect email or password",
                 headers={"WWW-Authenticate": "Bearer"},
             )
         
-        if not verify_password(form_data.password, doctor.hashed_password):
-            logger.warning(f"Invalid password for doctor: {form_data.username}")
+        doctor_id, doctor_type, hashed_password = doctor.id, doctor.doctor_type, doctor.hashed_password
+        # Hand the connection back to the pool while waiting for bcrypt
+        db.close()
+
+        if not await verify_password_async(form_data.password, hashed_password):
+            logger.warning("Login failed: invalid password", extra={"doctor_id": doctor_id})
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
                 detail="Incorrect email or password",
                 headers={"WWW-Authenticate": "Bearer"},
             )
         
-        logger.info(f"Login successful for doctor: {form_data.username}")
+        logger.info("Login successful", extra={"doctor_id": doctor_id})
         access_token_expires = timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
         access_token = create_access_token(
-            subject=str(doctor.id), expires_delta=access_token_expires
+            subject=str(doctor_id), expires_delta=access_token_expires
         )
         
         response = {
             "access_token": access_token,
             "token_type": "bearer",
-            "doctor_type": doctor.doctor_type
+            "doctor_type": doctor_type
         }
-        logger.debug(f"Sending response: {response}")
         return response
         
+    except PasswordHashingBusy:
+        raise password_hashing_busy()
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error during login: {str(e)}")
         raise HTTPException(
@@ -102,13 +118,10 @@ async def register_doctor(
     Public endpoint for registering new resident doctors.
     """
     try:
-        logger.info(f"Registration attempt for email: {doctor_in.email}")
-        logger.info(f"Registration data: {doctor_in.model_dump(exclude={'password'})}")
-        
-        # Check if email already exists
+        # Check if email already exists (before paying for a hash)
         doctor = crud_doctor.get_doctor_by_email(db, email=doctor_in.email)
         if doctor:
-            logger.warning(f"Email already registered: {doctor_in.email}")
+            logger.warning("Registration failed: email already registered")
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail="Email already registered"
@@ -116,7 +129,6 @@ async def register_doctor(
         
         # Set doctor type to resident by default for public registration
         doctor_in.doctor_type = DoctorType.RESIDENT
-        logger.info(f"Setting doctor type to RESIDENT for {doctor_in.email}")
         
         # For residents, we'll assign the first available consultant as their supervisor
         if doctor_in.doctor_type == DoctorType.RESIDENT and not doctor_in.supervisor_id:
@@ -127,7 +139,6 @@ async def register_doctor(
             )
             if consultant:
                 doctor_in.supervisor_id = consultant[0].id
-                logger.info(f"Assigned supervisor {consultant[0].id} to {doctor_in.email}")
             else:
                 logger.warning("No consultants available for supervision")
                 raise HTTPException(
@@ -135,11 +146,21 @@ async def register_doctor(
                     detail="No consultants available to supervise. Please contact the administrator."
                 )
         
+        # Give the connection back to the pool while hashing
+        db.rollback()
+        hashed_password = await get_password_hash_async(doctor_in.password)
+        
         # Create the doctor
-        doctor = crud_doctor.create_doctor(db=db, doctor=doctor_in)
-        logger.info(f"Successfully registered new doctor: {doctor.email} (ID: {doctor.id})")
+        doctor = crud_doctor.create_doctor(db=db, doctor=doctor_in, hashed_password=hashed_password)
+        logger.info("Doctor registered", extra={
+            "doctor_id": doctor.id, "supervisor_id": doctor_in.supervisor_id
+        })
         return doctor
         
+    except PasswordHashingBusy:
+        raise password_hashing_busy()
+    except HTTPException:
+        raise
     except ValueError as e:
         logger.error(f"Validation error during registration: {str(e)}")
         raise HTTPException(
@@ -4,6 +4,7 @@ from typing import List
 import os
 from datetime import datetime
 
+from app.core import memory, tracing
 from app.db.session import get_db
 from app.services.speech_to_text import speech_to_text_service
 from app.services.medical_nlp import medical_nlp_service
@@ -30,40 +31,44 @@ async def upload_clinical_history(
     if not db_patient:
         raise HTTPException(status_code=404, detail="Patient not found")
     
-    # Create directory for audio files if it doesn't exist
-    audio_dir = "uploads/audio"
-    os.makedirs(audio_dir, exist_ok=True)
+    with memory.track_peak("/upload/{patient_id}"):
+        # Create directory for audio files if it doesn't exist
+        audio_dir = "uploads/audio"
+        os.makedirs(audio_dir, exist_ok=True)
     
-    # Save audio file
-    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-    audio_filename = f"{patient_id}_{timestamp}_{audio_file.filename}"
-    audio_path = os.path.join(audio_dir, audio_filename)
+        # Save audio file
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        audio_filename = f"{patient_id}_{timestamp}_{audio_file.filename}"
+        audio_path = os.path.join(audio_dir, audio_filename)
     
-    with open(audio_path, "wb") as buffer:
-        content = await audio_file.read()
-        buffer.write(content)
+        with tracing.span("upload.save"):
+            with open(audio_path, "wb") as buffer:
+                content = await audio_file.read()
+                buffer.write(content)
     
-    # Transcribe audio
-    transcription = speech_to_text_service.transcribe_audio(audio_path)
-    if not transcription:
-        raise HTTPException(status_code=500, detail="Failed to transcribe audio")
+        # Transcribe audio (spans for decode and inference are opened by the service)
+        transcription = speech_to_text_service.transcribe_audio(audio_path)
+        if not transcription:
+            raise HTTPException(status_code=500, detail="Failed to transcribe audio")
     
-    # Process transcription with NLP
-    extracted_data = await medical_nlp_service.process_medical_text(transcription)
+        # Process transcription with NLP
+        with tracing.span("nlp.extract"):
+            extracted_data = await medical_nlp_service.process_medical_text(transcription)
     
-    # Create clinical history record
-    clinical_history = ClinicalHistoryCreate(
-        patient_id=patient_id,
-        original_audio_path=audio_path,
-        transcribed_text=transcription,
-        age=extracted_data["demographics"]["age"],
-        risk_factors=extracted_data["risk_factors"],
-        family_history=extracted_data["family_history"],
-        surgical_history=extracted_data["surgical_history"]
-    )
+        # Create clinical history record
+        clinical_history = ClinicalHistoryCreate(
+            patient_id=patient_id,
+            original_audio_path=audio_path,
+            transcribed_text=transcription,
+            age=extracted_data["demographics"]["age"],
+            risk_factors=extracted_data["risk_factors"],
+            family_history=extracted_data["family_history"],
+            surgical_history=extracted_data["surgical_history"]
+        )
     
-    db_record = crud_patient.create_clinical_record(db, clinical_history)
-    return db_record
+        with tracing.span("db.persist"):
+            db_record = crud_patient.create_clinical_record(db, clinical_history)
+        return db_record
 
 @router.get("/patient/{patient_id}", response_model=List[ClinicalHistoryResponse])
 def get_patient_history(
@@ -1,7 +1,9 @@
-from typing import List, Optional
-from fastapi import APIRouter, Depends, HTTPException, status
+from typing import List
+from fastapi import APIRouter, Depends, HTTPException, status, Response
 from sqlalchemy.orm import Session
-from app.api.deps import get_db, get_current_doctor
+from app.api.deps import get_db, get_read_db, get_current_doctor
+from app.core.responses import ORJSONResponse, model_list_response
+from app.db.instrumentation import query_budget
 from app.crud import doctor as crud_doctor
 from app.models.doctor import Doctor, DoctorType
 from app.schemas.doctor import (
@@ -58,40 +60,42 @@ def update_doctor_me(
     """
     return crud_doctor.update_doctor(db=db, db_doctor=current_doctor, doctor=doctor_in)
 
-@router.get("/consultants", response_model=List[DoctorSchema])
+@router.get("/consultants", response_model=List[DoctorSchema], response_class=ORJSONResponse)
+@query_budget(2)
 def read_consultants(
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     skip: int = 0,
     limit: int = 100,
     current_doctor: Doctor = Depends(get_current_doctor)
-) -> List[Doctor]:
+) -> Response:
     """
     Retrieve consultants.
     """
     doctors = crud_doctor.get_doctors(
         db, skip=skip, limit=limit, doctor_type=DoctorType.CONSULTANT
     )
-    return doctors
+    return model_list_response(DoctorSchema, doctors)
 
-@router.get("/residents", response_model=List[DoctorSchema])
+@router.get("/residents", response_model=List[DoctorSchema], response_class=ORJSONResponse)
+@query_budget(2)
 def read_residents(
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     skip: int = 0,
     limit: int = 100,
     current_doctor: Doctor = Depends(get_current_doctor)
-) -> List[Doctor]:
+) -> Response:
     """
     Retrieve residents.
     """
     doctors = crud_doctor.get_doctors(
         db, skip=skip, limit=limit, doctor_type=DoctorType.RESIDENT
     )
-    return doctors
+    return model_list_response(DoctorSchema, doctors)
 
 @router.get("/{doctor_id}", response_model=DoctorSchema)
 def read_doctor(
     *,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     doctor_id: int,
     current_doctor: Doctor = Depends(get_current_doctor)
 ) -> Doctor:
@@ -0,0 +1,16 @@
+from fastapi import APIRouter, Depends, HTTPException, Response, status
+from app.api.deps import verify_metrics_access
+from app.core import metrics
+
+router = APIRouter()
+
+@router.get("/metrics", include_in_schema=False, dependencies=[Depends(verify_metrics_access)])
+def read_metrics() -> Response:
+    """Prometheus scrape endpoint; see settings.METRICS_ALLOWED_NETWORKS and METRICS_TOKEN."""
+    if metrics.prometheus_client is None:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Metrics require prometheus_client"
+        )
+    content, content_type = metrics.render_latest()
+    return Response(content=content, media_type=content_type)
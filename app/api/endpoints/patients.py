@@ -1,22 +1,106 @@
-from typing import List
-from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File
+from typing import List, Optional, Tuple
+from datetime import datetime, timedelta, timezone
+from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File, Query, Request, Response
 from sqlalchemy.orm import Session
-from app.api.deps import get_db, get_current_doctor
+from app.api.deps import get_db, get_read_db, get_current_doctor
+from app.core import http_cache, memory, tracing
+from app.core.responses import ORJSONResponse, model_list_response
+from app.db.instrumentation import query_budget
 from app.crud import patient as crud_patient
+from app.crud import observation as crud_observation
+from app.crud import doctor as crud_doctor
 from app.models.doctor import Doctor, DoctorType
+from app.models.patient import Patient as PatientModel
 from app.schemas.patient import (
     Patient,
+    PatientSummary,
     PatientCreate,
     PatientUpdate,
     ClinicalRecordCreate,
     ClinicalRecordInDB,
-    PatientAssignmentInDB
+    PatientAssignmentInDB,
+    PatientReassignment,
+    PatientReassignmentResult,
+    PatientImportReport,
+    PatientImportError
 )
+from app.schemas.observation import ObservationSeries
 from app.services.audio_processing import process_audio_file
 from app.services.nlp_processing import extract_medical_data
+from app.services.patient_import import detect_format, iter_patient_rows
 
 router = APIRouter()
 
+IMPORT_BATCH_SIZE = 5000
+MAX_REPORTED_IMPORT_ERRORS = 1000
+# Doctor references of imported rows and the type each must have
+IMPORT_DOCTOR_FIELDS = (
+    ("consultant_id", DoctorType.CONSULTANT),
+    ("current_resident_id", DoctorType.RESIDENT),
+)
+
+def _naive_utc(value: Optional[datetime]) -> Optional[datetime]:
+    """Stored timestamps are naive UTC; convert aware query parameters to match."""
+    if value is None or value.tzinfo is None:
+        return value
+    return value.astimezone(timezone.utc).replace(tzinfo=None)
+
+def get_accessible_patient(
+    db: Session,
+    doctor: Doctor,
+    patient_id: int,
+    detail: bool = False,
+    forbidden_detail: str = "Not authorized to access this patient"
+) -> PatientModel:
+    """
+    Load a patient the doctor may access with one scoped query. Only on a
+    miss does a second, index-only query decide between 404 and 403.
+    """
+    patient = crud_patient.get_patient_for_doctor(
+        db, doctor=doctor, patient_id=patient_id, detail=detail
+    )
+    if patient is None:
+        raise patient_access_error(db, patient_id, forbidden_detail)
+    return patient
+
+def patient_access_error(
+    db: Session,
+    patient_id: int,
+    forbidden_detail: str = "Not authorized to access this patient"
+) -> HTTPException:
+    """404 or 403 for a patient a scoped query didn't return."""
+    if not crud_patient.patient_exists(db, patient_id=patient_id):
+        return HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Patient not found"
+        )
+    return HTTPException(
+        status_code=status.HTTP_403_FORBIDDEN,
+        detail=forbidden_detail
+    )
+
+def get_patient_validators(
+    db: Session,
+    doctor: Doctor,
+    patient_id: int
+) -> Tuple[str, Optional[datetime]]:
+    """
+    Weak ETag and Last-Modified of a patient's detail and record responses,
+    from one metadata query that also checks access.
+    """
+    version = crud_patient.get_patient_version(db, doctor=doctor, patient_id=patient_id)
+    if version is None:
+        raise patient_access_error(db, patient_id)
+    etag = http_cache.weak_etag(patient_id, *version)
+    last_modified = http_cache.latest(
+        version.updated_at,
+        version.consultant_updated_at,
+        version.resident_updated_at,
+        version.records_updated_at,
+        version.authors_updated_at
+    )
+    return etag, last_modified
+
 @router.post("/", response_model=Patient)
 def create_patient(
     *,
@@ -35,58 +119,224 @@ def create_patient(
         )
     return crud_patient.create_patient(db=db, patient=patient_in)
 
-@router.get("/my-patients", response_model=List[Patient])
-def read_my_patients(
+@router.post("/import", response_model=PatientImportReport)
+def import_patients(
+    *,
+    db: Session = Depends(get_db),
+    file: UploadFile = File(...),
+    file_format: Optional[str] = Query(None, alias="format", pattern="^(csv|ndjson)$"),
+    current_doctor: Doctor = Depends(get_current_doctor)
+) -> PatientImportReport:
+    """
+    Bulk import patients from a CSV or NDJSON file.
+    Only consultants can import patients. Rows without a consultant_id are
+    assigned to the current consultant. Each row is validated on its own;
+    valid rows are loaded in batches and invalid ones listed in the report.
+    """
+    if current_doctor.doctor_type != DoctorType.CONSULTANT:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Only consultants can import patients"
+        )
+
+    file_format = file_format or detect_format(file.filename, file.content_type)
+    if file_format is None:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Unknown file format; pass ?format=csv or ?format=ndjson"
+        )
+
+    report = PatientImportReport(format=file_format)
+
+    def add_error(row_number, errors):
+        report.failed += 1
+        if len(report.errors) < MAX_REPORTED_IMPORT_ERRORS:
+            report.errors.append(PatientImportError(row=row_number, errors=errors))
+        else:
+            report.errors_truncated = True
+
+    def flush(batch):
+        referenced = {p.consultant_id for _, p in batch} | \
+            {p.current_resident_id for _, p in batch if p.current_resident_id}
+        doctor_types = crud_patient.get_doctor_types(db, referenced)
+        valid = []
+        for row_number, patient in batch:
+            errors = []
+            for field, doctor_type in IMPORT_DOCTOR_FIELDS:
+                doctor_id = getattr(patient, field)
+                if not doctor_id:
+                    continue
+                if doctor_id not in doctor_types:
+                    errors.append({"loc": [field], "msg": "Doctor not found"})
+                elif doctor_types[doctor_id] != doctor_type:
+                    errors.append({"loc": [field], "msg": f"Doctor is not a {doctor_type.value}"})
+            if errors:
+                add_error(row_number, errors)
+            else:
+                valid.append(patient)
+        report.imported += crud_patient.bulk_create_patients(db, valid)
+
+    batch = []
+    try:
+        for row_number, patient, errors in iter_patient_rows(
+            file.file, file_format, default_consultant_id=current_doctor.id
+        ):
+            report.total_rows += 1
+            if errors:
+                add_error(row_number, errors)
+                continue
+            batch.append((row_number, patient))
+            if len(batch) >= IMPORT_BATCH_SIZE:
+                flush(batch)
+                batch = []
+        flush(batch)
+        db.commit()
+    except UnicodeDecodeError:
+        db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="File must be UTF-8 encoded"
+        )
+    except Exception:
+        db.rollback()
+        raise
+
+    return report
+
+@router.post("/reassign", response_model=PatientReassignmentResult)
+def reassign_patients(
+    *,
     db: Session = Depends(get_db),
+    reassignment: PatientReassignment,
+    current_doctor: Doctor = Depends(get_current_doctor)
+) -> PatientReassignmentResult:
+    """
+    Move many patients to a resident at once, e.g. at rotation changeover.
+    Only consultants can reassign, and only their own patients; the whole
+    changeover is applied in one transaction or not at all.
+    """
+    if current_doctor.doctor_type != DoctorType.CONSULTANT:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Only consultants can assign patients"
+        )
+
+    resident = crud_doctor.get_doctor(db=db, doctor_id=reassignment.resident_id)
+    if not resident or resident.doctor_type != DoctorType.RESIDENT:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="resident_id must refer to a resident"
+        )
+
+    result = crud_patient.reassign_patients(
+        db,
+        consultant_id=current_doctor.id,
+        patient_ids=reassignment.patient_ids,
+        resident_id=reassignment.resident_id,
+        from_resident_id=reassignment.from_resident_id
+    )
+    if result["missing"]:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail={
+                "message": "Not authorized to assign these patients",
+                "patient_ids": result["missing"]
+            }
+        )
+
+    return PatientReassignmentResult(
+        resident_id=reassignment.resident_id,
+        reassigned=result["reassigned"],
+        unchanged=result["unchanged"]
+    )
+
+@router.get("/my-patients", response_model=List[PatientSummary], response_class=ORJSONResponse)
+@query_budget(2)
+def read_my_patients(
+    db: Session = Depends(get_read_db),
     skip: int = 0,
     limit: int = 100,
     current_doctor: Doctor = Depends(get_current_doctor)
-) -> List[Patient]:
+) -> Response:
     """
     Retrieve patients assigned to the current doctor.
+    Returns compact summaries; use the patient detail endpoint for records.
     """
     if current_doctor.doctor_type == DoctorType.CONSULTANT:
-        patients = crud_patient.get_patients_by_consultant(
+        patients = crud_patient.get_patient_summaries_by_consultant(
             db, consultant_id=current_doctor.id, skip=skip, limit=limit
         )
     else:  # RESIDENT
-        patients = crud_patient.get_patients_by_resident(
+        patients = crud_patient.get_patient_summaries_by_resident(
             db, resident_id=current_doctor.id, skip=skip, limit=limit
         )
-    return patients
+    return model_list_response(PatientSummary, patients)
+
+@router.get("/search", response_model=List[PatientSummary], response_class=ORJSONResponse)
+@query_budget(2)
+def search_patients(
+    db: Session = Depends(get_read_db),
+    q: str = Query(..., min_length=1, max_length=100),
+    limit: int = Query(10, le=50),
+    current_doctor: Doctor = Depends(get_current_doctor)
+) -> Response:
+    """
+    Typeahead search over the current doctor's patients by name.
+    """
+    return model_list_response(PatientSummary, crud_patient.search_patients(
+        db, text=q, doctor=current_doctor, limit=limit
+    ))
+
+@router.get("/cohort", response_model=List[PatientSummary], response_class=ORJSONResponse)
+@query_budget(2)
+def read_patient_cohort(
+    db: Session = Depends(get_read_db),
+    risk_factor: Optional[List[str]] = Query(None),
+    diagnosis: Optional[List[str]] = Query(None),
+    skip: int = 0,
+    limit: int = Query(100, le=500),
+    current_doctor: Doctor = Depends(get_current_doctor)
+) -> Response:
+    """
+    Retrieve the current doctor's patients matching all given criteria,
+    e.g. ?risk_factor=diabetes&risk_factor=hypertension.
+    """
+    if not risk_factor and not diagnosis:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="At least one risk_factor or diagnosis filter is required"
+        )
+    patients = crud_patient.get_patient_cohort(
+        db,
+        doctor=current_doctor,
+        risk_factors=risk_factor,
+        diagnoses=diagnosis,
+        skip=skip,
+        limit=limit
+    )
+    return model_list_response(PatientSummary, patients)
 
 @router.get("/{patient_id}", response_model=Patient)
+@query_budget(4)
 def read_patient(
     *,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     patient_id: int,
+    request: Request,
+    response: Response,
     current_doctor: Doctor = Depends(get_current_doctor)
 ) -> Patient:
     """
     Get patient by ID.
     Doctors can only access their assigned patients.
+    Supports conditional requests (ETag / Last-Modified) for polling.
     """
-    patient = crud_patient.get_patient(db=db, patient_id=patient_id)
-    if not patient:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Patient not found"
-        )
-    
-    # Check if doctor has access to this patient
-    if current_doctor.doctor_type == DoctorType.CONSULTANT:
-        if patient.consultant_id != current_doctor.id:
-            raise HTTPException(
-                status_code=status.HTTP_403_FORBIDDEN,
-                detail="Not authorized to access this patient"
-            )
-    else:  # RESIDENT
-        if patient.current_resident_id != current_doctor.id:
-            raise HTTPException(
-                status_code=status.HTTP_403_FORBIDDEN,
-                detail="Not authorized to access this patient"
-            )
-    
+    etag, last_modified = get_patient_validators(db, current_doctor, patient_id)
+    if http_cache.is_not_modified(request, etag, last_modified):
+        return http_cache.not_modified(etag, last_modified)
+
+    patient = get_accessible_patient(db, current_doctor, patient_id, detail=True)
+    http_cache.set_validators(response, etag, last_modified)
     return patient
 
 @router.put("/{patient_id}", response_model=Patient)
@@ -101,27 +351,10 @@ def update_patient(
     Update a patient.
     Doctors can only update their assigned patients.
     """
-    patient = crud_patient.get_patient(db=db, patient_id=patient_id)
-    if not patient:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Patient not found"
-        )
-    
-    # Check if doctor has access to this patient
-    if current_doctor.doctor_type == DoctorType.CONSULTANT:
-        if patient.consultant_id != current_doctor.id:
-            raise HTTPException(
-                status_code=status.HTTP_403_FORBIDDEN,
-                detail="Not authorized to update this patient"
-            )
-    else:  # RESIDENT
-        if patient.current_resident_id != current_doctor.id:
-            raise HTTPException(
-                status_code=status.HTTP_403_FORBIDDEN,
-                detail="Not authorized to update this patient"
-            )
-    
+    patient = get_accessible_patient(
+        db, current_doctor, patient_id,
+        forbidden_detail="Not authorized to update this patient"
+    )
     return crud_patient.update_patient(db=db, db_patient=patient, patient=patient_in)
 
 @router.post("/{patient_id}/assign", response_model=Patient)
@@ -142,27 +375,20 @@ def assign_patient(
             detail="Only consultants can assign patients"
         )
     
-    patient = crud_patient.get_patient(db=db, patient_id=patient_id)
-    if not patient:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Patient not found"
-        )
-    
-    if patient.consultant_id != current_doctor.id:
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Not authorized to assign this patient"
-        )
+    get_accessible_patient(
+        db, current_doctor, patient_id,
+        forbidden_detail="Not authorized to assign this patient"
+    )
     
     return crud_patient.assign_patient_to_resident(
         db=db, patient_id=patient_id, resident_id=resident_id
     )
 
 @router.get("/{patient_id}/assignments", response_model=List[PatientAssignmentInDB])
+@query_budget(3)
 def read_patient_assignments(
     *,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     patient_id: int,
     skip: int = 0,
     limit: int = 100,
@@ -172,26 +398,41 @@ def read_patient_assignments(
     Get patient assignment history.
     Only the consultant and current resident can view assignments.
     """
-    patient = crud_patient.get_patient(db=db, patient_id=patient_id)
-    if not patient:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Patient not found"
-        )
-    
-    if (current_doctor.doctor_type == DoctorType.CONSULTANT and 
-        patient.consultant_id != current_doctor.id) or \
-       (current_doctor.doctor_type == DoctorType.RESIDENT and 
-        patient.current_resident_id != current_doctor.id):
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Not authorized to view this patient's assignments"
-        )
+    get_accessible_patient(
+        db, current_doctor, patient_id,
+        forbidden_detail="Not authorized to view this patient's assignments"
+    )
     
     return crud_patient.get_patient_assignment_history(
         db=db, patient_id=patient_id, skip=skip, limit=limit
     )
 
+@router.get("/{patient_id}/clinical-records", response_model=List[ClinicalRecordInDB], response_class=ORJSONResponse)
+@query_budget(3)
+def read_patient_clinical_records(
+    *,
+    db: Session = Depends(get_read_db),
+    patient_id: int,
+    skip: int = 0,
+    limit: int = Query(100, le=500),
+    request: Request,
+    current_doctor: Doctor = Depends(get_current_doctor)
+) -> Response:
+    """
+    Get a patient's clinical records, newest first.
+    Supports conditional requests (ETag / Last-Modified) for polling.
+    """
+    etag, last_modified = get_patient_validators(db, current_doctor, patient_id)
+    if http_cache.is_not_modified(request, etag, last_modified):
+        return http_cache.not_modified(etag, last_modified)
+
+    records = crud_patient.get_patient_clinical_records(
+        db, patient_id=patient_id, skip=skip, limit=limit
+    )
+    response = model_list_response(ClinicalRecordInDB, records)
+    http_cache.set_validators(response, etag, last_modified)
+    return response
+
 @router.post("/{patient_id}/clinical-records", response_model=ClinicalRecordInDB)
 async def create_clinical_record(
     *,
@@ -204,33 +445,63 @@ async def create_clinical_record(
     Create a new clinical record from audio file.
     Only the current resident can create records.
     """
-    patient = crud_patient.get_patient(db=db, patient_id=patient_id)
-    if not patient:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Patient not found"
+    if current_doctor.doctor_type != DoctorType.RESIDENT:
+        # Still 404 for a missing patient, whoever asks
+        raise patient_access_error(
+            db, patient_id, "Only the assigned resident can create clinical records"
         )
+    # For a resident the scoped query only matches their current patients
+    get_accessible_patient(
+        db, current_doctor, patient_id,
+        forbidden_detail="Only the assigned resident can create clinical records"
+    )
     
-    if current_doctor.doctor_type != DoctorType.RESIDENT or \
-       patient.current_resident_id != current_doctor.id:
+    with memory.track_peak("/patients/{patient_id}/clinical-records"):
+        # Process audio file
+        audio_path, transcription = await process_audio_file(audio_file)
+        
+        # Extract medical data using NLP
+        with tracing.span("nlp.extract"):
+            extracted_data = await extract_medical_data(transcription)
+        
+        record_in = ClinicalRecordCreate(
+            patient_id=patient_id,
+            audio_file_path=audio_path,
+            transcription=transcription,
+            extracted_data=extracted_data
+        )
+        
+        with tracing.span("db.persist"):
+            return crud_patient.create_clinical_record(
+                db=db, record=record_in, created_by_id=current_doctor.id
+            )
+
+@router.get("/{patient_id}/observations/{code}", response_model=ObservationSeries)
+@query_budget(3)
+def read_patient_observations(
+    *,
+    db: Session = Depends(get_read_db),
+    patient_id: int,
+    code: str,
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    buckets: int = Query(200, ge=1, le=1000),
+    current_doctor: Doctor = Depends(get_current_doctor)
+) -> ObservationSeries:
+    """
+    Get a downsampled time series of one observation code (e.g. heart_rate,
+    bp_systolic) for a patient. Defaults to the last year.
+    """
+    get_accessible_patient(db, current_doctor, patient_id)
+
+    end = _naive_utc(end) or datetime.utcnow()
+    start = _naive_utc(start) or end - timedelta(days=365)
+    if start >= end:
         raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Only the assigned resident can create clinical records"
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="start must be before end"
         )
-    
-    # Process audio file
-    audio_path, transcription = await process_audio_file(audio_file)
-    
-    # Extract medical data using NLP
-    extracted_data = await extract_medical_data(transcription)
-    
-    record_in = ClinicalRecordCreate(
-        patient_id=patient_id,
-        audio_file_path=audio_path,
-        transcription=transcription,
-        extracted_data=extracted_data
-    )
-    
-    return crud_patient.create_clinical_record(
-        db=db, record=record_in, created_by_id=current_doctor.id
+
+    return crud_observation.get_observation_series(
+        db, patient_id=patient_id, code=code, start=start, end=end, buckets=buckets
     )
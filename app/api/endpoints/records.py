@@ -0,0 +1,133 @@
+from typing import List, Optional
+from datetime import datetime
+import os
+import uuid
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi.responses import FileResponse, Response, StreamingResponse
+from sqlalchemy.orm import Session
+from starlette.background import BackgroundTask
+from app.api.deps import get_read_db, get_current_doctor, is_admin
+from app.db.instrumentation import query_budget
+from app.core.config import settings
+from app.core.responses import ORJSONResponse, model_list_response
+from app.crud import patient as crud_patient
+from app.models.doctor import Doctor, DoctorType
+from app.schemas.patient import ClinicalRecordInDB, ClinicalRecordSearchHit
+from app.services import record_archive, record_export
+from app.services.record_export import RecordExportFilter, stream_ndjson, write_parquet
+
+router = APIRouter()
+
+@router.get("/search", response_model=List[ClinicalRecordSearchHit], response_class=ORJSONResponse)
+@query_budget(2)
+def search_clinical_records(
+    db: Session = Depends(get_read_db),
+    q: str = Query(..., min_length=2, max_length=200),
+    skip: int = 0,
+    limit: int = Query(20, le=100),
+    current_doctor: Doctor = Depends(get_current_doctor)
+) -> Response:
+    """
+    Search transcriptions of the current doctor's patients.
+    Results are ranked by relevance and include a highlighted snippet.
+    """
+    hits = crud_patient.search_clinical_records(
+        db, text=q, doctor=current_doctor, skip=skip, limit=limit
+    )
+    return model_list_response(ClinicalRecordSearchHit, hits)
+
+@router.get("/export")
+def export_clinical_records(
+    file_format: str = Query("ndjson", alias="format", pattern="^(ndjson|parquet)$"),
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    consultant_id: Optional[int] = None,
+    current_doctor: Doctor = Depends(get_current_doctor)
+):
+    """
+    Export clinical records with their extracted fields as NDJSON (streamed)
+    or Parquet. Consultants export their own patients' records; admins may
+    export any consultant's records or everything.
+    """
+    if current_doctor.doctor_type != DoctorType.CONSULTANT and not is_admin(current_doctor):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Only consultants can export clinical records"
+        )
+    if not is_admin(current_doctor):
+        if consultant_id not in (None, current_doctor.id):
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail="Not authorized to export another consultant's records"
+            )
+        consultant_id = current_doctor.id
+
+    export_filter = RecordExportFilter(start=start, end=end, consultant_id=consultant_id)
+    filename = f"clinical_records_{datetime.utcnow().strftime('%Y%m%d_%H%M%S')}"
+
+    if file_format == "ndjson":
+        return StreamingResponse(
+            stream_ndjson(export_filter),
+            media_type="application/x-ndjson",
+            headers={"Content-Disposition": f'attachment; filename="{filename}.ndjson"'}
+        )
+
+    if record_export.pa is None:
+        raise HTTPException(
+            status_code=status.HTTP_501_NOT_IMPLEMENTED,
+            detail="Parquet export requires pyarrow"
+        )
+
+    os.makedirs(settings.EXPORT_DIR, exist_ok=True)
+    path = os.path.join(settings.EXPORT_DIR, f"{filename}_{uuid.uuid4().hex[:8]}.parquet")
+    try:
+        write_parquet(export_filter, path)
+    except Exception:
+        if os.path.exists(path):
+            os.remove(path)
+        raise
+
+    return FileResponse(
+        path,
+        media_type="application/vnd.apache.parquet",
+        filename=f"{filename}.parquet",
+        background=BackgroundTask(os.remove, path)
+    )
+
+@router.get("/{record_id}", response_model=ClinicalRecordInDB)
+@query_budget(4)
+def read_clinical_record(
+    *,
+    db: Session = Depends(get_read_db),
+    record_id: int,
+    current_doctor: Doctor = Depends(get_current_doctor)
+) -> ClinicalRecordInDB:
+    """
+    Get a clinical record by ID, including records from archived partitions.
+    Doctors can only access records of their assigned patients.
+    """
+    record = crud_patient.get_clinical_record_for_doctor(
+        db, doctor=current_doctor, record_id=record_id
+    )
+    if record:
+        return record
+
+    # Not a live record of one of the doctor's patients: someone else's,
+    # archived, or missing
+    forbidden = HTTPException(
+        status_code=status.HTTP_403_FORBIDDEN,
+        detail="Not authorized to access this clinical record"
+    )
+    if crud_patient.clinical_record_exists(db, record_id=record_id):
+        raise forbidden
+    record = record_archive.find_archived_record(db, record_id)
+    if not record:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Clinical record not found"
+        )
+    if not crud_patient.get_patient_for_doctor(
+        db, doctor=current_doctor, patient_id=record.patient_id
+    ):
+        raise forbidden
+    return record
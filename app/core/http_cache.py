@@ -0,0 +1,78 @@
+"""
+Conditional GET support (RFC 7232).
+
+Endpoints compute a weak ETag and Last-Modified from a cheap metadata
+query, answer a matching If-None-Match / If-Modified-Since with 304 before
+loading anything else, and otherwise attach the validators to the full
+response. If-None-Match takes precedence over If-Modified-Since.
+"""
+from typing import Any, Optional
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+import hashlib
+from fastapi import Request, Response, status
+
+# Clients may keep the representation but must revalidate every time;
+# patient data must not be stored by shared caches
+CACHE_CONTROL = "private, no-cache"
+
+def weak_etag(*parts: Any) -> str:
+    digest = hashlib.sha1(repr(parts).encode()).hexdigest()[:24]
+    return f'W/"{digest}"'
+
+def latest(*timestamps: Optional[datetime]) -> Optional[datetime]:
+    present = [ts for ts in timestamps if ts is not None]
+    return max(present) if present else None
+
+def http_date(value: datetime) -> str:
+    # Timestamps are stored as naive UTC
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return format_datetime(value.astimezone(timezone.utc), usegmt=True)
+
+def _etag_matches(header: str, etag: str) -> bool:
+    if header.strip() == "*":
+        return True
+    # Weak comparison: the W/ prefix is ignored on both sides
+    opaque = etag[2:] if etag.startswith("W/") else etag
+    for candidate in header.split(","):
+        candidate = candidate.strip()
+        if candidate.startswith("W/"):
+            candidate = candidate[2:]
+        if candidate == opaque:
+            return True
+    return False
+
+def _not_modified_since(header: str, last_modified: datetime) -> bool:
+    try:
+        since = parsedate_to_datetime(header)
+    except (TypeError, ValueError):
+        return False
+    if since is None:
+        return False
+    if since.tzinfo is None:
+        since = since.replace(tzinfo=timezone.utc)
+    if last_modified.tzinfo is None:
+        last_modified = last_modified.replace(tzinfo=timezone.utc)
+    # HTTP dates have one-second resolution
+    return last_modified.replace(microsecond=0) <= since
+
+def is_not_modified(request: Request, etag: str, last_modified: Optional[datetime]) -> bool:
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        return _etag_matches(if_none_match, etag)
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since is not None and last_modified is not None:
+        return _not_modified_since(if_modified_since, last_modified)
+    return False
+
+def set_validators(response: Response, etag: str, last_modified: Optional[datetime]) -> None:
+    response.headers["ETag"] = etag
+    if last_modified is not None:
+        response.headers["Last-Modified"] = http_date(last_modified)
+    response.headers["Cache-Control"] = CACHE_CONTROL
+
+def not_modified(etag: str, last_modified: Optional[datetime]) -> Response:
+    response = Response(status_code=status.HTTP_304_NOT_MODIFIED)
+    set_validators(response, etag, last_modified)
+    return response
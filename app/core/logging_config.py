@@ -0,0 +1,170 @@
+"""
+Logging setup, configured from Settings.
+
+Request threads only put records on a bounded in-memory queue
+(QueueHandler); a QueueListener thread redacts, formats and writes them.
+When the queue is full records are dropped and counted instead of
+blocking the request. DEBUG records are sampled (LOG_DEBUG_SAMPLE_RATE)
+before they are queued.
+
+Output is one JSON object per line (LOG_FORMAT=json) or plain text.
+Values of LOG_REDACT_FIELDS in `extra` are replaced, as are email
+addresses and bearer tokens inside messages. Pass identifiers as
+structured fields rather than formatting them into the message:
+
+    logger.info("Doctor registered", extra={"doctor_id": doctor.id})
+"""
+from typing import Any, Dict, List, Optional
+from datetime import datetime, timezone
+import atexit
+import json
+import logging
+import logging.handlers
+import queue
+import random
+import re
+import sys
+import threading
+
+from app.core.config import settings
+
+REDACTED = "[REDACTED]"
+
+_EMAIL_RE = re.compile(r"[\w.+-]+@[\w-]+(?:\.[\w-]+)+")
+_BEARER_RE = re.compile(r"(?i)(bearer\s+)[\w.~+/=-]+")
+_JWT_RE = re.compile(r"\beyJ[\w-]+\.[\w-]+\.[\w-]+")
+
+# Attributes every LogRecord has; anything else came in through `extra`
+_RECORD_ATTRIBUTES = set(vars(logging.makeLogRecord({}))) | {"message", "asctime", "taskName"}
+
+def redact_text(text: str) -> str:
+    text = _BEARER_RE.sub(lambda m: m.group(1) + REDACTED, text)
+    text = _JWT_RE.sub(REDACTED, text)
+    return _EMAIL_RE.sub(REDACTED, text)
+
+def redact_value(value: Any, fields: frozenset) -> Any:
+    if isinstance(value, dict):
+        return {
+            key: REDACTED if str(key).lower() in fields else redact_value(item, fields)
+            for key, item in value.items()
+        }
+    if isinstance(value, (list, tuple)):
+        return [redact_value(item, fields) for item in value]
+    if isinstance(value, str):
+        return redact_text(value)
+    return value
+
+def record_extras(record: logging.LogRecord) -> Dict[str, Any]:
+    return {
+        key: value for key, value in vars(record).items()
+        if key not in _RECORD_ATTRIBUTES and not key.startswith("_")
+    }
+
+class RedactingFilter(logging.Filter):
+    """Redact sensitive `extra` fields and identifiers in the message."""
+    def __init__(self, fields: List[str]):
+        super().__init__()
+        self.fields = frozenset(field.lower() for field in fields)
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        record.msg = redact_text(record.getMessage())
+        record.args = None
+        for key, value in record_extras(record).items():
+            setattr(record, key, REDACTED if key.lower() in self.fields else redact_value(value, self.fields))
+        return True
+
+class SamplingFilter(logging.Filter):
+    """Keep a fraction of records below `level`; everything at or above passes."""
+    def __init__(self, rate: float, level: int = logging.INFO):
+        super().__init__()
+        self.rate = rate
+        self.level = level
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno >= self.level:
+            return True
+        return self.rate >= 1 or random.random() < self.rate
+
+class JsonFormatter(logging.Formatter):
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "timestamp": datetime.fromtimestamp(record.created, timezone.utc).isoformat(),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        entry.update(record_extras(record))
+        if record.exc_info:
+            entry["exception"] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str)
+
+class TextFormatter(logging.Formatter):
+    """Plain text with `extra` fields appended as key=value."""
+    def __init__(self):
+        super().__init__("%(asctime)s %(levelname)s %(name)s: %(message)s")
+
+    def format(self, record: logging.LogRecord) -> str:
+        text = super().format(record)
+        extras = record_extras(record)
+        if extras:
+            text += " " + " ".join(f"{key}={value}" for key, value in extras.items())
+        return text
+
+class NonBlockingQueueHandler(logging.handlers.QueueHandler):
+    """
+    Enqueue without blocking, dropping records when the queue is full.
+    Unlike the stdlib handler it doesn't format on the calling thread; the
+    message is only merged with its args so later mutation can't change it.
+    """
+    def __init__(self, log_queue: queue.Queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+        self._dropped_lock = threading.Lock()
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record.msg = record.getMessage()
+        record.args = None
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            with self._dropped_lock:
+                self.dropped += 1
+
+_listener: Optional[logging.handlers.QueueListener] = None
+_queue_handler: Optional[NonBlockingQueueHandler] = None
+
+def dropped_records() -> int:
+    return _queue_handler.dropped if _queue_handler is not None else 0
+
+def configure_logging() -> None:
+    """Route the root logger through the background queue. Safe to call twice."""
+    global _listener, _queue_handler
+    if _listener is not None:
+        return
+
+    output = logging.StreamHandler(sys.stdout)
+    output.setFormatter(JsonFormatter() if settings.LOG_FORMAT == "json" else TextFormatter())
+    output.addFilter(RedactingFilter(settings.LOG_REDACT_FIELDS))
+
+    _queue_handler = NonBlockingQueueHandler(queue.Queue(maxsize=settings.LOG_QUEUE_SIZE))
+    _queue_handler.addFilter(SamplingFilter(settings.LOG_DEBUG_SAMPLE_RATE))
+
+    root = logging.getLogger()
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+    root.addHandler(_queue_handler)
+    root.setLevel(settings.LOG_LEVEL.upper())
+
+    _listener = logging.handlers.QueueListener(_queue_handler.queue, output, respect_handler_level=True)
+    _listener.start()
+    atexit.register(shutdown_logging)
+
+def shutdown_logging() -> None:
+    """Flush queued records and stop the writer thread."""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
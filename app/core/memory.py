@@ -0,0 +1,231 @@
+"""
+Process memory accounting for the /admin/memory endpoints.
+
+- RSS and its high-water mark for the process (psutil when installed,
+  otherwise /proc; None where neither is available).
+- Memory attributed to each loaded model: the RSS growth across its load
+  and, for torch modules, the size of the parameters. RSS growth is
+  approximate when other threads allocate during the load.
+- tracemalloc snapshots kept in memory (newest MEMORY_MAX_SNAPSHOTS), with
+  top allocation sites and diffs between two snapshots. Tracing slows
+  allocations down, so it is started and stopped on demand.
+- track_peak() samples RSS while a request runs and records the peak
+  growth, for endpoints that hold uploads and models in memory.
+"""
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+from datetime import datetime
+from collections import OrderedDict
+import itertools
+import logging
+import os
+import sys
+import threading
+import tracemalloc
+
+from app.core import metrics
+from app.core.config import settings
+
+try:
+    import psutil
+except ImportError:  # Optional dependency
+    psutil = None
+
+try:
+    import resource
+except ImportError:  # Not on Windows
+    resource = None
+
+logger = logging.getLogger(__name__)
+
+_PAGE_SIZE = os.sysconf("SC_PAGE_SIZE") if hasattr(os, "sysconf") else 4096
+
+def rss_bytes() -> Optional[int]:
+    if psutil is not None:
+        return psutil.Process().memory_info().rss
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * _PAGE_SIZE
+    except (OSError, ValueError, IndexError):
+        return None
+
+def peak_rss_bytes() -> Optional[int]:
+    """Highest RSS of the process so far."""
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1]) * 1024
+    except (OSError, ValueError, IndexError):
+        pass
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Kilobytes on Linux, bytes on macOS
+    return peak if sys.platform == "darwin" else peak * 1024
+
+# Loaded models
+
+_models: Dict[str, Dict[str, Any]] = {}
+
+def _parameter_bytes(model: Any) -> Optional[int]:
+    parameters = getattr(model, "parameters", None)
+    if not callable(parameters):
+        return None
+    try:
+        return sum(p.numel() * p.element_size() for p in parameters())
+    except Exception:
+        return None
+
+@contextmanager
+def track_model_load(name: str) -> Iterator[Dict[str, Any]]:
+    """
+    Attribute the RSS growth of the block to model `name`. Put the loaded
+    object in the yielded dict under "model" to also count its parameters.
+    """
+    loaded: Dict[str, Any] = {}
+    before = rss_bytes()
+    yield loaded
+    after = rss_bytes()
+    _models[name] = {
+        "name": name,
+        "rss_delta_bytes": after - before if before is not None and after is not None else None,
+        "parameter_bytes": _parameter_bytes(loaded.get("model")),
+        "loaded_at": datetime.utcnow(),
+    }
+
+def loaded_models() -> List[Dict[str, Any]]:
+    return list(_models.values())
+
+# tracemalloc snapshots
+
+_snapshots: "OrderedDict[int, Tuple[datetime, tracemalloc.Snapshot]]" = OrderedDict()
+_snapshot_ids = itertools.count(1)
+_snapshot_lock = threading.Lock()
+
+def start_tracing(frames: int = 1) -> None:
+    if not tracemalloc.is_tracing():
+        tracemalloc.start(frames)
+
+def stop_tracing() -> None:
+    """Stop tracing and drop the stored snapshots (they hold their traces)."""
+    tracemalloc.stop()
+    with _snapshot_lock:
+        _snapshots.clear()
+
+def tracing_status() -> Dict[str, Any]:
+    traced, peak = tracemalloc.get_traced_memory()
+    return {
+        "tracing": tracemalloc.is_tracing(),
+        "traceback_limit": tracemalloc.get_traceback_limit(),
+        "traced_bytes": traced,
+        "peak_traced_bytes": peak,
+    }
+
+def take_snapshot() -> Tuple[int, datetime]:
+    """Store a snapshot of the traced allocations. Tracing must be on."""
+    snapshot = tracemalloc.take_snapshot().filter_traces((
+        tracemalloc.Filter(False, tracemalloc.__file__),
+        tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+        tracemalloc.Filter(False, "<unknown>"),
+    ))
+    taken_at = datetime.utcnow()
+    with _snapshot_lock:
+        snapshot_id = next(_snapshot_ids)
+        _snapshots[snapshot_id] = (taken_at, snapshot)
+        while len(_snapshots) > settings.MEMORY_MAX_SNAPSHOTS:
+            _snapshots.popitem(last=False)
+    return snapshot_id, taken_at
+
+def list_snapshots() -> List[Tuple[int, datetime]]:
+    with _snapshot_lock:
+        return [(snapshot_id, taken_at) for snapshot_id, (taken_at, _) in _snapshots.items()]
+
+def get_snapshot(snapshot_id: int) -> Optional[tracemalloc.Snapshot]:
+    with _snapshot_lock:
+        entry = _snapshots.get(snapshot_id)
+    return entry[1] if entry else None
+
+def _site(statistic: Any, group_by: str) -> Dict[str, Any]:
+    """
+    The allocating frame (tracebacks run oldest to most recent) and, when
+    grouped by traceback, every frame, most recent first.
+    """
+    frames = [f"{frame.filename}:{frame.lineno}" for frame in reversed(statistic.traceback)]
+    site: Dict[str, Any] = {"site": frames[0]}
+    if group_by == "traceback":
+        site["traceback"] = frames
+    return site
+
+def top_allocations(snapshot: tracemalloc.Snapshot, group_by: str = "lineno", limit: int = 20) -> List[Dict[str, Any]]:
+    return [
+        {**_site(stat, group_by), "size_bytes": stat.size, "count": stat.count}
+        for stat in snapshot.statistics(group_by)[:limit]
+    ]
+
+def compare_snapshots(
+    base: tracemalloc.Snapshot,
+    snapshot: tracemalloc.Snapshot,
+    group_by: str = "lineno",
+    limit: int = 20
+) -> List[Dict[str, Any]]:
+    """Allocation sites that grew (or shrank) the most from `base` to `snapshot`."""
+    return [
+        {
+            **_site(stat, group_by),
+            "size_bytes": stat.size,
+            "size_diff_bytes": stat.size_diff,
+            "count": stat.count,
+            "count_diff": stat.count_diff,
+        }
+        for stat in snapshot.compare_to(base, group_by)[:limit]
+    ]
+
+# Per-request high-water marks
+
+class _PeakSampler:
+    def __init__(self, interval: float):
+        self.interval = interval
+        self.start = rss_bytes()
+        self.peak = self.start
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="memory-peak-sampler", daemon=True)
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            self._sample()
+
+    def _sample(self) -> None:
+        current = rss_bytes()
+        if current is not None and (self.peak is None or current > self.peak):
+            self.peak = current
+
+    def __enter__(self) -> "_PeakSampler":
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self._stop.set()
+        self._thread.join()
+        self._sample()
+
+@contextmanager
+def track_peak(route: str) -> Iterator[None]:
+    """
+    Record how far RSS rose above its starting point while the block ran.
+    The process is shared, so concurrent requests inflate each other's
+    numbers; the histogram is meant for spotting outliers.
+    """
+    if rss_bytes() is None:
+        yield
+        return
+    with _PeakSampler(settings.MEMORY_PEAK_SAMPLE_INTERVAL_MS / 1000) as sampler:
+        yield
+    growth = max(sampler.peak - sampler.start, 0)
+    metrics.REQUEST_MEMORY_PEAK_BYTES.labels(route=route).observe(growth)
+    logger.info("Request memory", extra={
+        "route": route,
+        "rss_start_bytes": sampler.start,
+        "rss_peak_bytes": sampler.peak,
+        "rss_peak_growth_bytes": growth,
+    })
@@ -0,0 +1,220 @@
+"""
+Prometheus metrics, served at GET /metrics to METRICS_ALLOWED_NETWORKS
+(loopback by default) or to scrapes with "Authorization: Bearer
+<METRICS_TOKEN>".
+
+Requires prometheus_client; without it every metric is a no-op and
+/metrics answers 503. With several uvicorn workers, point
+PROMETHEUS_MULTIPROC_DIR at an empty directory before the workers start:
+each process then writes its samples to mmap files there and the scrape
+aggregates them, so no worker needs to see another's memory.
+
+Request latency and per-request SQL numbers come from the middleware in
+app.main; ASR and NLP timings from the services; pool usage from pool
+events. The pending-record queue is read from the database at scrape time.
+"""
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from typing import Any, Iterator, Optional, Tuple
+import logging
+import os
+import time
+from sqlalchemy import event, func
+from sqlalchemy.engine import Engine
+
+from app.db import instrumentation
+
+try:
+    import prometheus_client
+    from prometheus_client import multiprocess
+    from prometheus_client.core import GaugeMetricFamily
+except ImportError:  # Optional dependency
+    prometheus_client = None
+
+logger = logging.getLogger(__name__)
+
+class _NoopMetric:
+    def labels(self, *args: Any, **kwargs: Any) -> "_NoopMetric":
+        return self
+
+    def observe(self, value: float) -> None:
+        pass
+
+    def inc(self, amount: float = 1) -> None:
+        pass
+
+    def dec(self, amount: float = 1) -> None:
+        pass
+
+    def set(self, value: float) -> None:
+        pass
+
+def _metric(kind: str, name: str, documentation: str, labelnames: Tuple[str, ...], **kwargs: Any) -> Any:
+    if prometheus_client is None:
+        return _NoopMetric()
+    return getattr(prometheus_client, kind)(name, documentation, labelnames, **kwargs)
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+
+REQUEST_LATENCY = _metric(
+    "Histogram", "http_request_duration_seconds", "HTTP request latency",
+    ("method", "route", "status"), buckets=LATENCY_BUCKETS
+)
+REQUEST_DB_QUERIES = _metric(
+    "Histogram", "http_request_db_queries", "SQL statements per request",
+    ("method", "route"), buckets=(1, 2, 3, 5, 10, 20, 50, 100)
+)
+REQUEST_DB_SECONDS = _metric(
+    "Histogram", "http_request_db_seconds", "Time spent in SQL per request",
+    ("method", "route"), buckets=LATENCY_BUCKETS
+)
+
+TRANSCRIPTION_SECONDS = _metric(
+    "Histogram", "asr_transcription_seconds", "Time to transcribe one recording",
+    ("model_size",), buckets=(0.5, 1, 2.5, 5, 10, 30, 60, 120, 300, 600)
+)
+TRANSCRIPTION_REAL_TIME_FACTOR = _metric(
+    "Histogram", "asr_real_time_factor", "Transcription time divided by audio duration",
+    ("model_size",), buckets=(0.05, 0.1, 0.25, 0.5, 0.75, 1, 1.5, 2, 5)
+)
+NLP_STAGE_SECONDS = _metric(
+    "Histogram", "nlp_stage_seconds", "Time per medical data extraction stage",
+    ("stage",), buckets=(0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1, 5)
+)
+MODEL_LOAD_SECONDS = _metric(
+    "Gauge", "model_load_seconds", "Time the last load of a model took",
+    ("model",), multiprocess_mode="max"
+)
+REQUEST_MEMORY_PEAK_BYTES = _metric(
+    "Histogram", "http_request_memory_peak_bytes", "RSS growth above the start of the request",
+    ("route",), buckets=(1e6, 5e6, 10e6, 25e6, 50e6, 100e6, 250e6, 500e6, 1e9, 2e9)
+)
+
+DB_POOL_IN_USE = _metric(
+    "Gauge", "db_pool_connections_in_use", "Connections checked out of the pool",
+    ("engine",), multiprocess_mode="livesum"
+)
+DB_POOL_SIZE = _metric(
+    "Gauge", "db_pool_size", "Configured pool size (excluding overflow)",
+    ("engine",), multiprocess_mode="livesum"
+)
+
+@contextmanager
+def timed(metric: Any) -> Iterator[None]:
+    """Observe the duration of the block on a (labelled) histogram or gauge."""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        duration = time.perf_counter() - start
+        if hasattr(metric, "observe"):
+            metric.observe(duration)
+        else:
+            metric.set(duration)
+
+def observe_transcription(model_size: str, seconds: float, audio_seconds: Optional[float]) -> None:
+    TRANSCRIPTION_SECONDS.labels(model_size=model_size).observe(seconds)
+    if audio_seconds:
+        TRANSCRIPTION_REAL_TIME_FACTOR.labels(model_size=model_size).observe(seconds / audio_seconds)
+
+def observe_request(method: str, route: str, status: int, seconds: float) -> None:
+    REQUEST_LATENCY.labels(method=method, route=route, status=str(status)).observe(seconds)
+
+def _observe_query_stats(method: str, route: str, stats: instrumentation.QueryStats) -> None:
+    REQUEST_DB_QUERIES.labels(method=method, route=route).observe(stats.count)
+    REQUEST_DB_SECONDS.labels(method=method, route=route).observe(stats.total_time)
+
+def instrument_pool(engine: Engine, name: str) -> None:
+    in_use = DB_POOL_IN_USE.labels(engine=name)
+    size = getattr(engine.pool, "size", None)
+    if callable(size):
+        DB_POOL_SIZE.labels(engine=name).set(size())
+
+    @event.listens_for(engine, "checkout")
+    def _checkout(dbapi_connection, connection_record, connection_proxy) -> None:
+        in_use.inc()
+
+    @event.listens_for(engine, "checkin")
+    def _checkin(dbapi_connection, connection_record) -> None:
+        in_use.dec()
+
+    @event.listens_for(engine, "detach")
+    def _detach(dbapi_connection, connection_record) -> None:
+        # Detached connections (e.g. LISTEN threads) never check in
+        in_use.dec()
+
+class PendingRecordsCollector:
+    """Depth and age of the clinical record processing queue, read per scrape."""
+    def _families(self):
+        return (
+            GaugeMetricFamily(
+                "clinical_records_pending", "Clinical records waiting for processing"
+            ),
+            GaugeMetricFamily(
+                "clinical_records_pending_oldest_age_seconds",
+                "Age of the oldest clinical record waiting for processing"
+            )
+        )
+
+    def describe(self):
+        # Lets the registry learn the names without querying the database
+        return list(self._families())
+
+    def collect(self):
+        from app.db.database import SessionLocal
+        from app.models.patient import ClinicalRecord
+
+        depth, age = self._families()
+        db = SessionLocal()
+        try:
+            count, oldest = db.query(func.count(ClinicalRecord.id), func.min(ClinicalRecord.created_at))\
+                .filter(ClinicalRecord.processing_status == "pending")\
+                .one()
+            depth.add_metric([], count)
+            age.add_metric([], (time.time() - _utc_timestamp(oldest)) if oldest else 0)
+        except Exception as e:
+            logger.error(f"Failed to read the pending record queue: {e}")
+            return
+        finally:
+            db.close()
+        yield depth
+        yield age
+
+def _utc_timestamp(value: datetime) -> float:
+    # Timestamps are stored as naive UTC
+    return value.replace(tzinfo=timezone.utc).timestamp()
+
+_configured = False
+
+def configure_metrics() -> None:
+    """Hook the collectors up to the engines and the SQL instrumentation. Runs once."""
+    global _configured
+    if _configured or prometheus_client is None:
+        return
+    from app.db.database import engine, replica_router
+
+    instrumentation.request_observers.append(_observe_query_stats)
+    instrument_pool(engine, "primary")
+    for index, replica in enumerate(replica_router.engines):
+        instrument_pool(replica, f"replica{index}")
+    if not _multiprocess_dir():
+        prometheus_client.REGISTRY.register(PendingRecordsCollector())
+    _configured = True
+
+def _multiprocess_dir() -> Optional[str]:
+    return os.environ.get("PROMETHEUS_MULTIPROC_DIR") or os.environ.get("prometheus_multiproc_dir")
+
+def render_latest() -> Tuple[bytes, str]:
+    """Exposition-format payload and its content type."""
+    if _multiprocess_dir():
+        registry = prometheus_client.CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+        registry.register(PendingRecordsCollector())
+    else:
+        registry = prometheus_client.REGISTRY
+    return prometheus_client.generate_latest(registry), prometheus_client.CONTENT_TYPE_LATEST
+
+def mark_process_dead() -> None:
+    """Drop this worker's live gauges from the multiprocess directory."""
+    if prometheus_client is not None and _multiprocess_dir():
+        multiprocess.mark_process_dead(os.getpid())
@@ -0,0 +1,151 @@
+"""
+TTL cache of authenticated doctors for get_current_doctor.
+
+Entries are column snapshots, not ORM instances, so nothing is shared
+between sessions: a hit is rebuilt into a Doctor and attached to the
+request's session without a query. update_doctor and delete_doctor
+invalidate the entry; with PRINCIPAL_CACHE_NOTIFY on Postgres the
+invalidation is also sent to the other workers via LISTEN/NOTIFY.
+"""
+from typing import Any, Dict, Optional, Tuple
+from collections import OrderedDict
+import logging
+import select
+import threading
+import time
+from sqlalchemy import inspect, text
+from sqlalchemy.orm import Session, make_transient_to_detached
+
+from app.core.config import settings
+from app.models.doctor import Doctor
+
+logger = logging.getLogger(__name__)
+
+NOTIFY_CHANNEL = "principal_cache"
+
+class PrincipalCache:
+    def __init__(self, ttl: float, max_entries: int):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[int, Tuple[float, Dict[str, Any]]]" = OrderedDict()
+        self._generations: Dict[int, int] = {}
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self) -> bool:
+        return self.ttl > 0
+
+    def generation(self, doctor_id: int) -> int:
+        """Changes whenever the doctor is invalidated; guards put() against stale loads."""
+        return self._generations.get(doctor_id, 0)
+
+    def get(self, doctor_id: int) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            entry = self._entries.get(doctor_id)
+            if entry is None:
+                return None
+            expires_at, snapshot = entry
+            if time.monotonic() >= expires_at:
+                del self._entries[doctor_id]
+                return None
+            self._entries.move_to_end(doctor_id)
+            return snapshot
+
+    def put(self, doctor: Doctor, generation: int) -> None:
+        snapshot = {attr.key: getattr(doctor, attr.key) for attr in inspect(Doctor).column_attrs}
+        with self._lock:
+            # Skip if the doctor changed while this copy was being loaded
+            if self._generations.get(doctor.id, 0) != generation:
+                return
+            self._entries[doctor.id] = (time.monotonic() + self.ttl, snapshot)
+            self._entries.move_to_end(doctor.id)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, doctor_id: int) -> None:
+        with self._lock:
+            self._entries.pop(doctor_id, None)
+            self._generations[doctor_id] = self._generations.get(doctor_id, 0) + 1
+
+    def clear(self) -> None:
+        with self._lock:
+            for doctor_id in self._entries:
+                self._generations[doctor_id] = self._generations.get(doctor_id, 0) + 1
+            self._entries.clear()
+
+    @staticmethod
+    def attach(db: Session, snapshot: Dict[str, Any]) -> Doctor:
+        """Rebuild a cached doctor as a persistent instance of `db` without a query."""
+        doctor = Doctor(**snapshot)
+        make_transient_to_detached(doctor)
+        return db.merge(doctor, load=False)
+
+principal_cache = PrincipalCache(
+    ttl=settings.PRINCIPAL_CACHE_TTL_SECONDS,
+    max_entries=settings.PRINCIPAL_CACHE_MAX_ENTRIES
+)
+
+def _notify_enabled() -> bool:
+    from app.db.database import engine
+    return settings.PRINCIPAL_CACHE_NOTIFY and engine.dialect.name == "postgresql"
+
+def invalidate_principal(doctor_id: int) -> None:
+    """Drop a doctor from this worker's cache and, if enabled, from the others'."""
+    principal_cache.invalidate(doctor_id)
+    if not _notify_enabled():
+        return
+    from app.db.database import engine
+    try:
+        with engine.connect() as conn:
+            conn.execute(text("SELECT pg_notify(:channel, :payload)"), {
+                "channel": NOTIFY_CHANNEL, "payload": str(doctor_id)
+            })
+            conn.commit()
+    except Exception as e:
+        logger.error(f"Failed to broadcast principal cache invalidation: {e}")
+
+def _listen_for_invalidations() -> None:
+    from app.db.database import engine
+    while True:
+        raw_connection = None
+        try:
+            raw_connection = engine.raw_connection()
+            raw_connection.detach()
+            connection = raw_connection.dbapi_connection
+            connection.autocommit = True
+            with connection.cursor() as cursor:
+                cursor.execute(f"LISTEN {NOTIFY_CHANNEL}")
+            # Anything invalidated before LISTEN took effect was missed
+            principal_cache.clear()
+            while True:
+                if select.select([connection], [], [], 5.0) == ([], [], []):
+                    continue
+                connection.poll()
+                while connection.notifies:
+                    notification = connection.notifies.pop(0)
+                    principal_cache.invalidate(int(notification.payload))
+        except Exception as e:
+            logger.error(f"Principal cache listener failed, retrying: {e}")
+            principal_cache.clear()
+            if raw_connection is not None:
+                try:
+                    raw_connection.close()
+                except Exception:
+                    pass
+            time.sleep(5)
+
+_listener_started = False
+_listener_lock = threading.Lock()
+
+def start_invalidation_listener() -> None:
+    """Start the LISTEN thread once per worker when cross-worker invalidation is on."""
+    global _listener_started
+    if not principal_cache.enabled or not _notify_enabled():
+        return
+    with _listener_lock:
+        if _listener_started:
+            return
+        threading.Thread(
+            target=_listen_for_invalidations, name="principal-cache-listener", daemon=True
+        ).start()
+        _listener_started = True
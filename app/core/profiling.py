@@ -0,0 +1,157 @@
+"""
+Sampling profiler for single requests.
+
+While a request is profiled, a background thread reads the Python stacks
+of every busy thread (sys._current_frames) every PROFILE_INTERVAL_MS.
+Sync endpoints run in Starlette's threadpool rather than on the event
+loop, so a profiler bound to one thread would miss them. Threads parked in
+a wait (idle pool workers, the idle event loop) are skipped; under
+concurrent traffic other requests' threads can still show up, each as its
+own profile in the output.
+
+Profiles are written in speedscope's format (open them at
+https://www.speedscope.app) to PROFILE_DIR, which keeps the newest
+PROFILE_MAX_FILES. Admins profile a request by sending `X-Profile: 1`
+(or `?profile=1`) and fetch the result from /admin/profiles/{id};
+PROFILE_EVERY_N_REQUESTS > 0 also profiles one request in N.
+"""
+from typing import Any, Dict, List, Optional, Tuple
+from datetime import datetime
+from pathlib import Path
+import itertools
+import json
+import os
+import re
+import sys
+import threading
+import time
+import uuid
+
+from app.core.config import settings
+
+PROFILE_SUFFIX = ".speedscope.json"
+_PROFILE_ID_RE = re.compile(r"^[\w-]+$")
+
+# Innermost frames of threads that are waiting rather than working
+_IDLE_FRAMES = {
+    ("threading.py", "wait"),
+    ("selectors.py", "select"),
+    ("queue.py", "get"),
+    ("thread.py", "_worker"),  # concurrent.futures pool, blocked on its queue
+}
+
+class RequestProfiler:
+    def __init__(self, interval: Optional[float] = None):
+        self.interval = interval if interval is not None else settings.PROFILE_INTERVAL_MS / 1000
+        self._frames: List[Dict[str, Any]] = []
+        self._frame_index: Dict[Tuple[str, str, int], int] = {}
+        # thread name -> (stacks, weights)
+        self._samples: Dict[str, Tuple[List[List[int]], List[float]]] = {}
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self.duration = 0.0
+
+    def start(self) -> None:
+        self._started = time.perf_counter()
+        self._thread = threading.Thread(target=self._run, name="request-profiler", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        self._thread.join()
+        self.duration = time.perf_counter() - self._started
+
+    def _run(self) -> None:
+        own = threading.get_ident()
+        last = time.perf_counter()
+        while not self._stop.wait(self.interval):
+            now = time.perf_counter()
+            self._sample(own, now - last)
+            last = now
+
+    def _sample(self, own: int, weight: float) -> None:
+        names = {thread.ident: thread.name for thread in threading.enumerate()}
+        for ident, frame in sys._current_frames().items():
+            if ident == own:
+                continue
+            code = frame.f_code
+            if (os.path.basename(code.co_filename), code.co_name) in _IDLE_FRAMES:
+                continue
+            stack = []
+            while frame is not None:
+                stack.append(self._frame_id(frame.f_code))
+                frame = frame.f_back
+            stack.reverse()
+            stacks, weights = self._samples.setdefault(names.get(ident, str(ident)), ([], []))
+            stacks.append(stack)
+            weights.append(weight)
+
+    def _frame_id(self, code: Any) -> int:
+        key = (code.co_filename, getattr(code, "co_qualname", code.co_name), code.co_firstlineno)
+        index = self._frame_index.get(key)
+        if index is None:
+            index = self._frame_index[key] = len(self._frames)
+            self._frames.append({"name": key[1], "file": key[0], "line": key[2]})
+        return index
+
+    def speedscope(self, name: str) -> Dict[str, Any]:
+        return {
+            "$schema": "https://www.speedscope.app/file-format-schema.json",
+            "name": name,
+            "exporter": "medicai request profiler",
+            "shared": {"frames": self._frames},
+            "profiles": [
+                {
+                    "type": "sampled",
+                    "name": thread_name,
+                    "unit": "seconds",
+                    "startValue": 0,
+                    "endValue": self.duration,
+                    "samples": stacks,
+                    "weights": weights,
+                }
+                for thread_name, (stacks, weights) in self._samples.items()
+            ],
+        }
+
+class ProfileStore:
+    """Rolling directory of profiles, newest PROFILE_MAX_FILES kept."""
+    def __init__(self, directory: Optional[str] = None, max_files: Optional[int] = None):
+        self.directory = Path(directory or settings.PROFILE_DIR)
+        self.max_files = max_files if max_files is not None else settings.PROFILE_MAX_FILES
+        self._lock = threading.Lock()
+
+    def save(self, profile: Dict[str, Any]) -> str:
+        self.directory.mkdir(parents=True, exist_ok=True)
+        profile_id = f"{datetime.utcnow():%Y%m%dT%H%M%S}-{uuid.uuid4().hex[:8]}"
+        with open(self.directory / (profile_id + PROFILE_SUFFIX), "w") as f:
+            json.dump(profile, f)
+        with self._lock:
+            for stale in self.list()[self.max_files:]:
+                stale.unlink(missing_ok=True)
+        return profile_id
+
+    def list(self) -> List[Path]:
+        """Stored profiles, newest first."""
+        if not self.directory.is_dir():
+            return []
+        return sorted(self.directory.glob("*" + PROFILE_SUFFIX), reverse=True)
+
+    def path(self, profile_id: str) -> Optional[Path]:
+        if not _PROFILE_ID_RE.match(profile_id):
+            return None
+        path = self.directory / (profile_id + PROFILE_SUFFIX)
+        return path if path.is_file() else None
+
+store = ProfileStore()
+
+_request_counter = itertools.count(1)
+
+def sample_this_request() -> bool:
+    """True for one request in PROFILE_EVERY_N_REQUESTS (never when 0)."""
+    every = settings.PROFILE_EVERY_N_REQUESTS
+    return every > 0 and next(_request_counter) % every == 0
+
+def profile_requested(headers: Any, query_params: Any) -> bool:
+    flag = headers.get("x-profile") or query_params.get("profile")
+    return flag is not None and flag.lower() in ("1", "true", "yes")
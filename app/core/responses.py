@@ -0,0 +1,119 @@
+"""
+JSON response helpers.
+
+ORJSONResponse renders with orjson and falls back to the standard json
+module when orjson is not installed. It becomes the application's default
+response class with ORJSON_DEFAULT_RESPONSE; leave that off on FastAPI
+releases that dump response_model data to JSON bytes with pydantic-core,
+which they only do for the built-in default class.
+
+model_list_response() is the fast path for large list endpoints. Rows
+coming from our own database were validated on the way in, so instead of
+validating every ORM attribute again (FastAPI's response_model handling,
+which dominates the CPU cost of big listings) it copies just the schema's
+fields into plain dicts and dumps them with orjson, producing the same
+bytes as pydantic. Schemas with validators or custom serializers take
+the pydantic path. Endpoints using it keep their response_model for the
+OpenAPI schema.
+"""
+from typing import Any, Iterable, List, Optional, Tuple, Type, Union, get_args, get_origin
+from decimal import Decimal
+from functools import lru_cache
+from fastapi.responses import JSONResponse, Response
+from pydantic import BaseModel, TypeAdapter
+
+try:
+    import orjson
+except ImportError:  # Optional dependency
+    orjson = None
+
+def _orjson_default(value: Any) -> Any:
+    if isinstance(value, Decimal):
+        return float(value)
+    raise TypeError(f"Type is not JSON serializable: {type(value).__name__}")
+
+def dumps(content: Any) -> bytes:
+    # UTC as "Z", like pydantic
+    return orjson.dumps(content, default=_orjson_default, option=orjson.OPT_NON_STR_KEYS | orjson.OPT_UTC_Z)
+
+class ORJSONResponse(JSONResponse):
+    def render(self, content: Any) -> bytes:
+        if orjson is None:
+            return super().render(content)
+        return dumps(content)
+
+_REQUIRED = object()
+
+# (output key, attribute name, default, nested field plan or None, is a list)
+FieldPlan = Tuple[Tuple[str, str, Any, Optional[tuple], bool], ...]
+
+def _nested_model(annotation: Any) -> Tuple[Optional[Type[BaseModel]], bool]:
+    """The schema held by a field annotation, and whether it is a list of them."""
+    origin = get_origin(annotation)
+    if origin is Union:
+        args = [arg for arg in get_args(annotation) if arg is not type(None)]
+        return _nested_model(args[0]) if len(args) == 1 else (None, False)
+    if origin in (list, List):
+        args = get_args(annotation)
+        model = _nested_model(args[0])[0] if args else None
+        return model, model is not None
+    if isinstance(annotation, type) and issubclass(annotation, BaseModel):
+        return annotation, False
+    return None, False
+
+@lru_cache(maxsize=None)
+def _field_plan(model: Type[BaseModel]) -> Optional[FieldPlan]:
+    """How to copy `model`'s fields off an object; None if it customizes validation or serialization."""
+    decorators = model.__pydantic_decorators__
+    if any((
+        decorators.validators, decorators.field_validators, decorators.root_validators,
+        decorators.model_validators, decorators.field_serializers, decorators.model_serializers,
+        decorators.computed_fields
+    )):
+        return None
+    plan = []
+    for name, field in model.model_fields.items():
+        nested, is_list = _nested_model(field.annotation)
+        nested_plan = None
+        if nested is not None:
+            nested_plan = _field_plan(nested)
+            if nested_plan is None:
+                return None
+        key = field.serialization_alias or field.alias or name
+        default = _REQUIRED if field.is_required() else field.get_default(call_default_factory=True)
+        plan.append((key, name, default, nested_plan, is_list))
+    return tuple(plan)
+
+def _copy_fields(obj: Any, plan: FieldPlan) -> dict:
+    data = {}
+    for key, attr, default, nested_plan, is_list in plan:
+        value = getattr(obj, attr) if default is _REQUIRED else getattr(obj, attr, default)
+        if nested_plan is not None and value is not None:
+            if is_list:
+                value = [_copy_fields(item, nested_plan) for item in value]
+            else:
+                value = _copy_fields(value, nested_plan)
+        data[key] = value
+    return data
+
+@lru_cache(maxsize=None)
+def _list_adapter(model: Type[BaseModel]) -> TypeAdapter:
+    return TypeAdapter(List[model])
+
+def validated_json(model: Type[BaseModel], rows: Iterable[Any]) -> bytes:
+    """The regular pydantic serialization of `rows` as a list of `model`."""
+    adapter = _list_adapter(model)
+    return adapter.dump_json(adapter.validate_python(list(rows), from_attributes=True))
+
+def model_list_response(model: Type[BaseModel], rows: Iterable[Any], status_code: int = 200) -> Response:
+    """
+    Serialize ORM rows as a JSON list of `model` without re-validating them.
+    Schemas with custom serializers, or a missing orjson, take the regular
+    pydantic path (one validate + dump_json pass).
+    """
+    plan = _field_plan(model) if orjson is not None else None
+    if plan is not None:
+        content = dumps([_copy_fields(row, plan) for row in rows])
+    else:
+        content = validated_json(model, rows)
+    return Response(content=content, status_code=status_code, media_type="application/json")
@@ -1,5 +1,8 @@
 from datetime import datetime, timedelta
-from typing import Any, Union
+from typing import Any, Callable, Optional, Tuple, Union
+from concurrent.futures import ThreadPoolExecutor
+import asyncio
+import os
 from jose import jwt
 from passlib.context import CryptContext
 from pydantic import BaseModel
@@ -33,3 +36,51 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
 
 def get_password_hash(password: str) -> str:
     return pwd_context.hash(password)
+
+class PasswordHashingBusy(Exception):
+    """No password hashing slot became free within PASSWORD_HASH_QUEUE_TIMEOUT_SECONDS."""
+
+# bcrypt releases the GIL while hashing, so a thread pool spreads the work
+# over cores without blocking the event loop. The pool is kept smaller than
+# the core count so a login storm can't starve the rest of the API.
+PASSWORD_HASH_WORKERS = settings.PASSWORD_HASH_WORKERS or max(1, (os.cpu_count() or 2) // 2)
+
+_password_executor = ThreadPoolExecutor(
+    max_workers=PASSWORD_HASH_WORKERS, thread_name_prefix="password-hash"
+)
+_password_slots: Optional[Tuple[asyncio.AbstractEventLoop, asyncio.Semaphore]] = None
+_password_waiters = 0
+
+def _get_password_slots() -> asyncio.Semaphore:
+    global _password_slots
+    loop = asyncio.get_running_loop()
+    if _password_slots is None or _password_slots[0] is not loop:
+        _password_slots = (loop, asyncio.Semaphore(PASSWORD_HASH_WORKERS))
+    return _password_slots[1]
+
+async def _run_password_operation(operation: Callable, *args: Any) -> Any:
+    global _password_waiters
+    slots = _get_password_slots()
+    if _password_waiters >= settings.PASSWORD_HASH_MAX_QUEUE:
+        raise PasswordHashingBusy()
+
+    _password_waiters += 1
+    try:
+        await asyncio.wait_for(slots.acquire(), timeout=settings.PASSWORD_HASH_QUEUE_TIMEOUT_SECONDS)
+    except asyncio.TimeoutError:
+        raise PasswordHashingBusy()
+    finally:
+        _password_waiters -= 1
+
+    try:
+        return await asyncio.get_running_loop().run_in_executor(_password_executor, operation, *args)
+    finally:
+        slots.release()
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    """verify_password on the bounded password pool, for async endpoints."""
+    return await _run_password_operation(verify_password, plain_password, hashed_password)
+
+async def get_password_hash_async(password: str) -> str:
+    """get_password_hash on the bounded password pool, for async endpoints."""
+    return await _run_password_operation(get_password_hash, password)
@@ -0,0 +1,133 @@
+"""
+Distributed tracing with OpenTelemetry.
+
+Requires opentelemetry-sdk; without it, or with TRACING_EXPORTER=none,
+span() is a no-op and current_trace_id() returns None. Exporters:
+
+    otlp  OTLP/HTTP to a collector (TRACING_OTLP_ENDPOINT, or the standard
+          OTEL_EXPORTER_OTLP_* environment variables)
+    file  OTLP/JSON, one export request per line, to TRACING_FILE_PATH
+          (readable by the collector's otlpjsonfile receiver)
+
+The middleware in app.main opens a server span per request, continuing a
+W3C traceparent sent by the client. The span context lives in a context
+variable, so it follows the request into asyncio tasks and Starlette's
+threadpool. Work handed to another process carries it in a carrier:
+
+    carrier = tracing.inject_context()      # store with the job
+    with tracing.span("worker.process", carrier=carrier):
+        ...
+"""
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, Optional
+import logging
+import threading
+
+from app.core.config import settings
+
+try:
+    from opentelemetry import propagate, trace
+    from opentelemetry.sdk.resources import Resource
+    from opentelemetry.sdk.trace import TracerProvider
+    from opentelemetry.sdk.trace.export import BatchSpanProcessor, SpanExporter, SpanExportResult
+    from opentelemetry.sdk.trace.sampling import ParentBased, TraceIdRatioBased
+    from opentelemetry.trace import SpanKind, Status, StatusCode
+except ImportError:  # Optional dependency
+    trace = None
+    SpanExporter = object
+
+logger = logging.getLogger(__name__)
+
+_tracer = None
+_provider = None
+
+class OTLPJsonFileExporter(SpanExporter):
+    """Append spans to a file as OTLP/JSON export requests."""
+    def __init__(self, path: str):
+        from google.protobuf.json_format import MessageToJson
+        from opentelemetry.exporter.otlp.proto.common.trace_encoder import encode_spans
+
+        self._encode = encode_spans
+        self._to_json = MessageToJson
+        self._file = open(path, "a", encoding="utf-8")
+        self._lock = threading.Lock()
+
+    def export(self, spans) -> "SpanExportResult":
+        line = self._to_json(self._encode(spans), indent=None)
+        with self._lock:
+            self._file.write(line + "\n")
+            self._file.flush()
+        return SpanExportResult.SUCCESS
+
+    def shutdown(self) -> None:
+        with self._lock:
+            self._file.close()
+
+def _exporter(kind: str) -> Any:
+    if kind == "otlp":
+        from opentelemetry.exporter.otlp.proto.http.trace_exporter import OTLPSpanExporter
+        return OTLPSpanExporter(endpoint=settings.TRACING_OTLP_ENDPOINT)
+    if kind == "file":
+        return OTLPJsonFileExporter(settings.TRACING_FILE_PATH)
+    raise ValueError(f"Unknown TRACING_EXPORTER: {kind}")
+
+def configure_tracing() -> None:
+    """Install the tracer provider and exporter from Settings. Runs once."""
+    global _tracer, _provider
+    if _tracer is not None or settings.TRACING_EXPORTER == "none":
+        return
+    if trace is None:
+        logger.warning("TRACING_EXPORTER is set but opentelemetry-sdk is not installed")
+        return
+
+    _provider = TracerProvider(
+        resource=Resource.create({"service.name": settings.TRACING_SERVICE_NAME}),
+        sampler=ParentBased(TraceIdRatioBased(settings.TRACING_SAMPLE_RATIO))
+    )
+    _provider.add_span_processor(BatchSpanProcessor(_exporter(settings.TRACING_EXPORTER)))
+    _tracer = _provider.get_tracer("app")
+
+def shutdown_tracing() -> None:
+    """Export buffered spans."""
+    global _tracer, _provider
+    if _provider is not None:
+        _provider.shutdown()
+    _tracer = _provider = None
+
+@contextmanager
+def span(name: str, carrier: Optional[Dict[str, str]] = None, server: bool = False, **attributes: Any) -> Iterator[Any]:
+    """
+    Trace the block as a child of the current span, or of the context in
+    `carrier` (see inject_context). Yields the span, or None when tracing
+    is off. Exceptions are recorded on the span and re-raised.
+    """
+    if _tracer is None:
+        yield None
+        return
+    context = propagate.extract(carrier) if carrier is not None else None
+    kind = SpanKind.SERVER if server else SpanKind.INTERNAL
+    with _tracer.start_as_current_span(name, context=context, kind=kind) as current:
+        for key, value in attributes.items():
+            if value is not None:
+                current.set_attribute(key, value)
+        yield current
+
+def set_error(current: Any, description: str) -> None:
+    if current is not None:
+        current.set_status(Status(StatusCode.ERROR, description))
+
+def inject_context() -> Dict[str, str]:
+    """The current span context as W3C trace headers."""
+    carrier: Dict[str, str] = {}
+    if _tracer is not None:
+        propagate.inject(carrier)
+    return carrier
+
+def current_trace_id() -> Optional[str]:
+    """Hex id of the current trace, if a sampled span is active."""
+    if _tracer is None:
+        return None
+    context = trace.get_current_span().get_span_context()
+    if not context.is_valid or not context.trace_flags.sampled:
+        return None
+    return format(context.trace_id, "032x")
@@ -2,6 +2,7 @@ from typing import List, Optional
 from sqlalchemy.orm import Session
 from fastapi.encoders import jsonable_encoder
 from app.core.security import get_password_hash
+from app.core.principal_cache import principal_cache, invalidate_principal
 from app.models.doctor import Doctor, DoctorType
 from app.schemas.doctor import DoctorCreate, DoctorUpdate
 from datetime import date
@@ -9,6 +10,24 @@ from datetime import date
 def get_doctor(db: Session, doctor_id: int) -> Optional[Doctor]:
     return db.query(Doctor).filter(Doctor.id == doctor_id).first()
 
+def get_doctor_cached(db: Session, doctor_id: int) -> Optional[Doctor]:
+    """
+    get_doctor through the principal cache, for resolving the authenticated
+    doctor on every request. A hit is attached to `db` without a query.
+    """
+    if not principal_cache.enabled:
+        return get_doctor(db, doctor_id)
+
+    snapshot = principal_cache.get(doctor_id)
+    if snapshot is not None:
+        return principal_cache.attach(db, snapshot)
+
+    generation = principal_cache.generation(doctor_id)
+    doctor = get_doctor(db, doctor_id)
+    if doctor:
+        principal_cache.put(doctor, generation)
+    return doctor
+
 def get_doctor_by_email(db: Session, email: str) -> Optional[Doctor]:
     return db.query(Doctor).filter(Doctor.email == email).first()
 
@@ -23,10 +42,11 @@ def get_doctors(
         query = query.filter(Doctor.doctor_type == doctor_type)
     return query.offset(skip).limit(limit).all()
 
-def create_doctor(db: Session, doctor: DoctorCreate) -> Doctor:
+def create_doctor(db: Session, doctor: DoctorCreate, hashed_password: Optional[str] = None) -> Doctor:
+    """Create a doctor; async callers pass a hash computed off the event loop."""
     db_doctor = Doctor(
         email=doctor.email,
-        hashed_password=get_password_hash(doctor.password),
+        hashed_password=hashed_password or get_password_hash(doctor.password),
         first_name=doctor.first_name,
         last_name=doctor.last_name,
         medical_license_number=doctor.medical_license_number,
@@ -71,6 +91,7 @@ def update_doctor(
     
     db.add(db_doctor)
     db.commit()
+    invalidate_principal(db_doctor.id)
     db.refresh(db_doctor)
     return db_doctor
 
@@ -79,4 +100,5 @@ def delete_doctor(db: Session, doctor_id: int) -> Optional[Doctor]:
     if doctor:
         db.delete(doctor)
         db.commit()
+        invalidate_principal(doctor_id)
     return doctor
@@ -0,0 +1,146 @@
+from sqlalchemy import Integer, cast, func, insert
+from sqlalchemy.orm import Session
+from sqlalchemy.sql.elements import ColumnElement
+from typing import Any, Dict, List, Optional
+from datetime import datetime
+import re
+from app.models.observation import Observation
+from app.models.patient import ClinicalRecord
+
+# extracted_data["vital_signs"] key -> (observation code, unit)
+VITAL_SIGN_CODES = {
+    "heart_rate": ("heart_rate", "bpm"),
+    "temperature": ("temperature", None),
+    "respiratory_rate": ("respiratory_rate", "breaths/min"),
+    "oxygen_saturation": ("oxygen_saturation", "%"),
+}
+
+MEDICATION_CODE = "medication"
+
+_NUMBER_PATTERN = re.compile(r"-?\d+(?:\.\d+)?")
+
+def _to_number(value: Any) -> Optional[float]:
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return float(value)
+    if isinstance(value, str):
+        match = _NUMBER_PATTERN.search(value)
+        if match:
+            return float(match.group())
+    return None
+
+def observations_from_extracted_data(extracted_data: Optional[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    Flatten the vital signs and medications of an extract_medical_data result
+    into observation rows (code, value_num, value_text, unit).
+    """
+    if not extracted_data:
+        return []
+
+    rows = []
+    vital_signs = extracted_data.get("vital_signs") or {}
+
+    blood_pressure = vital_signs.get("blood_pressure")
+    if isinstance(blood_pressure, str) and "/" in blood_pressure:
+        systolic, diastolic = (_to_number(part) for part in blood_pressure.split("/", 1))
+        if systolic is not None and diastolic is not None:
+            rows.append({"code": "bp_systolic", "value_num": systolic, "value_text": None, "unit": "mmHg"})
+            rows.append({"code": "bp_diastolic", "value_num": diastolic, "value_text": None, "unit": "mmHg"})
+
+    for key, (code, unit) in VITAL_SIGN_CODES.items():
+        value = _to_number(vital_signs.get(key))
+        if value is not None:
+            rows.append({"code": code, "value_num": value, "value_text": None, "unit": unit})
+
+    for medication in extracted_data.get("medications") or []:
+        rows.append({"code": MEDICATION_CODE, "value_num": None, "value_text": str(medication), "unit": None})
+
+    return rows
+
+def add_record_observations(db: Session, record: ClinicalRecord) -> int:
+    """
+    Insert the observations of a flushed clinical record in one executemany.
+    The caller owns the transaction so record and observations commit together.
+    Returns the number of observations added.
+    """
+    rows = [
+        dict(
+            patient_id=record.patient_id,
+            clinical_record_id=record.id,
+            recorded_at=record.recorded_at,
+            **row
+        )
+        for row in observations_from_extracted_data(record.extracted_data)
+    ]
+    if rows:
+        db.execute(insert(Observation.__table__), rows)
+    return len(rows)
+
+def _bucket_index(dialect: str, start: datetime, bucket_seconds: float, buckets: int) -> ColumnElement:
+    """SQL for the equal-width bucket (0 .. buckets - 1) an observation falls into."""
+    if dialect == "sqlite":
+        # Julian days are floats: round to milliseconds so bucket edges stay exact
+        elapsed = func.round((func.julianday(Observation.recorded_at) - func.julianday(start)) * 86400.0, 3)
+        return func.min(cast(elapsed / bucket_seconds, Integer), buckets - 1)
+    elapsed = func.extract("epoch", Observation.recorded_at - start)
+    return func.least(cast(func.floor(elapsed / bucket_seconds), Integer), buckets - 1)
+
+def get_observation_series(
+    db: Session,
+    patient_id: int,
+    code: str,
+    start: datetime,
+    end: datetime,
+    buckets: int = 200
+) -> Dict[str, Any]:
+    """
+    Downsampled time series of one observation code for a patient.
+    The database aggregates the (patient_id, code, recorded_at) index range
+    into at most `buckets` equal-width time buckets, so only those rows
+    come back.
+    """
+    buckets = max(buckets, 1)
+    bucket_width = (end - start) / buckets
+    bucketed = db.query(
+            _bucket_index(
+                db.get_bind().dialect.name, start, bucket_width.total_seconds(), buckets
+            ).label("bucket"),
+            Observation.value_num,
+            Observation.unit
+        )\
+        .filter(
+            Observation.patient_id == patient_id,
+            Observation.code == code,
+            Observation.recorded_at >= start,
+            Observation.recorded_at < end
+        )\
+        .subquery()
+    rows = db.query(
+            bucketed.c.bucket,
+            func.count().label("count"),
+            func.min(bucketed.c.value_num).label("min"),
+            func.max(bucketed.c.value_num).label("max"),
+            func.avg(bucketed.c.value_num).label("avg"),
+            func.max(bucketed.c.unit).label("unit")
+        )\
+        .group_by(bucketed.c.bucket)\
+        .order_by(bucketed.c.bucket)\
+        .all()
+
+    return {
+        "patient_id": patient_id,
+        "code": code,
+        "unit": next((row.unit for row in rows if row.unit), None),
+        "start": start,
+        "end": end,
+        "points": [
+            {
+                "start": start + bucket_width * row.bucket,
+                "end": start + bucket_width * (row.bucket + 1),
+                "count": row.count,
+                "min": row.min,
+                "max": row.max,
+                "avg": float(row.avg) if row.avg is not None else None,
+            }
+            for row in rows
+        ],
+    }
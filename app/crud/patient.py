@@ -1,8 +1,21 @@
-from sqlalchemy.orm import Session
-from typing import List, Optional
+from sqlalchemy import func, case, cast, column, exists, insert, literal, literal_column, or_, select, table, true
+from sqlalchemy.dialects.postgresql import JSONB, TSVECTOR
+from sqlalchemy.engine import Row
+from sqlalchemy.orm import Session, Query, aliased, load_only, joinedload, selectinload, undefer, undefer_group
+from sqlalchemy.sql.elements import ColumnElement
+from typing import Any, Dict, List, Optional, Set
 from datetime import datetime
+import csv
+import io
+import json
+import logging
+from app.core import tracing
+from app.db.database import mark_write
+from app.models.doctor import Doctor, DoctorType
 from app.models.patient import Patient, ClinicalRecord
 from app.models.patient_assignment import PatientAssignment
+from app.crud import observation as crud_observation
+from app.services import record_archive
 from app.schemas.patient import (
     PatientCreate, 
     PatientUpdate, 
@@ -10,28 +23,67 @@ from app.schemas.patient import (
     PatientAssignmentCreate
 )
 
+logger = logging.getLogger(__name__)
+
 def get_patient(db: Session, patient_id: int) -> Optional[Patient]:
     return db.query(Patient).filter(Patient.id == patient_id).first()
 
-def get_patients_by_consultant(
-    db: Session, 
+def _patient_detail_options() -> tuple:
+    return (
+        joinedload(Patient.consultant),
+        joinedload(Patient.current_resident),
+        selectinload(Patient.clinical_records).undefer_group("payload"),
+        selectinload(Patient.clinical_records).joinedload(ClinicalRecord.created_by)
+    )
+
+def get_patient_detail(db: Session, patient_id: int) -> Optional[Patient]:
+    """
+    Load a patient with its full record payloads for detail responses.
+    Also used after writes, where it reloads the (expired) patient.
+    """
+    return db.query(Patient)\
+        .options(*_patient_detail_options())\
+        .filter(Patient.id == patient_id)\
+        .populate_existing()\
+        .first()
+
+def _patient_summary_query(db: Session) -> Query:
+    doctor_ref_columns = (Doctor.id, Doctor.first_name, Doctor.last_name)
+    return db.query(Patient).options(
+        load_only(
+            Patient.id,
+            Patient.name,
+            Patient.age,
+            Patient.gender,
+            Patient.updated_at,
+            Patient.consultant_id,
+            Patient.current_resident_id
+        ),
+        undefer(Patient.record_count),
+        undefer(Patient.last_record_at),
+        joinedload(Patient.consultant).load_only(*doctor_ref_columns),
+        joinedload(Patient.current_resident).load_only(*doctor_ref_columns)
+    )
+
+def get_patient_summaries_by_consultant(
+    db: Session,
     consultant_id: int,
-    skip: int = 0, 
+    skip: int = 0,
     limit: int = 100
 ) -> List[Patient]:
-    return db.query(Patient)\
+    return _patient_summary_query(db)\
         .filter(Patient.consultant_id == consultant_id)\
         .offset(skip)\
         .limit(limit)\
         .all()
 
-def get_patients_by_resident(
-    db: Session, 
+def get_patient_summaries_by_resident(
+    db: Session,
     resident_id: int,
-    skip: int = 0, 
+    skip: int = 0,
     limit: int = 100
 ) -> List[Patient]:
-    return db.query(Patient)\
+    return _patient_summary_query(db)\
         .filter(Patient.current_resident_id == resident_id)\
         .offset(skip)\
         .limit(limit)\
@@ -51,8 +103,77 @@ def create_patient(db: Session, patient: PatientCreate) -> Patient:
     )
     db.add(db_patient)
     db.commit()
-    db.refresh(db_patient)
-    return db_patient
+    return get_patient_detail(db, db_patient.id)
+
+_BULK_PATIENT_COLUMNS = (
+    "name", "age", "gender", "consultant_id", "current_resident_id",
+    "risk_factors", "family_history", "surgical_history", "additional_notes",
+    "created_at", "updated_at"
+)
+
+def get_doctor_types(db: Session, doctor_ids: Set[int]) -> Dict[int, str]:
+    """doctor_type of each existing doctor among `doctor_ids`, in one query."""
+    if not doctor_ids:
+        return {}
+    return dict(
+        db.query(Doctor.id, Doctor.doctor_type).filter(Doctor.id.in_(doctor_ids)).all()
+    )
+
+def _copy_patients(db: Session, rows: List[Dict[str, Any]]) -> None:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    json_columns = {"risk_factors", "family_history", "surgical_history", "additional_notes"}
+    for row in rows:
+        writer.writerow([
+            json.dumps(row[name]) if name in json_columns else
+            row[name].isoformat() if isinstance(row[name], datetime) else
+            row[name]
+            for name in _BULK_PATIENT_COLUMNS
+        ])
+    buffer.seek(0)
+
+    cursor = db.connection().connection.cursor()
+    try:
+        cursor.copy_expert(
+            f"COPY patients ({', '.join(_BULK_PATIENT_COLUMNS)}) FROM STDIN WITH (FORMAT csv)",
+            buffer
+        )
+    finally:
+        cursor.close()
+
+def bulk_create_patients(db: Session, patients: List[PatientCreate]) -> int:
+    """
+    Insert a batch of validated patients without per-row commits or refreshes.
+    Uses COPY on Postgres (psycopg2) and a single executemany elsewhere.
+    The caller commits.
+    """
+    if not patients:
+        return 0
+
+    now = datetime.utcnow()
+    rows = [
+        {
+            "name": patient.name,
+            "age": patient.age,
+            "gender": patient.gender,
+            "consultant_id": patient.consultant_id,
+            "current_resident_id": patient.current_resident_id,
+            "risk_factors": patient.risk_factors,
+            "family_history": patient.family_history,
+            "surgical_history": patient.surgical_history,
+            "additional_notes": patient.additional_notes,
+            "created_at": now,
+            "updated_at": now
+        }
+        for patient in patients
+    ]
+
+    if db.get_bind().dialect.driver == "psycopg2":
+        _copy_patients(db, rows)
+        mark_write(db)  # COPY goes around the ORM's write tracking
+    else:
+        db.execute(insert(Patient.__table__), rows)
+    return len(rows)
 
 def update_patient(
     db: Session, 
@@ -65,8 +186,69 @@ def update_patient(
     
     db.add(db_patient)
     db.commit()
-    db.refresh(db_patient)
-    return db_patient
+    return get_patient_detail(db, db_patient.id)
+
+def reassign_patients(
+    db: Session,
+    consultant_id: int,
+    patient_ids: List[int],
+    resident_id: int,
+    from_resident_id: Optional[int] = None
+) -> Dict[str, List[int]]:
+    """
+    Move the consultant's patients to a resident in one transaction.
+
+    The patient rows are locked (in id order, so concurrent changeovers
+    can't deadlock), then the open assignments are ended, new ones inserted
+    and current_resident_id updated with one set-based statement each.
+    With from_resident_id, only patients currently with that resident move.
+    Returns the ids that were reassigned, left unchanged, and not found
+    among the consultant's patients (nothing is changed if any are missing).
+    """
+    requested = sorted(set(patient_ids))
+    locked = db.query(Patient.id, Patient.current_resident_id)\
+        .filter(Patient.id.in_(requested), Patient.consultant_id == consultant_id)\
+        .order_by(Patient.id)\
+        .with_for_update()\
+        .all()
+
+    found = {row.id for row in locked}
+    missing = [patient_id for patient_id in requested if patient_id not in found]
+    if missing:
+        db.rollback()
+        return {"reassigned": [], "unchanged": [], "missing": missing}
+
+    to_move = [
+        row.id for row in locked
+        if row.current_resident_id != resident_id and
+        (from_resident_id is None or row.current_resident_id == from_resident_id)
+    ]
+    unchanged = [patient_id for patient_id in requested if patient_id not in set(to_move)]
+
+    if to_move:
+        now = datetime.utcnow()
+        db.query(PatientAssignment)\
+            .filter(
+                PatientAssignment.patient_id.in_(to_move),
+                PatientAssignment.ended_at.is_(None)
+            )\
+            .update({PatientAssignment.ended_at: now}, synchronize_session=False)
+        db.execute(
+            insert(PatientAssignment.__table__).from_select(
+                ["patient_id", "resident_id", "assigned_at"],
+                select(Patient.id, literal(resident_id), literal(now))
+                    .where(Patient.id.in_(to_move))
+            )
+        )
+        db.query(Patient)\
+            .filter(Patient.id.in_(to_move))\
+            .update(
+                {Patient.current_resident_id: resident_id, Patient.updated_at: now},
+                synchronize_session="fetch"
+            )
+
+    db.commit()
+    return {"reassigned": to_move, "unchanged": unchanged, "missing": []}
 
 def assign_patient_to_resident(
     db: Session, 
@@ -77,32 +259,31 @@ def assign_patient_to_resident(
     if not db_patient:
         return None
 
-    # End current assignment if exists
-    if db_patient.current_resident_id:
-        current_assignment = db.query(PatientAssignment)\
-            .filter(
-                PatientAssignment.patient_id == patient_id,
-                PatientAssignment.resident_id == db_patient.current_resident_id,
-                PatientAssignment.ended_at.is_(None)
-            ).first()
-        if current_assignment:
-            current_assignment.ended_at = datetime.utcnow()
-            db.add(current_assignment)
-
-    # Create new assignment
-    new_assignment = PatientAssignment(
-        patient_id=patient_id,
+    reassign_patients(
+        db,
+        consultant_id=db_patient.consultant_id,
+        patient_ids=[patient_id],
         resident_id=resident_id
     )
-    db.add(new_assignment)
+    return get_patient_detail(db, patient_id)
 
-    # Update patient's current resident
-    db_patient.current_resident_id = resident_id
-    db.add(db_patient)
-    
-    db.commit()
-    db.refresh(db_patient)
-    return db_patient
+def set_processing_status(db: Session, record: ClinicalRecord, status: str) -> None:
+    """
+    Move a record to `status`, remembering the trace that did it so slow
+    records can be looked up in the tracing backend. New records are
+    flushed so the change can be logged with their id.
+    """
+    record.processing_status = status
+    record.processing_trace_id = tracing.current_trace_id()
+    if record.id is None:
+        db.add(record)
+        db.flush()
+    logger.info("Clinical record status changed", extra={
+        "record_id": record.id,
+        "patient_id": record.patient_id,
+        "processing_status": record.processing_status,
+        "trace_id": record.processing_trace_id,
+    })
 
 def create_clinical_record(
     db: Session, 
@@ -115,10 +296,13 @@ def create_clinical_record(
         audio_file_path=record.audio_file_path,
         transcription=record.transcription,
         extracted_data=record.extracted_data,
-        is_processed=False,
-        processing_status="pending"
+        is_processed=False
     )
-    db.add(db_record)
+    set_processing_status(db, db_record, "pending")
+
+    # Normalized copies of extracted vitals/medications for trend queries
+    crud_observation.add_record_observations(db, db_record)
+
     db.commit()
     db.refresh(db_record)
     return db_record
@@ -130,13 +314,25 @@ def get_patient_clinical_records(
     limit: int = 100
 ) -> List[ClinicalRecord]:
     return db.query(ClinicalRecord)\
+        .options(undefer_group("payload"), joinedload(ClinicalRecord.created_by))\
         .filter(ClinicalRecord.patient_id == patient_id)\
+        .order_by(ClinicalRecord.recorded_at.desc(), ClinicalRecord.id.desc())\
         .offset(skip)\
         .limit(limit)\
         .all()
 
 def get_clinical_record(db: Session, record_id: int) -> Optional[ClinicalRecord]:
-    return db.query(ClinicalRecord).filter(ClinicalRecord.id == record_id).first()
+    """
+    Get a clinical record, reading through to archive storage when its
+    partition has been archived (the returned record is then transient).
+    """
+    record = db.query(ClinicalRecord)\
+        .options(undefer_group("payload"))\
+        .filter(ClinicalRecord.id == record_id)\
+        .first()
+    if record is None:
+        record = record_archive.find_archived_record(db, record_id)
+    return record
 
 def get_patient_assignment_history(
     db: Session,
@@ -150,3 +346,302 @@ def get_patient_assignment_history(
         .offset(skip)\
         .limit(limit)\
         .all()
+
+def doctor_patient_filter(doctor: Doctor) -> ColumnElement:
+    """SQL predicate restricting patients to those visible to the given doctor."""
+    if doctor.doctor_type == DoctorType.CONSULTANT:
+        return Patient.consultant_id == doctor.id
+    return Patient.current_resident_id == doctor.id
+
+def visible_patients(db: Session, doctor: Doctor) -> Query:
+    """Patients the doctor may access; access-checked patient queries start here."""
+    return db.query(Patient).filter(doctor_patient_filter(doctor))
+
+def patient_exists(db: Session, patient_id: int) -> bool:
+    """Cheap existence check, used after a scoped miss to tell 403 from 404."""
+    return db.query(exists().where(Patient.id == patient_id)).scalar()
+
+def get_patient_for_doctor(
+    db: Session,
+    doctor: Doctor,
+    patient_id: int,
+    detail: bool = False
+) -> Optional[Patient]:
+    """
+    Get a patient only if the doctor may access it, checking access and
+    loading in one query. With detail=True, loads what get_patient_detail does.
+    """
+    query = visible_patients(db, doctor)
+    if detail:
+        query = query.options(*_patient_detail_options())
+    return query.filter(Patient.id == patient_id).first()
+
+def get_patient_version(db: Session, doctor: Doctor, patient_id: int) -> Optional[Row]:
+    """
+    Modification metadata of everything the patient detail and record list
+    responses contain, without loading any payloads: update times of the
+    patient, its doctors, its live records and their authors, and the record
+    count (archiving removes records without touching the rest). None when
+    the doctor may not access the patient.
+    """
+    consultant = aliased(Doctor)
+    resident = aliased(Doctor)
+    author = aliased(Doctor)
+    return db.query(
+            Patient.updated_at.label("updated_at"),
+            consultant.updated_at.label("consultant_updated_at"),
+            resident.updated_at.label("resident_updated_at"),
+            func.max(ClinicalRecord.updated_at).label("records_updated_at"),
+            func.max(author.updated_at).label("authors_updated_at"),
+            func.count(ClinicalRecord.id).label("record_count")
+        )\
+        .select_from(Patient)\
+        .outerjoin(consultant, consultant.id == Patient.consultant_id)\
+        .outerjoin(resident, resident.id == Patient.current_resident_id)\
+        .outerjoin(ClinicalRecord, ClinicalRecord.patient_id == Patient.id)\
+        .outerjoin(author, author.id == ClinicalRecord.created_by_id)\
+        .filter(Patient.id == patient_id, doctor_patient_filter(doctor))\
+        .group_by(Patient.id, Patient.updated_at, consultant.updated_at, resident.updated_at)\
+        .first()
+
+def get_clinical_record_for_doctor(
+    db: Session,
+    doctor: Doctor,
+    record_id: int
+) -> Optional[ClinicalRecord]:
+    """Get a live (not archived) clinical record if the doctor may access its patient."""
+    return db.query(ClinicalRecord)\
+        .options(undefer_group("payload"), joinedload(ClinicalRecord.created_by))\
+        .join(Patient, Patient.id == ClinicalRecord.patient_id)\
+        .filter(ClinicalRecord.id == record_id, doctor_patient_filter(doctor))\
+        .first()
+
+def clinical_record_exists(db: Session, record_id: int) -> bool:
+    return db.query(exists().where(ClinicalRecord.id == record_id)).scalar()
+
+_SNIPPET_START = "<mark>"
+_SNIPPET_STOP = "</mark>"
+
+def _fts5_match_expression(text: str) -> str:
+    # Quote every term so user input can't inject FTS5 query syntax; terms are ANDed
+    terms = [term.replace('"', '""') for term in text.split()]
+    return " ".join(f'"{term}"' for term in terms if term)
+
+def _search_clinical_records_postgres(
+    db: Session,
+    text: str,
+    doctor: Doctor,
+    skip: int,
+    limit: int
+) -> List[Any]:
+    search_vector = column("search_vector", TSVECTOR)
+    tsquery = func.websearch_to_tsquery("english", text)
+    rank = func.ts_rank_cd(search_vector, tsquery)
+
+    # Rank and page first so ts_headline only runs over the returned page
+    ranked = db.query(
+            ClinicalRecord.id.label("id"),
+            ClinicalRecord.patient_id.label("patient_id"),
+            Patient.name.label("patient_name"),
+            ClinicalRecord.recorded_at.label("recorded_at"),
+            rank.label("rank")
+        )\
+        .select_from(ClinicalRecord)\
+        .join(Patient, Patient.id == ClinicalRecord.patient_id)\
+        .filter(doctor_patient_filter(doctor))\
+        .filter(search_vector.op("@@")(tsquery))\
+        .order_by(rank.desc())\
+        .offset(skip)\
+        .limit(limit)\
+        .subquery()
+
+    snippet = func.ts_headline(
+        "english",
+        ClinicalRecord.transcription,
+        tsquery,
+        f"StartSel={_SNIPPET_START}, StopSel={_SNIPPET_STOP}, MaxFragments=2, MaxWords=20, MinWords=5"
+    )
+    return db.query(
+            ranked.c.id,
+            ranked.c.patient_id,
+            ranked.c.patient_name,
+            ranked.c.recorded_at,
+            ranked.c.rank,
+            snippet.label("snippet")
+        )\
+        .join(ClinicalRecord, ClinicalRecord.id == ranked.c.id)\
+        .order_by(ranked.c.rank.desc())\
+        .all()
+
+def _search_clinical_records_sqlite(
+    db: Session,
+    text: str,
+    doctor: Doctor,
+    skip: int,
+    limit: int
+) -> List[Any]:
+    match = _fts5_match_expression(text)
+    if not match:
+        return []
+
+    fts = table("clinical_records_fts", column("rowid"))
+    fts_table = literal_column("clinical_records_fts")
+    # bm25() is lower-is-better; negate it so rank sorts the same way as Postgres
+    rank = -func.bm25(fts_table)
+    snippet = func.snippet(fts_table, 0, _SNIPPET_START, _SNIPPET_STOP, "...", 16)
+
+    return db.query(
+            ClinicalRecord.id.label("id"),
+            ClinicalRecord.patient_id.label("patient_id"),
+            Patient.name.label("patient_name"),
+            ClinicalRecord.recorded_at.label("recorded_at"),
+            rank.label("rank"),
+            snippet.label("snippet")
+        )\
+        .select_from(fts)\
+        .join(ClinicalRecord, ClinicalRecord.id == fts.c.rowid)\
+        .join(Patient, Patient.id == ClinicalRecord.patient_id)\
+        .filter(doctor_patient_filter(doctor))\
+        .filter(fts_table.op("MATCH")(match))\
+        .order_by(rank.desc())\
+        .offset(skip)\
+        .limit(limit)\
+        .all()
+
+def _search_clinical_records_like(
+    db: Session,
+    text: str,
+    doctor: Doctor,
+    skip: int,
+    limit: int
+) -> List[Any]:
+    # No full-text index on other databases: every term must appear, newest first
+    terms = [term for term in text.split() if term]
+    if not terms:
+        return []
+
+    return db.query(
+            ClinicalRecord.id.label("id"),
+            ClinicalRecord.patient_id.label("patient_id"),
+            Patient.name.label("patient_name"),
+            ClinicalRecord.recorded_at.label("recorded_at"),
+            literal(0.0).label("rank"),
+            func.substr(ClinicalRecord.transcription, 1, 200).label("snippet")
+        )\
+        .join(Patient, Patient.id == ClinicalRecord.patient_id)\
+        .filter(doctor_patient_filter(doctor))\
+        .filter(*(
+            ClinicalRecord.transcription.ilike(f"%{_escape_like(term)}%", escape="\\")
+            for term in terms
+        ))\
+        .order_by(ClinicalRecord.recorded_at.desc())\
+        .offset(skip)\
+        .limit(limit)\
+        .all()
+
+def search_clinical_records(
+    db: Session,
+    text: str,
+    doctor: Doctor,
+    skip: int = 0,
+    limit: int = 20
+) -> List[Any]:
+    """
+    Full-text search over transcriptions of the doctor's patients (an
+    unranked ILIKE scan on databases without full-text support).
+    Returns rows with id, patient_id, patient_name, recorded_at, rank and snippet.
+    """
+    dialect = db.get_bind().dialect.name
+    if dialect == "postgresql":
+        return _search_clinical_records_postgres(db, text, doctor, skip, limit)
+    if dialect == "sqlite":
+        return _search_clinical_records_sqlite(db, text, doctor, skip, limit)
+    return _search_clinical_records_like(db, text, doctor, skip, limit)
+
+def _escape_like(text: str) -> str:
+    return text.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+def search_patients(
+    db: Session,
+    text: str,
+    doctor: Doctor,
+    limit: int = 10
+) -> List[Patient]:
+    """
+    Typeahead search over the doctor's patients by name.
+    Postgres ranks by trigram word similarity using the pg_trgm GIN index;
+    other databases fall back to a substring match with prefix hits first.
+    """
+    text = text.strip()
+    query = _patient_summary_query(db).filter(doctor_patient_filter(doctor))
+    prefix = f"{_escape_like(text)}%"
+
+    if db.get_bind().dialect.name == "postgresql":
+        similarity = func.word_similarity(text, Patient.name)
+        return query\
+            .filter(or_(
+                Patient.name.ilike(prefix, escape="\\"),
+                literal(text).op("<%")(Patient.name)
+            ))\
+            .order_by(similarity.desc(), Patient.name)\
+            .limit(limit)\
+            .all()
+
+    is_prefix = case((Patient.name.ilike(prefix, escape="\\"), 0), else_=1)
+    return query\
+        .filter(Patient.name.ilike(f"%{_escape_like(text)}%", escape="\\"))\
+        .order_by(is_prefix, Patient.name)\
+        .limit(limit)\
+        .all()
+
+def _jsonb_contains(column_expr: ColumnElement, value: Dict[str, Any]) -> ColumnElement:
+    # Explicit @> so the predicate can use the jsonb_path_ops GIN index
+    return column_expr.op("@>")(cast(value, JSONB))
+
+def get_patient_cohort(
+    db: Session,
+    doctor: Doctor,
+    risk_factors: Optional[List[str]] = None,
+    diagnoses: Optional[List[str]] = None,
+    skip: int = 0,
+    limit: int = 100
+) -> List[Patient]:
+    """
+    Patients of the doctor having all given risk factors and recorded diagnoses.
+    On Postgres the predicates are JSONB containment checks served by GIN indexes;
+    other databases use the JSON1 functions.
+    """
+    query = _patient_summary_query(db).filter(doctor_patient_filter(doctor))
+    risk_factors = risk_factors or []
+    diagnoses = diagnoses or []
+
+    if db.get_bind().dialect.name == "postgresql":
+        if risk_factors:
+            query = query.filter(_jsonb_contains(
+                Patient.risk_factors, {factor: True for factor in risk_factors}
+            ))
+        for diagnosis in diagnoses:
+            query = query.filter(exists().where(
+                ClinicalRecord.patient_id == Patient.id,
+                _jsonb_contains(ClinicalRecord.extracted_data, {"diagnoses": [diagnosis]})
+            ))
+    else:
+        for factor in risk_factors:
+            path = '$."' + factor.replace('"', '') + '"'
+            query = query.filter(func.json_extract(Patient.risk_factors, path) == true())
+        for diagnosis in diagnoses:
+            recorded = func.json_each(ClinicalRecord.extracted_data, "$.diagnoses")\
+                .table_valued("value")\
+                .alias("recorded_diagnoses")
+            query = query.filter(exists().where(
+                ClinicalRecord.patient_id == Patient.id,
+                select(recorded.c.value)
+                    .where(recorded.c.value == diagnosis)
+                    .exists()
+            ))
+
+    return query\
+        .order_by(Patient.id)\
+        .offset(skip)\
+        .limit(limit)\
+        .all()
@@ -4,3 +4,5 @@ from app.db.base_class import Base  # noqa
 from app.models.doctor import Doctor  # noqa
 from app.models.patient import Patient , ClinicalRecord  # noqa
 from app.models.patient_assignment import PatientAssignment  # noqa
+from app.models.observation import Observation  # noqa
+from app.models.clinical_record_archive import ClinicalRecordArchive, ClinicalRecordArchiveEntry  # noqa
@@ -1,13 +1,216 @@
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker
+from typing import Dict, List, Optional, Tuple
+import itertools
+import logging
+import select
+import threading
+import time
+from sqlalchemy import create_engine, event, text
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session, sessionmaker
 from app.core.config import settings
 from app.db.base_class import Base
 
+logger = logging.getLogger(__name__)
+
 SQLALCHEMY_DATABASE_URL = settings.DATABASE_URL
 
 engine = create_engine(SQLALCHEMY_DATABASE_URL)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# Seconds a replica is behind the primary; 0 when it has replayed everything it received
+REPLICA_LAG_SQL = """
+SELECT CASE
+    WHEN NOT pg_is_in_recovery() THEN 0
+    WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+    ELSE coalesce(extract(epoch FROM now() - pg_last_xact_replay_timestamp()), 0)
+END
+"""
+
+WRITES_CHANNEL = "replica_router_writes"
+
+class ReplicaRouter:
+    """
+    Chooses the engine for read-only requests.
+
+    Replicas are used round-robin while their replication lag is below
+    REPLICA_MAX_LAG_SECONDS; otherwise, and for doctors who committed a
+    write within READ_YOUR_WRITES_SECONDS, reads go to the primary.
+
+    A background thread per worker (start()) samples the lag every
+    REPLICA_LAG_CHECK_INTERVAL_SECONDS, so requests never wait on a probe;
+    replicas count as unhealthy until checked and when the samples go
+    stale. On Postgres a write's commit also notifies the other workers
+    (NOTIFY is sent in the writing transaction, so it arrives with the
+    commit), which the same thread listens for.
+    """
+    def __init__(
+        self,
+        engines: List[Engine],
+        max_lag: float,
+        check_interval: float,
+        sticky_seconds: float
+    ):
+        self.engines = engines
+        self.max_lag = max_lag
+        self.check_interval = check_interval
+        self.sticky_seconds = sticky_seconds
+        self._health: Dict[int, Tuple[float, bool]] = {}
+        self._recent_writes: Dict[int, float] = {}
+        self._next = itertools.count()
+        self._lock = threading.Lock()
+        self._started = False
+
+    @property
+    def broadcasts_writes(self) -> bool:
+        return bool(self.engines) and engine.dialect.name == "postgresql"
+
+    def _check_lag(self, index: int) -> bool:
+        try:
+            with self.engines[index].connect() as conn:
+                lag = conn.execute(text(REPLICA_LAG_SQL)).scalar()
+            healthy = lag <= self.max_lag
+            if not healthy:
+                logger.warning(f"Replica {index} is {lag:.1f}s behind, reading from primary")
+            return healthy
+        except Exception as e:
+            logger.warning(f"Replica {index} unavailable, reading from primary: {e}")
+            return False
+
+    def refresh_health(self) -> None:
+        """Sample every replica's lag; run by the background thread."""
+        for index in range(len(self.engines)):
+            healthy = self._check_lag(index)
+            with self._lock:
+                self._health[index] = (time.monotonic(), healthy)
+
+    def _is_healthy(self, index: int) -> bool:
+        with self._lock:
+            checked_at, healthy = self._health.get(index, (None, False))
+        # Samples older than a few intervals mean the refresher stopped
+        return checked_at is not None and healthy and \
+            time.monotonic() - checked_at < 3 * self.check_interval
+
+    def record_write(self, doctor_id: int) -> None:
+        now = time.monotonic()
+        with self._lock:
+            self._recent_writes[doctor_id] = now
+            if len(self._recent_writes) > 10000:
+                self._recent_writes = {
+                    key: written_at for key, written_at in self._recent_writes.items()
+                    if now - written_at < self.sticky_seconds
+                }
+
+    def wrote_recently(self, doctor_id: Optional[int]) -> bool:
+        written_at = self._recent_writes.get(doctor_id)
+        return written_at is not None and time.monotonic() - written_at < self.sticky_seconds
+
+    def get_read_engine(self, doctor_id: Optional[int] = None) -> Optional[Engine]:
+        """A healthy replica engine, or None when the primary should serve the read."""
+        if not self.engines or self.wrote_recently(doctor_id):
+            return None
+        start = next(self._next)
+        for offset in range(len(self.engines)):
+            index = (start + offset) % len(self.engines)
+            if self._is_healthy(index):
+                return self.engines[index]
+        return None
+
+    def reset(self) -> None:
+        with self._lock:
+            self._health.clear()
+            self._recent_writes.clear()
+
+    def _wait_for_writes(self, connection, timeout: float) -> None:
+        """Record the writes other workers notify about for up to `timeout` seconds."""
+        if select.select([connection], [], [], timeout) == ([], [], []):
+            return
+        connection.poll()
+        while connection.notifies:
+            notification = connection.notifies.pop(0)
+            self.record_write(int(notification.payload))
+
+    def _monitor(self) -> None:
+        while True:
+            raw_connection = None
+            try:
+                connection = None
+                if self.broadcasts_writes:
+                    raw_connection = engine.raw_connection()
+                    raw_connection.detach()
+                    connection = raw_connection.dbapi_connection
+                    connection.autocommit = True
+                    with connection.cursor() as cursor:
+                        cursor.execute(f"LISTEN {WRITES_CHANNEL}")
+                while True:
+                    self.refresh_health()
+                    next_check = time.monotonic() + self.check_interval
+                    while connection is not None and time.monotonic() < next_check:
+                        self._wait_for_writes(connection, next_check - time.monotonic())
+                    if connection is None:
+                        time.sleep(self.check_interval)
+            except Exception as e:
+                logger.error(f"Replica monitor failed, retrying: {e}")
+                if raw_connection is not None:
+                    try:
+                        raw_connection.close()
+                    except Exception:
+                        pass
+                time.sleep(5)
+
+    def start(self) -> None:
+        """Start the lag sampling and write listener thread once per worker, if there are replicas."""
+        if not self.engines:
+            return
+        with self._lock:
+            if self._started:
+                return
+            self._started = True
+        threading.Thread(target=self._monitor, name="replica-router-monitor", daemon=True).start()
+
+replica_router = ReplicaRouter(
+    [create_engine(url, pool_pre_ping=True) for url in settings.DATABASE_REPLICA_URLS],
+    max_lag=settings.REPLICA_MAX_LAG_SECONDS,
+    check_interval=settings.REPLICA_LAG_CHECK_INTERVAL_SECONDS,
+    sticky_seconds=settings.READ_YOUR_WRITES_SECONDS
+)
+
+def mark_write(session: Session) -> None:
+    """
+    Count the session's transaction as a write for read-your-writes.
+    Needed after writes the ORM doesn't see, like COPY on the raw connection.
+    """
+    session.info["has_writes"] = True
+
+# Read-your-writes: remember doctors whose session committed a write.
+# deps.get_current_doctor stores the doctor id in session.info.
+@event.listens_for(SessionLocal, "after_flush")
+def _mark_flush_write(session: Session, flush_context) -> None:
+    mark_write(session)
+
+@event.listens_for(SessionLocal, "do_orm_execute")
+def _mark_statement_write(orm_execute_state) -> None:
+    if orm_execute_state.is_insert or orm_execute_state.is_update or orm_execute_state.is_delete:
+        mark_write(orm_execute_state.session)
+
+@event.listens_for(SessionLocal, "before_commit")
+def _broadcast_doctor_write(session: Session) -> None:
+    # Flushes pending changes first: after_flush runs before has_writes is read
+    session.flush()
+    if session.info.get("has_writes") and session.info.get("doctor_id") is not None \
+            and replica_router.broadcasts_writes:
+        session.execute(text("SELECT pg_notify(:channel, :payload)"), {
+            "channel": WRITES_CHANNEL, "payload": str(session.info["doctor_id"])
+        })
+
+@event.listens_for(SessionLocal, "after_commit")
+def _record_doctor_write(session: Session) -> None:
+    if session.info.pop("has_writes", False) and session.info.get("doctor_id") is not None:
+        replica_router.record_write(session.info["doctor_id"])
+
+@event.listens_for(SessionLocal, "after_rollback")
+def _discard_write(session: Session) -> None:
+    session.info.pop("has_writes", None)
+
 # Dependency
 def get_db():
     db = SessionLocal()
@@ -5,6 +5,8 @@ from app.db.database import Base, engine, SessionLocal
 from app.models.doctor import Doctor
 from app.models.patient import Patient, ClinicalRecord
 from app.models.patient_assignment import PatientAssignment
+from app.models.observation import Observation
+from app.models.clinical_record_archive import ClinicalRecordArchive
 from app.db.test_data import create_test_data, test_doctors
 
 def init_db(db: Session) -> None:
@@ -0,0 +1,169 @@
+"""
+Per-request SQL instrumentation.
+
+Cursor events on every Engine add each statement's count and duration to
+the QueryStats of the current request (a context variable set by the
+middleware in app.main). Repeated identical statements are reported as
+likely N+1 patterns, statements over SQL_SLOW_QUERY_MS as slow ones.
+
+Endpoints can declare a query budget with @query_budget(n); exceeding it
+is logged, and assert_max_queries() turns it into a test failure.
+"""
+from typing import Any, Callable, Dict, Iterator, List, Optional, Union
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+import logging
+import threading
+import time
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+MAX_STATEMENT_LENGTH = 500
+
+@dataclass
+class QueryStats:
+    count: int = 0
+    total_time: float = 0.0  # Seconds
+    slow: List[Dict[str, Any]] = field(default_factory=list)
+    statements: Counter = field(default_factory=Counter)
+
+    @property
+    def total_time_ms(self) -> float:
+        return self.total_time * 1000
+
+    def record(self, statement: str, duration: float) -> None:
+        self.count += 1
+        self.total_time += duration
+        self.statements[statement] += 1
+        if duration * 1000 >= settings.SQL_SLOW_QUERY_MS:
+            self.slow.append({
+                "statement": statement[:MAX_STATEMENT_LENGTH],
+                "duration_ms": round(duration * 1000, 2),
+            })
+
+    def repeated_statements(self, threshold: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Statements executed at least `threshold` times, the usual N+1 signature."""
+        threshold = threshold or settings.SQL_N_PLUS_ONE_THRESHOLD
+        return [
+            {"statement": statement[:MAX_STATEMENT_LENGTH], "count": count}
+            for statement, count in self.statements.most_common()
+            if count >= threshold
+        ]
+
+# Called with (method, route, stats) after every request, e.g. to export metrics
+request_observers: List[Callable[[str, str, QueryStats], None]] = []
+
+class QueryBudgetExceeded(AssertionError):
+    pass
+
+_request_stats: ContextVar[Optional[QueryStats]] = ContextVar("request_query_stats", default=None)
+
+# Trackers that see every statement regardless of context, for tests where
+# the app runs in another thread (TestClient)
+_global_trackers: List[QueryStats] = []
+_global_lock = threading.Lock()
+
+def current_stats() -> Optional[QueryStats]:
+    return _request_stats.get()
+
+@contextmanager
+def track_queries() -> Iterator[QueryStats]:
+    """Collect the statements executed in the current context (request)."""
+    stats = QueryStats()
+    token = _request_stats.set(stats)
+    try:
+        yield stats
+    finally:
+        _request_stats.reset(token)
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+    conn.info.setdefault("query_start_time", []).append(time.perf_counter())
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+    start_times = conn.info.get("query_start_time")
+    if not start_times:
+        return
+    duration = time.perf_counter() - start_times.pop()
+
+    stats = _request_stats.get()
+    if stats is not None:
+        stats.record(statement, duration)
+    if _global_trackers:
+        with _global_lock:
+            for tracker in _global_trackers:
+                tracker.record(statement, duration)
+
+def query_budget(max_queries: int) -> Callable:
+    """Declare the maximum number of SQL statements an endpoint may issue."""
+    def decorator(endpoint: Callable) -> Callable:
+        endpoint.__query_budget__ = max_queries
+        return endpoint
+    return decorator
+
+def get_query_budget(endpoint: Optional[Callable]) -> Optional[int]:
+    return getattr(endpoint, "__query_budget__", None)
+
+def log_request_stats(method: str, route: str, stats: QueryStats, budget: Optional[int] = None) -> None:
+    """Warn about slow statements, N+1 patterns and exceeded budgets of a request."""
+    for slow in stats.slow:
+        logger.warning(
+            f"Slow SQL in {method} {route}: {slow['duration_ms']:.1f} ms: {slow['statement']}"
+        )
+    for repeated in stats.repeated_statements():
+        logger.warning(
+            f"Possible N+1 in {method} {route}: statement ran {repeated['count']} times: "
+            f"{repeated['statement']}"
+        )
+    if budget is not None and stats.count > budget:
+        logger.warning(
+            f"{method} {route} issued {stats.count} SQL statements, budget is {budget}"
+        )
+
+def observe_request(method: str, route: str, stats: QueryStats) -> None:
+    for observer in request_observers:
+        try:
+            observer(method, route, stats)
+        except Exception as e:
+            logger.error(f"Query stats observer failed: {e}")
+
+@contextmanager
+def assert_max_queries(budget: Union[int, Callable]) -> Iterator[QueryStats]:
+    """
+    Fail with QueryBudgetExceeded when the wrapped block issues more SQL
+    statements than `budget`, either a number or an endpoint decorated
+    with @query_budget:
+
+        with assert_max_queries(patients.read_my_patients):
+            client.get("/patients/my-patients", headers=headers)
+
+    tests/test_query_budgets.py runs this for every budgeted endpoint.
+    """
+    max_queries = budget if isinstance(budget, int) else get_query_budget(budget)
+    if max_queries is None:
+        raise ValueError(f"{budget!r} has no declared query budget")
+
+    stats = QueryStats()
+    with _global_lock:
+        _global_trackers.append(stats)
+    try:
+        yield stats
+    finally:
+        with _global_lock:
+            _global_trackers.remove(stats)
+
+    if stats.count > max_queries:
+        statements = "\n".join(
+            f"  {count}x {statement[:MAX_STATEMENT_LENGTH]}"
+            for statement, count in stats.statements.most_common()
+        )
+        raise QueryBudgetExceeded(
+            f"Expected at most {max_queries} SQL statements, got {stats.count}:\n{statements}"
+        )
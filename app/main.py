@@ -1,19 +1,37 @@
-from fastapi import FastAPI
+from fastapi import FastAPI, Request, status
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import JSONResponse
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
 import os
 import logging
+import time
 
 from app.api.api import api_router
+from app.api.deps import is_admin_token
 from app.core.config import settings
+from app.core.logging_config import configure_logging, shutdown_logging
+from app.core import metrics, profiling, tracing
+from app.core.principal_cache import start_invalidation_listener
+from app.core.responses import ORJSONResponse
+from app.db import instrumentation
+from app.db.database import replica_router
+from app.services import record_archive
 
-logging.basicConfig(level=logging.DEBUG)
+configure_logging()
+metrics.configure_metrics()
+tracing.configure_tracing()
 logger = logging.getLogger(__name__)
 
+app_options = {}
+if settings.ORJSON_DEFAULT_RESPONSE:
+    app_options["default_response_class"] = ORJSONResponse
+
 app = FastAPI(
     title=settings.PROJECT_NAME,
     description="AI-powered Clinical History Management System",
-    version="1.0.0"
+    version="1.0.0",
+    **app_options
 )
 
 # Configure CORS
@@ -32,12 +50,115 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+def route_template(request: Request) -> str:
+    """Matched route path (e.g. /patients/{patient_id}), for low-cardinality labels."""
+    route = request.scope.get("route")
+    path_format = getattr(route, "path_format", None)
+    if path_format is None:
+        return request.url.path
+    # Routes of included routers may only know their path relative to the prefix
+    rendered = path_format.format(**request.path_params)
+    if path_format != request.url.path and request.url.path.endswith(rendered):
+        return request.url.path[:len(request.url.path) - len(rendered)] + path_format
+    return path_format
+
+def metric_route(request: Request, route: str) -> str:
+    # Unmatched paths would give every scanned URL its own time series
+    return route if request.scope.get("route") is not None else "unmatched"
+
+@app.middleware("http")
+async def sql_instrumentation(request: Request, call_next):
+    """Count SQL statements and DB time per request, and time and trace the request."""
+    start = time.perf_counter()
+    with tracing.span(
+        f"{request.method} {request.url.path}",
+        carrier=dict(request.headers),
+        server=True,
+        **{"http.request.method": request.method}
+    ) as request_span:
+        with instrumentation.track_queries() as stats:
+            try:
+                response = await call_next(request)
+            except Exception:
+                # The error handler answers 500; count the request before it propagates
+                route = metric_route(request, route_template(request))
+                metrics.observe_request(request.method, route, 500, time.perf_counter() - start)
+                instrumentation.observe_request(request.method, route, stats)
+                raise
+        route = route_template(request)
+        if request_span is not None:
+            request_span.update_name(f"{request.method} {route}")
+            request_span.set_attribute("http.route", route)
+            request_span.set_attribute("http.response.status_code", response.status_code)
+            if response.status_code >= 500:
+                tracing.set_error(request_span, f"HTTP {response.status_code}")
+    duration = time.perf_counter() - start
+
+    labels_route = metric_route(request, route)
+    metrics.observe_request(request.method, labels_route, response.status_code, duration)
+    budget = instrumentation.get_query_budget(request.scope.get("endpoint"))
+    instrumentation.log_request_stats(request.method, route, stats, budget)
+    instrumentation.observe_request(request.method, labels_route, stats)
+
+    if settings.DEBUG:
+        response.headers["X-DB-Query-Count"] = str(stats.count)
+        response.headers["X-DB-Time-Ms"] = f"{stats.total_time_ms:.2f}"
+        if budget is not None:
+            response.headers["X-DB-Query-Budget"] = str(budget)
+    else:
+        logger.info("db_stats", extra={
+            "method": request.method,
+            "route": route,
+            "status": response.status_code,
+            "queries": stats.count,
+            "db_ms": round(stats.total_time_ms, 2),
+            "slow": len(stats.slow),
+        })
+    return response
+
+@app.middleware("http")
+async def request_profiling(request: Request, call_next):
+    """Profile admin requests that ask for it, and one request in PROFILE_EVERY_N_REQUESTS."""
+    requested = profiling.profile_requested(request.headers, request.query_params)
+    if requested:
+        if not await run_in_threadpool(is_admin_token, request.headers.get("authorization")):
+            return JSONResponse(
+                status_code=status.HTTP_403_FORBIDDEN,
+                content={"detail": "Profiling is restricted to administrators"}
+            )
+    elif not profiling.sample_this_request():
+        return await call_next(request)
+
+    profiler = profiling.RequestProfiler()
+    profiler.start()
+    try:
+        response = await call_next(request)
+    finally:
+        profiler.stop()
+    profile = profiler.speedscope(f"{request.method} {route_template(request)}")
+    profile_id = await run_in_threadpool(profiling.store.save, profile)
+    if requested:
+        response.headers["X-Profile-Id"] = profile_id
+    return response
+
 # Create necessary directories
 os.makedirs("uploads/audio", exist_ok=True)
 
 # Mount static files
 app.mount("/uploads", StaticFiles(directory="uploads"), name="uploads")
 
+@app.on_event("startup")
+def start_background_listeners():
+    start_invalidation_listener()
+    replica_router.start()
+    record_archive.start_partition_maintenance()
+
+@app.on_event("shutdown")
+def flush_logs():
+    metrics.mark_process_dead()
+    tracing.shutdown_tracing()
+    shutdown_logging()
+
 # Root endpoint
 @app.get("/")
 async def root():
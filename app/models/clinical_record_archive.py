@@ -0,0 +1,35 @@
+from sqlalchemy import Column, Integer, BigInteger, String, DateTime, ForeignKey
+from datetime import datetime
+
+from app.db.base_class import Base
+
+class ClinicalRecordArchive(Base):
+    """
+    Manifest of clinical_records partitions detached and moved to archive storage.
+    Record ids follow insert order rather than recorded_at, so the id ranges
+    of different archives can overlap; ClinicalRecordArchiveEntry says which
+    archive holds a record.
+    """
+    __tablename__ = "clinical_record_archives"
+
+    id = Column(Integer, primary_key=True, index=True)
+    partition_name = Column(String(100), unique=True, nullable=False)
+    range_start = Column(DateTime, nullable=False)  # Inclusive recorded_at bound
+    range_end = Column(DateTime, nullable=False)  # Exclusive recorded_at bound
+    min_record_id = Column(Integer, index=True)
+    max_record_id = Column(Integer, index=True)
+    row_count = Column(Integer, nullable=False, default=0)
+    location = Column(String, nullable=False)  # Storage key of the compressed NDJSON file
+    archived_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+
+class ClinicalRecordArchiveEntry(Base):
+    """
+    The archive each archived record was moved to, and the byte range of
+    the gzip member holding it (unset for archives written before chunking).
+    """
+    __tablename__ = "clinical_record_archive_entries"
+
+    record_id = Column(Integer, primary_key=True)
+    archive_id = Column(Integer, ForeignKey("clinical_record_archives.id"), nullable=False, index=True)
+    chunk_offset = Column(BigInteger)
+    chunk_length = Column(Integer)
@@ -1,8 +1,8 @@
-from sqlalchemy import Column, String, Date, Enum, Integer, ForeignKey, Text, Boolean
+from sqlalchemy import Column, String, Date, DateTime, Enum, Integer, ForeignKey, Text, Boolean
 from sqlalchemy.orm import relationship
 from app.db.base_class import Base
 import enum
-from datetime import date
+from datetime import date, datetime
 
 class DoctorType(str, enum.Enum):
     CONSULTANT = "consultant"
@@ -55,6 +55,9 @@ class Doctor(Base):
     research_interests = Column(Text)  # For academic/research interests
     publications = Column(Text)  # List of publications (can be JSON string)
     certifications = Column(Text)  # List of certifications (can be JSON string)
+
+    # Part of the ETags of patient responses that embed this doctor
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     
     # For residents only
     supervisor_id = Column(Integer, ForeignKey('doctors.id'), nullable=True)
@@ -0,0 +1,30 @@
+from sqlalchemy import Column, Integer, String, Float, DateTime, ForeignKey, Index
+from sqlalchemy.orm import relationship
+from datetime import datetime
+
+from app.db.base_class import Base
+
+class Observation(Base):
+    """
+    One extracted measurement (vital sign, medication, ...) of a patient.
+    Narrow and indexed on (patient_id, code, recorded_at) so a trend is a
+    single index range scan instead of parsing ClinicalRecord.extracted_data.
+    """
+    __tablename__ = "observations"
+
+    id = Column(Integer, primary_key=True, index=True)
+    patient_id = Column(Integer, ForeignKey("patients.id"), nullable=False)
+    # No foreign key: clinical_records is partitioned (and archived) on Postgres
+    clinical_record_id = Column(Integer, nullable=True, index=True)
+    code = Column(String(50), nullable=False)  # e.g. "heart_rate", "bp_systolic", "medication"
+    value_num = Column(Float)  # Numeric value for measurements
+    value_text = Column(String)  # Free text value, e.g. the medication mention
+    unit = Column(String(20))
+    recorded_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+
+    # Relationships
+    patient = relationship("Patient")
+
+    __table_args__ = (
+        Index("ix_observations_patient_code_recorded", "patient_id", "code", "recorded_at"),
+    )
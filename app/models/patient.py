@@ -1,9 +1,13 @@
-from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Boolean, Table, JSON
-from sqlalchemy.orm import relationship
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Boolean, Table, JSON, Index, DDL, event, select, func, text
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.orm import relationship, deferred, column_property
 from datetime import datetime
 
 from app.db.base_class import Base
 
+# JSONB on Postgres (GIN-indexable containment queries), plain JSON elsewhere
+JSONVariant = JSON().with_variant(JSONB(), "postgresql")
+
 class Patient(Base):
     __tablename__ = "patients"
 
@@ -14,12 +18,12 @@ class Patient(Base):
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
 
-    # Doctor Relationships
-    consultant_id = Column(Integer, ForeignKey("doctors.id"), nullable=False)
-    current_resident_id = Column(Integer, ForeignKey("doctors.id"), nullable=True)
+    # Doctor Relationships (indexed: every access-scoped patient query filters on one of them)
+    consultant_id = Column(Integer, ForeignKey("doctors.id"), nullable=False, index=True)
+    current_resident_id = Column(Integer, ForeignKey("doctors.id"), nullable=True, index=True)
     
     # Risk Factors
-    risk_factors = Column(JSON, default=dict)  # Store as JSON: {"DM": true, "HTN": false, etc.}
+    risk_factors = Column(JSONVariant, default=dict)  # Store as JSON: {"DM": true, "HTN": false, etc.}
     
     # Histories
     family_history = Column(JSON, default=list)  # Store as JSON array
@@ -31,30 +35,136 @@ class Patient(Base):
     # Relationships
     clinical_records = relationship("ClinicalRecord", back_populates="patient")
 
+    __table_args__ = (
+        # Trigram index for typeahead name search (requires pg_trgm)
+        Index(
+            "ix_patients_name_trgm",
+            "name",
+            postgresql_using="gin",
+            postgresql_ops={"name": "gin_trgm_ops"}
+        ),
+        Index(
+            "ix_patients_risk_factors",
+            "risk_factors",
+            postgresql_using="gin",
+            postgresql_ops={"risk_factors": "jsonb_path_ops"}
+        ),
+    )
+
 class ClinicalRecord(Base):
     __tablename__ = "clinical_records"
 
     id = Column(Integer, primary_key=True, index=True)
     patient_id = Column(Integer, ForeignKey("patients.id"))
-    recorded_at = Column(DateTime, default=datetime.utcnow)
+    # Partition key on Postgres (RANGE by month, see migration v7); the database
+    # primary key there is (id, recorded_at)
+    recorded_at = Column(DateTime, default=datetime.utcnow, nullable=False)
     
     # Doctor who created the record
     created_by_id = Column(Integer, ForeignKey("doctors.id"), nullable=False)
     
     # Original Data
     audio_file_path = Column(String)  # Path to stored audio file
-    transcription = Column(String)  # Full transcription text
+    # Large payload columns are deferred; detail queries undefer the "payload" group
+    transcription = deferred(Column(String), group="payload")  # Full transcription text
     
     # Extracted Data
-    extracted_data = Column(JSON)  # Store all extracted information as JSON
+    extracted_data = deferred(Column(JSONVariant), group="payload")  # Store all extracted information as JSON
     
     # Metadata
     is_processed = Column(Boolean, default=False)
     processing_status = Column(String)  # For tracking NLP processing status
+    # Trace of the last status change (see app.core.tracing)
+    processing_trace_id = Column(String(32))
     
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
 
     # Relationships
     patient = relationship("Patient", back_populates="clinical_records")
-    created_by = relationship("Doctor", foreign_keys=[created_by_id])
\ No newline at end of file
+    created_by = relationship("Doctor", foreign_keys=[created_by_id])
+
+    __table_args__ = (
+        Index("ix_clinical_records_patient_recorded", "patient_id", "recorded_at"),
+        # Small partial index behind the processing queue metrics
+        Index(
+            "ix_clinical_records_pending",
+            "created_at",
+            postgresql_where=text("processing_status = 'pending'"),
+            sqlite_where=text("processing_status = 'pending'")
+        ),
+        Index(
+            "ix_clinical_records_extracted_data",
+            "extracted_data",
+            postgresql_using="gin",
+            postgresql_ops={"extracted_data": "jsonb_path_ops"}
+        ),
+    )
+
+# Summary columns for patient listings; deferred so they only run when undeferred
+Patient.record_count = column_property(
+    select(func.count(ClinicalRecord.id))
+    .where(ClinicalRecord.patient_id == Patient.id)
+    .correlate_except(ClinicalRecord)
+    .scalar_subquery(),
+    deferred=True
+)
+
+Patient.last_record_at = column_property(
+    select(func.max(ClinicalRecord.recorded_at))
+    .where(ClinicalRecord.patient_id == Patient.id)
+    .correlate_except(ClinicalRecord)
+    .scalar_subquery(),
+    deferred=True
+)
+
+event.listen(
+    Patient.__table__,
+    "before_create",
+    DDL("CREATE EXTENSION IF NOT EXISTS pg_trgm").execute_if(dialect="postgresql")
+)
+
+# Full-text search over transcriptions. Postgres keeps a generated tsvector column
+# (GIN indexed); SQLite keeps an external-content FTS5 table in sync via triggers.
+# The column/table is not mapped, see app.crud.patient.search_clinical_records.
+_fulltext_ddl = [
+    DDL(
+        "ALTER TABLE clinical_records ADD COLUMN search_vector tsvector "
+        "GENERATED ALWAYS AS (to_tsvector('english', coalesce(transcription, ''))) STORED"
+    ).execute_if(dialect="postgresql"),
+    DDL(
+        "CREATE INDEX ix_clinical_records_search_vector "
+        "ON clinical_records USING gin (search_vector)"
+    ).execute_if(dialect="postgresql"),
+    DDL(
+        "CREATE VIRTUAL TABLE clinical_records_fts USING fts5("
+        "transcription, content='clinical_records', content_rowid='id', tokenize='porter')"
+    ).execute_if(dialect="sqlite"),
+    DDL(
+        "CREATE TRIGGER clinical_records_fts_ai AFTER INSERT ON clinical_records BEGIN "
+        "INSERT INTO clinical_records_fts(rowid, transcription) VALUES (new.id, new.transcription); "
+        "END"
+    ).execute_if(dialect="sqlite"),
+    DDL(
+        "CREATE TRIGGER clinical_records_fts_ad AFTER DELETE ON clinical_records BEGIN "
+        "INSERT INTO clinical_records_fts(clinical_records_fts, rowid, transcription) "
+        "VALUES ('delete', old.id, old.transcription); "
+        "END"
+    ).execute_if(dialect="sqlite"),
+    DDL(
+        "CREATE TRIGGER clinical_records_fts_au AFTER UPDATE OF transcription ON clinical_records BEGIN "
+        "INSERT INTO clinical_records_fts(clinical_records_fts, rowid, transcription) "
+        "VALUES ('delete', old.id, old.transcription); "
+        "INSERT INTO clinical_records_fts(rowid, transcription) VALUES (new.id, new.transcription); "
+        "END"
+    ).execute_if(dialect="sqlite"),
+]
+
+for _ddl in _fulltext_ddl:
+    event.listen(ClinicalRecord.__table__, "after_create", _ddl)
+
+event.listen(
+    ClinicalRecord.__table__,
+    "before_drop",
+    DDL("DROP TABLE IF EXISTS clinical_records_fts").execute_if(dialect="sqlite")
+)
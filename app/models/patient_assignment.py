@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, ForeignKey, DateTime
+from sqlalchemy import Column, Integer, ForeignKey, DateTime, Index, text
 from sqlalchemy.orm import relationship
 from datetime import datetime
 
@@ -16,3 +16,14 @@ class PatientAssignment(Base):
     # Relationships
     patient = relationship("Patient")
     resident = relationship("Doctor")
+
+    __table_args__ = (
+        # At most one open assignment per patient
+        Index(
+            "uq_patient_assignments_open",
+            "patient_id",
+            unique=True,
+            postgresql_where=text("ended_at IS NULL"),
+            sqlite_where=text("ended_at IS NULL")
+        ),
+    )
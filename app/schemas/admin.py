@@ -0,0 +1,42 @@
+from pydantic import BaseModel
+from typing import Optional, List
+from datetime import datetime
+
+class ProfileInfo(BaseModel):
+    id: str
+    created_at: datetime
+    size_bytes: int
+
+class ModelMemory(BaseModel):
+    name: str
+    rss_delta_bytes: Optional[int] = None
+    parameter_bytes: Optional[int] = None
+    loaded_at: datetime
+
+class TracemallocStatus(BaseModel):
+    tracing: bool
+    traceback_limit: int
+    traced_bytes: int
+    peak_traced_bytes: int
+
+class SnapshotInfo(BaseModel):
+    id: int
+    taken_at: datetime
+
+class MemoryReport(BaseModel):
+    pid: int
+    rss_bytes: Optional[int] = None
+    peak_rss_bytes: Optional[int] = None
+    models: List[ModelMemory] = []
+    tracemalloc: TracemallocStatus
+    snapshots: List[SnapshotInfo] = []
+
+class AllocationSite(BaseModel):
+    site: str
+    traceback: Optional[List[str]] = None  # group_by=traceback, most recent frame first
+    size_bytes: int
+    count: int
+
+class AllocationDiff(AllocationSite):
+    size_diff_bytes: int
+    count_diff: int
@@ -107,6 +107,14 @@ class DoctorInDB(DoctorBase):
 class Doctor(DoctorInDB):
     pass
 
+class DoctorRef(BaseModel):
+    """Compact doctor reference used in listing responses."""
+    id: int
+    full_name: str
+
+    class Config:
+        from_attributes = True
+
 class DoctorProfile(BaseModel):
     age: int
     full_name: str
@@ -0,0 +1,19 @@
+from pydantic import BaseModel
+from typing import Optional, List
+from datetime import datetime
+
+class ObservationPoint(BaseModel):
+    start: datetime
+    end: datetime
+    count: int
+    min: Optional[float] = None
+    max: Optional[float] = None
+    avg: Optional[float] = None
+
+class ObservationSeries(BaseModel):
+    patient_id: int
+    code: str
+    unit: Optional[str] = None
+    start: datetime
+    end: datetime
+    points: List[ObservationPoint] = []
@@ -1,7 +1,7 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 from typing import Optional, List, Dict, Any
 from datetime import datetime
-from .doctor import Doctor
+from .doctor import Doctor, DoctorRef
 
 class PatientBase(BaseModel):
     name: str
@@ -26,6 +26,18 @@ class PatientUpdate(BaseModel):
     additional_notes: Optional[List[str]] = None
     current_resident_id: Optional[int] = None
 
+class PatientImportError(BaseModel):
+    row: int
+    errors: List[Dict[str, Any]]
+
+class PatientImportReport(BaseModel):
+    format: str
+    total_rows: int = 0
+    imported: int = 0
+    failed: int = 0
+    errors: List[PatientImportError] = []
+    errors_truncated: bool = False
+
 class ClinicalRecordBase(BaseModel):
     transcription: Optional[str] = None
     extracted_data: Optional[Dict[str, Any]] = None
@@ -45,11 +57,23 @@ class ClinicalRecordInDB(ClinicalRecordBase):
     recorded_at: datetime
     is_processed: bool
     processing_status: Optional[str]
+    processing_trace_id: Optional[str] = None
     created_by: Doctor
 
     class Config:
         from_attributes = True
 
+class ClinicalRecordSearchHit(BaseModel):
+    id: int
+    patient_id: int
+    patient_name: str
+    recorded_at: datetime
+    rank: float
+    snippet: str
+
+    class Config:
+        from_attributes = True
+
 class PatientInDB(PatientBase):
     id: int
     created_at: datetime
@@ -64,6 +88,21 @@ class PatientInDB(PatientBase):
 class Patient(PatientInDB):
     pass
 
+class PatientSummary(BaseModel):
+    """Lightweight patient projection for listings; full payload lives on detail endpoints."""
+    id: int
+    name: str
+    age: Optional[int] = None
+    gender: Optional[str] = None
+    updated_at: datetime
+    consultant: DoctorRef
+    current_resident: Optional[DoctorRef] = None
+    record_count: int = 0
+    last_record_at: Optional[datetime] = None
+
+    class Config:
+        from_attributes = True
+
 # Schema for Patient Assignment
 class PatientAssignmentBase(BaseModel):
     patient_id: int
@@ -75,6 +114,17 @@ class PatientAssignmentCreate(PatientAssignmentBase):
 class PatientAssignmentUpdate(BaseModel):
     ended_at: datetime
 
+class PatientReassignment(BaseModel):
+    patient_ids: List[int] = Field(min_length=1, max_length=1000)
+    resident_id: int
+    # Only move patients currently assigned to this resident
+    from_resident_id: Optional[int] = None
+
+class PatientReassignmentResult(BaseModel):
+    resident_id: int
+    reassigned: List[int]
+    unchanged: List[int]
+
 class PatientAssignmentInDB(PatientAssignmentBase):
     id: int
     assigned_at: datetime
@@ -0,0 +1,40 @@
+"""
+Speech recognition backends, selected by Settings.ASR_BACKEND:
+
+    whisper    OpenAI Whisper on PyTorch (ASR_MODEL_SIZE, ASR_DEVICE)
+    quantized  faster-whisper with ASR_QUANTIZED_COMPUTE_TYPE weights
+    stub       canned transcripts at ASR_STUB_REAL_TIME_FACTOR x the audio
+               duration; needs neither torch nor a model download
+
+Backends are imported lazily, so only the selected one's dependencies
+need to be installed.
+"""
+from functools import lru_cache
+
+from app.core.config import settings
+from app.services.asr.base import ASRBackend, ASRCapabilities, Transcript, TranscriptSegment, TranscriptWord
+
+__all__ = [
+    "ASRBackend", "ASRCapabilities", "Transcript", "TranscriptSegment", "TranscriptWord",
+    "BACKENDS", "get_backend",
+]
+
+BACKENDS = ("whisper", "quantized", "stub")
+
+@lru_cache()
+def get_backend() -> ASRBackend:
+    """The configured backend, one instance (and model) per process."""
+    name = settings.ASR_BACKEND
+    if name == "whisper":
+        from app.services.asr.whisper_backend import WhisperBackend
+        return WhisperBackend(settings.ASR_MODEL_SIZE, settings.ASR_MODEL_DIR, settings.ASR_DEVICE)
+    if name == "quantized":
+        from app.services.asr.quantized import QuantizedWhisperBackend
+        return QuantizedWhisperBackend(
+            settings.ASR_MODEL_SIZE, settings.ASR_MODEL_DIR, settings.ASR_DEVICE,
+            compute_type=settings.ASR_QUANTIZED_COMPUTE_TYPE
+        )
+    if name == "stub":
+        from app.services.asr.stub import StubBackend
+        return StubBackend(settings.ASR_STUB_REAL_TIME_FACTOR)
+    raise ValueError(f"Unknown ASR_BACKEND {name!r}; choose from {', '.join(BACKENDS)}")
@@ -0,0 +1,65 @@
+"""
+The interface every speech recognition backend implements.
+"""
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Protocol
+
+@dataclass
+class TranscriptWord:
+    start: float  # Seconds
+    end: float
+    word: str
+    probability: Optional[float] = None
+
+@dataclass
+class TranscriptSegment:
+    start: float  # Seconds
+    end: float
+    text: str
+    words: List[TranscriptWord] = field(default_factory=list)  # With timestamps only
+
+@dataclass
+class Transcript:
+    text: str
+    language: Optional[str] = None
+    duration: Optional[float] = None  # Seconds of audio
+    segments: List[TranscriptSegment] = field(default_factory=list)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Whisper's result shape, for callers that used its dict directly."""
+        return {
+            "text": self.text,
+            "language": self.language,
+            "segments": [_segment_dict(segment) for segment in self.segments],
+        }
+
+def _segment_dict(segment: TranscriptSegment) -> Dict[str, Any]:
+    result: Dict[str, Any] = {"start": segment.start, "end": segment.end, "text": segment.text}
+    if segment.words:
+        result["words"] = [
+            {"word": word.word, "start": word.start, "end": word.end, "probability": word.probability}
+            for word in segment.words
+        ]
+    return result
+
+@dataclass
+class ASRCapabilities:
+    name: str
+    model: str
+    timestamps: bool = True  # Segment-level
+    word_timestamps: bool = True
+    language_detection: bool = True
+    # Needs torch and downloaded weights
+    requires_model_download: bool = True
+
+class ASRBackend(Protocol):
+    def capabilities(self) -> ASRCapabilities:
+        ...
+
+    def transcribe(self, audio_path: str) -> Transcript:
+        """Text of the recording (segments may be left empty)."""
+        ...
+
+    def transcribe_with_timestamps(self, audio_path: str) -> Transcript:
+        """Text split into segments with start/end times, and word timings."""
+        ...
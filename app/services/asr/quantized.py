@@ -0,0 +1,87 @@
+"""
+Quantized Whisper through faster-whisper (CTranslate2): int8 weights by
+default, several times faster than the PyTorch model on CPU and without
+torch. Requires faster-whisper; the model is downloaded on first use.
+"""
+from typing import Any, Optional
+import threading
+import time
+
+from app.core import memory, metrics, tracing
+from app.services.asr.base import ASRCapabilities, Transcript, TranscriptSegment, TranscriptWord
+
+class QuantizedWhisperBackend:
+    def __init__(
+        self,
+        model_size: str,
+        download_root: Optional[str] = None,
+        device: Optional[str] = None,
+        compute_type: str = "int8"
+    ):
+        self.model_size = model_size
+        self.download_root = download_root
+        self.device = device or "auto"
+        self.compute_type = compute_type
+        self._model = None
+        self._lock = threading.Lock()
+
+    @property
+    def label(self) -> str:
+        return f"{self.model_size}-{self.compute_type}"
+
+    def capabilities(self) -> ASRCapabilities:
+        return ASRCapabilities(name="quantized", model=self.label)
+
+    def get_model(self) -> Any:
+        if self._model is None:
+            with self._lock:
+                if self._model is None:
+                    from faster_whisper import WhisperModel
+
+                    model_name = f"faster-whisper-{self.label}"
+                    with metrics.timed(metrics.MODEL_LOAD_SECONDS.labels(model=model_name)):
+                        with memory.track_model_load(model_name):
+                            model = WhisperModel(
+                                self.model_size,
+                                device=self.device,
+                                compute_type=self.compute_type,
+                                download_root=self.download_root
+                            )
+                    self._model = model
+        return self._model
+
+    def _run(self, audio_path: str, **options: Any) -> Transcript:
+        model = self.get_model()
+        start = time.perf_counter()
+        with tracing.span("asr.transcribe", model_size=self.label) as current:
+            # Segments are generated lazily; decoding happens while iterating
+            segments, info = model.transcribe(audio_path, **options)
+            segments = [
+                TranscriptSegment(
+                    start=segment.start,
+                    end=segment.end,
+                    text=segment.text,
+                    words=[
+                        TranscriptWord(
+                            start=word.start, end=word.end, word=word.word, probability=word.probability
+                        )
+                        for word in segment.words or []
+                    ]
+                )
+                for segment in segments
+            ]
+            if current is not None:
+                current.set_attribute("audio_seconds", info.duration)
+        metrics.observe_transcription(self.label, time.perf_counter() - start, info.duration)
+        return Transcript(
+            text="".join(segment.text for segment in segments),
+            language=info.language,
+            duration=info.duration,
+            segments=segments
+        )
+
+    def transcribe(self, audio_path: str) -> Transcript:
+        return self._run(audio_path, without_timestamps=True)
+
+    def transcribe_with_timestamps(self, audio_path: str) -> Transcript:
+        return self._run(audio_path, word_timestamps=True)
@@ -0,0 +1,82 @@
+"""
+Deterministic stand-in for a real model, for tests, load tests and
+benchmarks of the pipeline without model cost: the same audio always gives
+the same canned transcript. It blocks for real_time_factor x the audio
+duration, as inference does, so the rest of the system sees similar
+timing.
+"""
+from typing import List
+import hashlib
+import os
+import time
+import wave
+
+from app.core import metrics, tracing
+from app.services.asr.base import ASRCapabilities, Transcript, TranscriptSegment, TranscriptWord
+
+# Shaped so that every NLP extraction stage finds something
+STUB_TRANSCRIPTS = [
+    "58 year old man with chest pain on exertion for two weeks. BP 150/95, heart rate 92 bpm. "
+    "Taking aspirin 81 mg daily and atorvastatin 40 mg. History of hypertension and diabetes.",
+    "34 year old woman presenting with headache and nausea since yesterday. BP 118/76, "
+    "heart rate 70 bpm. Takes ibuprofen 400 mg as needed. No known allergies.",
+    "72 year old gentleman with shortness of breath and ankle swelling. BP 135/85, heart rate "
+    "104 bpm. On furosemide 40 mg and metoprolol 50 mg. Previous myocardial infarction.",
+    "45 year old lady with cough and fever for five days. BP 125/80, heart rate 98 bpm. "
+    "Started amoxicillin 500 mg three times daily. Smoker, 20 pack years.",
+]
+
+def audio_duration(audio_path: str) -> float:
+    try:
+        with wave.open(audio_path) as wav:
+            return wav.getnframes() / wav.getframerate()
+    except (wave.Error, EOFError):
+        # Not a WAV file: assume 16 kHz 16-bit mono
+        return os.path.getsize(audio_path) / 32000
+
+class StubBackend:
+    def __init__(self, real_time_factor: float = 0.1):
+        self.real_time_factor = real_time_factor
+
+    def capabilities(self) -> ASRCapabilities:
+        return ASRCapabilities(
+            name="stub", model="stub", language_detection=False, requires_model_download=False
+        )
+
+    def _segments(self, text: str, duration: float) -> List[TranscriptSegment]:
+        sentences = [sentence.strip() + "." for sentence in text.split(".") if sentence.strip()]
+        step = duration / len(sentences)
+        return [
+            TranscriptSegment(
+                start=n * step,
+                end=(n + 1) * step,
+                text=" " + sentence,
+                words=self._words(sentence, n * step, step)
+            )
+            for n, sentence in enumerate(sentences)
+        ]
+
+    def _words(self, sentence: str, start: float, duration: float) -> List[TranscriptWord]:
+        """The sentence's words spread evenly over its segment."""
+        words = sentence.split()
+        step = duration / len(words)
+        return [
+            TranscriptWord(start=start + n * step, end=start + (n + 1) * step, word=" " + word, probability=1.0)
+            for n, word in enumerate(words)
+        ]
+
+    def transcribe(self, audio_path: str) -> Transcript:
+        duration = audio_duration(audio_path)
+        start = time.perf_counter()
+        with tracing.span("asr.transcribe", model_size="stub", audio_seconds=duration):
+            time.sleep(duration * self.real_time_factor)
+            with open(audio_path, "rb") as f:
+                digest = hashlib.sha256(f.read()).digest()
+            text = STUB_TRANSCRIPTS[digest[0] % len(STUB_TRANSCRIPTS)]
+        metrics.observe_transcription("stub", time.perf_counter() - start, duration)
+        return Transcript(text=text, language="en", duration=duration)
+
+    def transcribe_with_timestamps(self, audio_path: str) -> Transcript:
+        transcript = self.transcribe(audio_path)
+        transcript.segments = self._segments(transcript.text, transcript.duration)
+        return transcript
@@ -0,0 +1,87 @@
+"""
+OpenAI Whisper (PyTorch) backend.
+"""
+from typing import Any, Optional
+import threading
+import time
+
+from app.core import memory, metrics, tracing
+from app.services.asr.base import ASRCapabilities, Transcript, TranscriptSegment, TranscriptWord
+
+def _default_device() -> str:
+    import torch
+
+    if torch.cuda.is_available():
+        return "cuda"
+    if torch.backends.mps.is_available():
+        return "mps"
+    return "cpu"
+
+class WhisperBackend:
+    """Loads the model on first use; one model per process."""
+    def __init__(self, model_size: str, download_root: Optional[str] = None, device: Optional[str] = None):
+        self.model_size = model_size
+        self.download_root = download_root
+        self.device = device
+        self._model = None
+        self._lock = threading.Lock()
+
+    def capabilities(self) -> ASRCapabilities:
+        return ASRCapabilities(name="whisper", model=self.model_size)
+
+    def get_model(self) -> Any:
+        if self._model is None:
+            with self._lock:
+                if self._model is None:
+                    import whisper
+
+                    device = self.device or _default_device()
+                    model_name = f"whisper-{self.model_size}"
+                    with metrics.timed(metrics.MODEL_LOAD_SECONDS.labels(model=model_name)):
+                        with memory.track_model_load(model_name) as loaded:
+                            loaded["model"] = whisper.load_model(
+                                self.model_size, device=device, download_root=self.download_root
+                            )
+                    self._model = loaded["model"]
+        return self._model
+
+    def _run(self, audio_path: str, **options: Any) -> Transcript:
+        import whisper
+
+        model = self.get_model()
+        # Decoding (ffmpeg) separately from inference so both show up in traces
+        with tracing.span("audio.decode"):
+            audio = whisper.load_audio(audio_path)
+        audio_seconds = len(audio) / whisper.audio.SAMPLE_RATE
+        start = time.perf_counter()
+        with tracing.span("asr.transcribe", model_size=self.model_size, audio_seconds=audio_seconds):
+            result = model.transcribe(audio, **options)
+        metrics.observe_transcription(self.model_size, time.perf_counter() - start, audio_seconds)
+        return Transcript(
+            text=result["text"],
+            language=result.get("language"),
+            duration=audio_seconds,
+            segments=[
+                TranscriptSegment(
+                    start=segment["start"],
+                    end=segment["end"],
+                    text=segment["text"],
+                    words=[
+                        TranscriptWord(
+                            start=word["start"],
+                            end=word["end"],
+                            word=word["word"],
+                            probability=word.get("probability")
+                        )
+                        for word in segment.get("words") or []
+                    ]
+                )
+                for segment in result.get("segments") or []
+            ]
+        )
+
+    def transcribe(self, audio_path: str) -> Transcript:
+        return self._run(audio_path)
+
+    def transcribe_with_timestamps(self, audio_path: str) -> Transcript:
+        return self._run(audio_path, word_timestamps=True)
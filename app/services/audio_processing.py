@@ -1,23 +1,15 @@
-import os
-import whisper
 from fastapi import UploadFile
+from fastapi.concurrency import run_in_threadpool
 from pathlib import Path
 from datetime import datetime
 
-# Initialize the Whisper model lazily
-_model = None
-
-def get_model():
-    global _model
-    if _model is None:
-        # Use environment variable for model size or default to "base"
-        model_size = os.getenv("WHISPER_MODEL_SIZE", "base")
-        _model = whisper.load_model(model_size, download_root="/app/models")
-    return _model
+from app.core import tracing
+from app.services.asr import get_backend
 
 async def process_audio_file(audio_file: UploadFile) -> tuple[str, str]:
     """
-    Process an audio file using Whisper for transcription.
+    Save an uploaded recording and transcribe it with the configured ASR
+    backend (Settings.ASR_BACKEND).
     Returns the path where the audio is saved and the transcription.
     """
     # Create uploads directory if it doesn't exist
@@ -30,13 +22,14 @@ async def process_audio_file(audio_file: UploadFile) -> tuple[str, str]:
     file_path = uploads_dir / filename
     
     # Save uploaded file
-    with open(file_path, "wb") as f:
+    with tracing.span("upload.save") as save_span:
         content = await audio_file.read()
-        f.write(content)
+        await run_in_threadpool(file_path.write_bytes, content)
+        if save_span is not None:
+            save_span.set_attribute("file.size", len(content))
     
-    # Get model and transcribe audio
-    model = get_model()
-    result = model.transcribe(str(file_path))
-    transcription = result["text"]
+    # Backends block for the whole transcription; keep it off the event loop
+    transcript = await run_in_threadpool(get_backend().transcribe, str(file_path))
+    transcription = transcript.text
     
     return str(file_path), transcription
@@ -13,12 +13,8 @@ class MedicalNLPService:
         self.medical_terms = self._load_medical_terms()
     
     def _load_medical_terms(self) -> Dict[str, List[str]]:
-        """Load medical terminology from JSON file"""
-        terms_path = Path(__file__).parent / "medical_terms.json"
-        if terms_path.exists():
-            with open(terms_path) as f:
-                return json.load(f)
-        return {
+        """Load medical terminology from JSON file, over the built-in lists"""
+        terms = {
             "risk_factors": [
                 "diabetes", "hypertension", "smoking", "obesity",
                 "hyperlipidemia", "cardiovascular disease"
@@ -33,6 +29,15 @@ class MedicalNLPService:
                 "shortness of breath", "chest pain"
             ]
         }
+        terms_path = Path(__file__).parent / "medical_terms.json"
+        if terms_path.exists():
+            with open(terms_path) as f:
+                loaded = json.load(f)
+            terms.update(loaded)
+            # medical_terms.json lists the entities to look for as symptoms
+            if "medical_entities" not in loaded and "symptoms" in loaded:
+                terms["medical_entities"] = loaded["symptoms"]
+        return terms
     
     def extract_demographics(self, text: str) -> Dict[str, Any]:
         """Extract demographic information from text"""
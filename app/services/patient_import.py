@@ -0,0 +1,79 @@
+from typing import Any, BinaryIO, Dict, Iterator, List, Optional, Tuple
+import codecs
+import csv
+import json
+from pydantic import ValidationError
+from app.schemas.patient import PatientCreate
+
+SUPPORTED_FORMATS = ("csv", "ndjson")
+
+# PatientCreate fields that hold JSON values; CSV cells carry them as JSON text
+JSON_FIELDS = ("risk_factors", "family_history", "surgical_history", "additional_notes")
+
+def detect_format(filename: Optional[str], content_type: Optional[str]) -> Optional[str]:
+    """Guess the import format from the upload's filename or content type."""
+    filename = (filename or "").lower()
+    content_type = (content_type or "").lower()
+    if filename.endswith(".csv") or content_type in ("text/csv", "application/csv"):
+        return "csv"
+    if filename.endswith((".ndjson", ".jsonl")) or content_type in (
+        "application/x-ndjson", "application/ndjson", "application/jsonl"
+    ):
+        return "ndjson"
+    return None
+
+def _iter_text_lines(file: BinaryIO) -> Iterator[str]:
+    # Decode incrementally so only one line is held in memory at a time
+    return codecs.getreader("utf-8-sig")(file)
+
+def _iter_csv(file: BinaryIO) -> Iterator[Tuple[int, Any]]:
+    reader = csv.DictReader(_iter_text_lines(file))
+    for row in reader:
+        data: Dict[str, Any] = {}
+        try:
+            for key, value in row.items():
+                if key is None or value is None or value.strip() == "":
+                    continue
+                value = value.strip()
+                data[key.strip()] = json.loads(value) if key.strip() in JSON_FIELDS else value
+        except json.JSONDecodeError as e:
+            yield reader.line_num, ValueError(f"Invalid JSON in column: {e}")
+            continue
+        yield reader.line_num, data
+
+def _iter_ndjson(file: BinaryIO) -> Iterator[Tuple[int, Any]]:
+    for line_number, line in enumerate(_iter_text_lines(file), start=1):
+        if not line.strip():
+            continue
+        try:
+            yield line_number, json.loads(line)
+        except json.JSONDecodeError as e:
+            yield line_number, ValueError(f"Invalid JSON: {e}")
+
+def iter_patient_rows(
+    file: BinaryIO,
+    fmt: str,
+    default_consultant_id: int
+) -> Iterator[Tuple[int, Optional[PatientCreate], Optional[List[Dict[str, Any]]]]]:
+    """
+    Stream (row number, patient, errors) tuples from a CSV or NDJSON upload.
+    Each row is validated against PatientCreate on its own, so one bad row
+    only produces an error entry instead of failing the import.
+    """
+    rows = _iter_csv(file) if fmt == "csv" else _iter_ndjson(file)
+    for row_number, data in rows:
+        if isinstance(data, ValueError):
+            yield row_number, None, [{"msg": str(data)}]
+            continue
+        if not isinstance(data, dict):
+            yield row_number, None, [{"msg": "Row must be an object"}]
+            continue
+
+        data.setdefault("consultant_id", default_consultant_id)
+        try:
+            yield row_number, PatientCreate.model_validate(data), None
+        except ValidationError as e:
+            yield row_number, None, [
+                {"loc": list(error["loc"]), "msg": error["msg"]}
+                for error in e.errors()
+            ]
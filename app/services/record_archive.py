@@ -0,0 +1,469 @@
+"""
+Monthly partition maintenance and archival for clinical_records (Postgres).
+
+clinical_records is RANGE-partitioned by recorded_at into monthly tables
+named clinical_records_yYYYYmMM (migration v7). This module creates
+upcoming partitions and moves partitions older than the retention window
+to archive storage. Each partition is archived in one transaction, with
+writes to it blocked: dump to gzip NDJSON, record the file in
+clinical_record_archives (and each record's archive and chunk in
+clinical_record_archive_entries), detach, drop. A record is therefore always
+either in clinical_records or in an archive, and stays readable through
+find_archived_record. Archive files are a series of gzip members of
+ARCHIVE_CHUNK_ROWS records (still one valid .gz file), so reading one record
+only decompresses its chunk.
+
+Rows that landed in the default partition (recorded_at outside every
+monthly partition, e.g. back-dated) are moved into their month's partition
+when it is created; archiving first creates the partitions for default rows
+older than the cutoff, so they are archived too.
+
+Each worker creates upcoming partitions at startup and then every
+PARTITION_MAINTENANCE_INTERVAL_HOURS (start_partition_maintenance); the
+CLI does the same on demand, e.g. from cron when that is set to 0:
+
+    python -m app.services.record_archive ensure
+    python -m app.services.record_archive archive [--before 2024-01-01] [--dry-run]
+"""
+from typing import Any, Dict, IO, Iterable, Iterator, List, Optional, Tuple
+from contextlib import contextmanager
+from datetime import date, datetime
+import argparse
+import gzip
+import json
+import logging
+import os
+import re
+import threading
+import time
+from sqlalchemy import exists, text, insert, update
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.models.doctor import Doctor
+from app.models.patient import ClinicalRecord
+from app.models.clinical_record_archive import ClinicalRecordArchive, ClinicalRecordArchiveEntry
+
+logger = logging.getLogger(__name__)
+
+PARENT_TABLE = "clinical_records"
+DEFAULT_PARTITION = "clinical_records_default"
+PARTITION_NAME_PATTERN = re.compile(r"^clinical_records_y(\d{4})m(\d{2})$")
+
+# Columns written to archive files; search_vector is generated and not kept
+ARCHIVE_COLUMNS = [column.name for column in ClinicalRecord.__table__.columns]
+DATETIME_COLUMNS = ("recorded_at", "created_at", "updated_at")
+
+class LocalArchiveStorage:
+    """
+    Archive files on the local filesystem (or a mounted bucket).
+    Another backend only needs the same three methods.
+    """
+    def __init__(self, base_dir: Optional[str] = None):
+        self.base_dir = base_dir or settings.ARCHIVE_STORAGE_DIR
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.base_dir, key)
+
+    @contextmanager
+    def open_write(self, key: str) -> Iterator[IO[bytes]]:
+        """Write a binary file; it only appears under its key once complete."""
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.tmp"
+        try:
+            with open(tmp_path, "wb") as f:
+                yield f
+            os.replace(tmp_path, path)
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+    @contextmanager
+    def open_read(self, key: str) -> Iterator[IO[bytes]]:
+        with open(self._path(key), "rb") as f:
+            yield f
+
+    def read_range(self, key: str, offset: int, length: int) -> bytes:
+        with open(self._path(key), "rb") as f:
+            f.seek(offset)
+            return f.read(length)
+
+def get_storage() -> LocalArchiveStorage:
+    return LocalArchiveStorage()
+
+def _add_months(month: date, months: int) -> date:
+    index = month.year * 12 + month.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+def _months(first: date, last: date) -> Iterator[date]:
+    month = first
+    while month <= last:
+        yield month
+        month = _add_months(month, 1)
+
+def partition_name(month: date) -> str:
+    return f"{PARENT_TABLE}_y{month.year:04d}m{month.month:02d}"
+
+def partition_range(name: str) -> Optional[Dict[str, date]]:
+    """Month range [start, end) of a monthly partition, None for other tables."""
+    match = PARTITION_NAME_PATTERN.match(name)
+    if not match:
+        return None
+    start = date(int(match.group(1)), int(match.group(2)), 1)
+    return {"start": start, "end": _add_months(start, 1)}
+
+def is_partitioned(conn: Connection) -> bool:
+    if conn.dialect.name != "postgresql":
+        return False
+    return bool(conn.execute(text("""
+        SELECT EXISTS (
+            SELECT 1 FROM pg_partitioned_table pt
+            JOIN pg_class c ON c.oid = pt.partrelid
+            WHERE c.relname = :table AND c.relnamespace = current_schema()::regnamespace
+        )
+    """), {"table": PARENT_TABLE}).scalar())
+
+def list_monthly_partitions(conn: Connection) -> List[Dict[str, Any]]:
+    """
+    Monthly partition tables by month, including ones already detached
+    by an archive run that did not finish.
+    """
+    rows = conn.execute(text("""
+        SELECT c.relname AS name,
+            EXISTS (SELECT 1 FROM pg_inherits i WHERE i.inhrelid = c.oid) AS attached
+        FROM pg_class c
+        WHERE c.relkind = 'r'
+          AND c.relnamespace = current_schema()::regnamespace
+          AND c.relname ~ '^clinical_records_y[0-9]{4}m[0-9]{2}$'
+        ORDER BY c.relname
+    """)).all()
+    return [
+        {"name": row.name, "attached": row.attached, **partition_range(row.name)}
+        for row in rows
+    ]
+
+def ensure_partitions(
+    engine: Engine,
+    months_ahead: Optional[int] = None,
+    since: Optional[date] = None
+) -> List[str]:
+    """
+    Create the partitions for the current month and the next `months_ahead`
+    months if missing, so inserts never land in the default partition.
+    `since` also creates the months from then on (for backfills).
+    Returns the names of the partitions created.
+    """
+    months_ahead = settings.PARTITION_MONTHS_AHEAD if months_ahead is None else months_ahead
+    this_month = date.today().replace(day=1)
+    first_month = min(since or this_month, this_month).replace(day=1)
+    last_month = _add_months(this_month, months_ahead)
+    with engine.begin() as conn:
+        _lock_partitions(conn)
+        return _create_partitions(conn, _months(first_month, last_month))
+
+def _lock_partitions(conn: Connection) -> None:
+    if not is_partitioned(conn):
+        raise RuntimeError(f"{PARENT_TABLE} is not a partitioned table")
+    # Workers run this concurrently at startup; the first one creates
+    conn.execute(text("SELECT pg_advisory_xact_lock(hashtext('clinical_records_partitions'))"))
+
+def _has_default_partition(conn: Connection) -> bool:
+    return conn.execute(text("SELECT to_regclass(:name) IS NOT NULL"), {"name": DEFAULT_PARTITION}).scalar()
+
+def _create_partitions(conn: Connection, months: Iterable[date]) -> List[str]:
+    """
+    Create the missing monthly partitions among `months`. Rows of those
+    months in the default partition are moved into them; Postgres refuses
+    to create a partition whose rows sit in the default one.
+    """
+    existing = {partition["name"] for partition in list_monthly_partitions(conn)}
+    missing = [month for month in months if partition_name(month) not in existing]
+    has_default = bool(missing) and _has_default_partition(conn)
+    if has_default:
+        # Reads go on; inserts into the default partition wait until commit
+        conn.execute(text(f"LOCK TABLE {DEFAULT_PARTITION} IN EXCLUSIVE MODE"))
+
+    columns = ", ".join(ARCHIVE_COLUMNS)
+    created = []
+    for month in missing:
+        name = partition_name(month)
+        bounds = {"start": month, "end": _add_months(month, 1)}
+        moved = 0
+        if has_default:
+            in_month = "recorded_at >= :start AND recorded_at < :end"
+            conn.execute(text(
+                f"CREATE TEMPORARY TABLE moved_clinical_records AS "
+                f"SELECT {columns} FROM {DEFAULT_PARTITION} WHERE {in_month}"
+            ), bounds)
+            moved = conn.execute(text(f"DELETE FROM {DEFAULT_PARTITION} WHERE {in_month}"), bounds).rowcount
+        conn.execute(text(
+            f'CREATE TABLE "{name}" PARTITION OF {PARENT_TABLE} '
+            f"FOR VALUES FROM ('{bounds['start'].isoformat()}') TO ('{bounds['end'].isoformat()}')"
+        ))
+        if has_default:
+            if moved:
+                conn.execute(text(
+                    f"INSERT INTO {PARENT_TABLE} ({columns}) SELECT {columns} FROM moved_clinical_records"
+                ))
+                logger.info("Moved clinical records out of the default partition", extra={
+                    "partition": name, "rows": moved
+                })
+            conn.execute(text("DROP TABLE moved_clinical_records"))
+        created.append(name)
+    return created
+
+def _default_partition_months(conn: Connection, before: date) -> Dict[date, int]:
+    """Row count per month of the default partition's rows recorded before `before`."""
+    if not _has_default_partition(conn):
+        return {}
+    rows = conn.execute(text(
+        f"SELECT date_trunc('month', recorded_at)::date AS month, count(*) AS row_count "
+        f"FROM {DEFAULT_PARTITION} WHERE recorded_at < :before GROUP BY 1 ORDER BY 1"
+    ), {"before": before}).all()
+    return {row.month: row.row_count for row in rows}
+
+def _json_default(value: Any) -> Any:
+    if isinstance(value, datetime):
+        return value.isoformat()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+def _batches(rows: Iterable[Dict[str, Any]], size: int) -> Iterator[List[Dict[str, Any]]]:
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+def write_chunks(
+    f: IO[bytes],
+    rows: Iterable[Dict[str, Any]],
+    chunk_rows: int
+) -> Iterator[Tuple[List[Dict[str, Any]], int, int]]:
+    """
+    Write `rows` as NDJSON, every `chunk_rows` rows compressed as a gzip
+    member of their own. Yields (rows, offset, length) per chunk.
+    """
+    offset = 0
+    for chunk in _batches(rows, chunk_rows):
+        lines = "".join(json.dumps(row, default=_json_default) + "\n" for row in chunk)
+        data = gzip.compress(lines.encode("utf-8"))
+        f.write(data)
+        yield chunk, offset, len(data)
+        offset += len(data)
+
+def _archive_partition(
+    engine: Engine,
+    storage: LocalArchiveStorage,
+    partition: Dict[str, Any],
+    batch_size: int
+) -> Dict[str, Any]:
+    name = partition["name"]
+    key = f"{PARENT_TABLE}/{name}.ndjson.gz"
+    summary = {"row_count": 0, "min_record_id": None, "max_record_id": None}
+    archives = ClinicalRecordArchive.__table__
+    entries = ClinicalRecordArchiveEntry.__table__
+
+    # One transaction: the records leave clinical_records in the same commit
+    # that makes them findable through the manifest
+    with engine.begin() as conn:
+        conn.execute(text("SET LOCAL lock_timeout = '10s'"))
+        # Reads go on; writes to this (old) month wait for the archive
+        conn.execute(text(f'LOCK TABLE "{name}" IN SHARE MODE'))
+        archive_id = conn.execute(insert(archives).values(
+            partition_name=name,
+            range_start=datetime.combine(partition["start"], datetime.min.time()),
+            range_end=datetime.combine(partition["end"], datetime.min.time()),
+            location=key,
+            archived_at=datetime.utcnow(),
+            row_count=0
+        ).returning(archives.c.id)).scalar_one()
+
+        with storage.open_write(key) as f:
+            # Per statement: the entries are inserted on this connection meanwhile
+            result = conn.execute(
+                text(f'SELECT {", ".join(ARCHIVE_COLUMNS)} FROM "{name}" ORDER BY id')
+                .execution_options(yield_per=batch_size)
+            )
+            rows = (dict(row) for row in result.mappings())
+            for chunk, offset, length in write_chunks(f, rows, settings.ARCHIVE_CHUNK_ROWS):
+                conn.execute(insert(entries), [
+                    {"record_id": row["id"], "archive_id": archive_id, "chunk_offset": offset, "chunk_length": length}
+                    for row in chunk
+                ])
+                if summary["min_record_id"] is None:
+                    summary["min_record_id"] = chunk[0]["id"]
+                summary["max_record_id"] = chunk[-1]["id"]
+                summary["row_count"] += len(chunk)
+
+        conn.execute(update(archives).where(archives.c.id == archive_id).values(**summary))
+        # The parent is locked exclusively from here to the commit only
+        if partition["attached"]:
+            conn.execute(text(f'ALTER TABLE {PARENT_TABLE} DETACH PARTITION "{name}"'))
+        conn.execute(text(f'DROP TABLE "{name}"'))
+
+    return {"partition_name": name, "location": key, **summary}
+
+def archive_partitions(
+    engine: Engine,
+    before: Optional[date] = None,
+    storage: Optional[LocalArchiveStorage] = None,
+    dry_run: bool = False,
+    batch_size: Optional[int] = None
+) -> List[Dict[str, Any]]:
+    """
+    Archive every monthly partition that ends on or before `before`
+    (default: ARCHIVE_AFTER_MONTHS before the current month), including
+    older rows in the default partition. A dry run lists those partitions
+    and the default partition's row count per month, changing nothing.
+    """
+    before = before or _add_months(date.today().replace(day=1), -settings.ARCHIVE_AFTER_MONTHS)
+    storage = storage or get_storage()
+    batch_size = batch_size or settings.EXPORT_BATCH_SIZE
+
+    with engine.begin() as conn:
+        _lock_partitions(conn)
+        in_default = _default_partition_months(conn, before)
+        if dry_run:
+            partitions = [p for p in list_monthly_partitions(conn) if p["end"] <= before]
+            return [{"partition_name": p["name"], "attached": p["attached"]} for p in partitions] + [
+                {"partition_name": partition_name(month), "rows_in_default_partition": row_count}
+                for month, row_count in in_default.items()
+            ]
+        # Back-dated rows in the default partition get their month's partition first
+        _create_partitions(conn, in_default)
+
+    with engine.connect() as conn:
+        partitions = [p for p in list_monthly_partitions(conn) if p["end"] <= before]
+    return [_archive_partition(engine, storage, p, batch_size) for p in partitions]
+
+def _archived_record(db: Session, data: Dict[str, Any]) -> ClinicalRecord:
+    for column in DATETIME_COLUMNS:
+        if data.get(column):
+            data[column] = datetime.fromisoformat(data[column])
+    record = ClinicalRecord(**data)
+    # Not via the patient relationship: its backref would cascade the
+    # record into the session
+    record.created_by = db.get(Doctor, record.created_by_id)
+    return record
+
+def _archived_lines(
+    storage: LocalArchiveStorage,
+    archive: ClinicalRecordArchive,
+    entry: Optional[ClinicalRecordArchiveEntry]
+) -> Iterator[str]:
+    if entry is not None and entry.chunk_offset is not None:
+        data = gzip.decompress(storage.read_range(archive.location, entry.chunk_offset, entry.chunk_length))
+        yield from data.decode("utf-8").splitlines()
+        return
+    # Archives without chunk offsets: scan the file up to the record
+    with storage.open_read(archive.location) as raw, gzip.open(raw, "rt", encoding="utf-8") as f:
+        yield from f
+
+def _read_archived_record(
+    db: Session,
+    storage: LocalArchiveStorage,
+    archive: ClinicalRecordArchive,
+    record_id: int,
+    entry: Optional[ClinicalRecordArchiveEntry] = None
+) -> Optional[ClinicalRecord]:
+    for line in _archived_lines(storage, archive, entry):
+        data = json.loads(line)
+        if data["id"] > record_id:
+            break  # Files are written in id order
+        if data["id"] == record_id:
+            return _archived_record(db, data)
+    return None
+
+def find_archived_record(
+    db: Session,
+    record_id: int,
+    storage: Optional[LocalArchiveStorage] = None
+) -> Optional[ClinicalRecord]:
+    """
+    Read a clinical record back from archive storage.
+    Returns a transient ClinicalRecord (never added to the session) or None.
+    """
+    entry = db.get(ClinicalRecordArchiveEntry, record_id)
+    if entry is not None:
+        archives = [db.get(ClinicalRecordArchive, entry.archive_id)]
+    else:
+        # Archives made before entries were kept: any whose id range covers
+        # the record may hold it
+        archives = db.query(ClinicalRecordArchive)\
+            .filter(
+                ClinicalRecordArchive.min_record_id <= record_id,
+                ClinicalRecordArchive.max_record_id >= record_id,
+                ~exists().where(ClinicalRecordArchiveEntry.archive_id == ClinicalRecordArchive.id)
+            )\
+            .order_by(ClinicalRecordArchive.archived_at.desc())\
+            .all()
+
+    storage = storage or get_storage()
+    for archive in archives:
+        record = _read_archived_record(db, storage, archive, record_id, entry)
+        if record is not None:
+            return record
+    return None
+
+_maintenance_lock = threading.Lock()
+_maintenance_started = False
+
+def _maintain_partitions(interval: float) -> None:
+    from app.db.database import engine
+
+    while True:
+        try:
+            with engine.connect() as conn:
+                if not is_partitioned(conn):
+                    return
+            created = ensure_partitions(engine)
+            if created:
+                logger.info("Created clinical_records partitions", extra={"partitions": created})
+        except Exception:
+            logger.exception("Partition maintenance failed")
+        time.sleep(interval)
+
+def start_partition_maintenance() -> None:
+    """
+    Create upcoming partitions now and every PARTITION_MAINTENANCE_INTERVAL_HOURS
+    from a daemon thread, once per worker. Does nothing when the interval is
+    0 or clinical_records is not partitioned.
+    """
+    global _maintenance_started
+    interval = settings.PARTITION_MAINTENANCE_INTERVAL_HOURS * 3600
+    if interval <= 0:
+        return
+    with _maintenance_lock:
+        if _maintenance_started:
+            return
+        threading.Thread(
+            target=_maintain_partitions, args=(interval,), name="partition-maintenance", daemon=True
+        ).start()
+        _maintenance_started = True
+
+def main() -> None:
+    from app.db.database import engine
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    ensure_parser = subparsers.add_parser("ensure", help="create upcoming monthly partitions")
+    ensure_parser.add_argument("--months-ahead", type=int, default=None)
+    archive_parser = subparsers.add_parser("archive", help="archive partitions older than the retention window")
+    archive_parser.add_argument("--before", type=date.fromisoformat, default=None)
+    archive_parser.add_argument("--dry-run", action="store_true")
+    args = parser.parse_args()
+
+    if args.command == "ensure":
+        created = ensure_partitions(engine, months_ahead=args.months_ahead)
+        print(f"created {len(created)} partition(s): {', '.join(created) or '-'}")
+    else:
+        for result in archive_partitions(engine, before=args.before, dry_run=args.dry_run):
+            print(json.dumps(result))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,130 @@
+from typing import Any, Dict, Iterator, List, Optional
+from dataclasses import dataclass
+from datetime import datetime
+import json
+from sqlalchemy import select
+
+from app.core.config import settings
+from app.db.database import SessionLocal
+from app.models.patient import Patient, ClinicalRecord
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # Optional dependency, for Parquet exports
+    pa = None
+
+@dataclass
+class RecordExportFilter:
+    start: Optional[datetime] = None
+    end: Optional[datetime] = None
+    consultant_id: Optional[int] = None
+
+def _flatten(row: Any) -> Dict[str, Any]:
+    extracted = row.extracted_data or {}
+    demographics = extracted.get("demographics") or {}
+    vital_signs = extracted.get("vital_signs") or {}
+    heart_rate = vital_signs.get("heart_rate")
+    return {
+        "id": row.id,
+        "patient_id": row.patient_id,
+        "consultant_id": row.consultant_id,
+        "created_by_id": row.created_by_id,
+        "recorded_at": row.recorded_at,
+        "is_processed": row.is_processed,
+        "processing_status": row.processing_status,
+        "transcription": row.transcription,
+        "extracted_data": extracted,
+        "age": demographics.get("age"),
+        "gender": demographics.get("gender"),
+        "diagnoses": [str(v) for v in extracted.get("diagnoses") or []],
+        "medications": [str(v) for v in extracted.get("medications") or []],
+        "symptoms": [str(v) for v in extracted.get("symptoms") or []],
+        "blood_pressure": vital_signs.get("blood_pressure"),
+        "heart_rate": heart_rate if isinstance(heart_rate, (int, float)) else None,
+    }
+
+def iter_export_batches(
+    export_filter: RecordExportFilter,
+    batch_size: Optional[int] = None
+) -> Iterator[List[Dict[str, Any]]]:
+    """
+    Yield flattened clinical records in batches.
+    Uses its own session and a server-side cursor (yield_per) so memory stays
+    bounded by one batch and the stream can outlive the request's session.
+    """
+    batch_size = batch_size or settings.EXPORT_BATCH_SIZE
+    db = SessionLocal()
+    try:
+        stmt = select(
+                ClinicalRecord.id,
+                ClinicalRecord.patient_id,
+                Patient.consultant_id,
+                ClinicalRecord.created_by_id,
+                ClinicalRecord.recorded_at,
+                ClinicalRecord.is_processed,
+                ClinicalRecord.processing_status,
+                ClinicalRecord.transcription,
+                ClinicalRecord.extracted_data
+            )\
+            .join(Patient, Patient.id == ClinicalRecord.patient_id)
+        if export_filter.start:
+            stmt = stmt.where(ClinicalRecord.recorded_at >= export_filter.start)
+        if export_filter.end:
+            stmt = stmt.where(ClinicalRecord.recorded_at < export_filter.end)
+        if export_filter.consultant_id:
+            stmt = stmt.where(Patient.consultant_id == export_filter.consultant_id)
+
+        result = db.execute(
+            stmt.order_by(ClinicalRecord.id),
+            execution_options={"yield_per": batch_size}
+        )
+        for partition in result.partitions():
+            yield [_flatten(row) for row in partition]
+    finally:
+        db.close()
+
+def _json_default(value: Any) -> Any:
+    if isinstance(value, datetime):
+        return value.isoformat()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+def stream_ndjson(export_filter: RecordExportFilter) -> Iterator[bytes]:
+    """Encode export batches as NDJSON chunks, one chunk per batch."""
+    for batch in iter_export_batches(export_filter):
+        yield "".join(
+            json.dumps(row, default=_json_default) + "\n" for row in batch
+        ).encode("utf-8")
+
+def write_parquet(export_filter: RecordExportFilter, path: str) -> int:
+    """
+    Write the export to a Parquet file, one row group per batch.
+    Requires pyarrow. Returns the number of rows written.
+    """
+    schema = pa.schema([
+        ("id", pa.int64()),
+        ("patient_id", pa.int64()),
+        ("consultant_id", pa.int64()),
+        ("created_by_id", pa.int64()),
+        ("recorded_at", pa.timestamp("us")),
+        ("is_processed", pa.bool_()),
+        ("processing_status", pa.string()),
+        ("transcription", pa.string()),
+        ("extracted_data", pa.string()),  # JSON text
+        ("age", pa.int32()),
+        ("gender", pa.string()),
+        ("diagnoses", pa.list_(pa.string())),
+        ("medications", pa.list_(pa.string())),
+        ("symptoms", pa.list_(pa.string())),
+        ("blood_pressure", pa.string()),
+        ("heart_rate", pa.float64()),
+    ])
+
+    rows_written = 0
+    with pq.ParquetWriter(path, schema, compression="zstd") as writer:
+        for batch in iter_export_batches(export_filter):
+            for row in batch:
+                row["extracted_data"] = json.dumps(row["extracted_data"], default=_json_default)
+            writer.write_table(pa.Table.from_pylist(batch, schema=schema))
+            rows_written += len(batch)
+    return rows_written
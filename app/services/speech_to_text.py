@@ -1,26 +1,21 @@
-import os
-import whisper
 from pathlib import Path
 from typing import Optional
-import torch
+
+from app.services.asr import ASRBackend, get_backend
 
 class SpeechToTextService:
-    def __init__(self):
-        # Determine the device to use
-        self.device = "mps" if torch.backends.mps.is_available() else "cpu"
-        print(f"Using device: {self.device}")
-        
-        # Set Whisper models directory from environment variable
-        models_dir = os.getenv("WHISPER_MODELS_DIR", str(Path.home() / ".cache" / "whisper"))
-        os.makedirs(models_dir, exist_ok=True)
-        os.environ["XDG_CACHE_HOME"] = models_dir
+    def __init__(self, backend: Optional[ASRBackend] = None):
+        # The configured ASR backend (Settings.ASR_BACKEND) unless one is given;
+        # the model is loaded on first use
+        self._backend = backend
         
-        # Load Whisper model (can be 'tiny', 'base', 'small', 'medium', 'large')
-        self.model = whisper.load_model("base").to(self.device)
+    @property
+    def backend(self) -> ASRBackend:
+        return self._backend or get_backend()
         
     def transcribe_audio(self, audio_path: str) -> Optional[str]:
         """
-        Transcribe an audio file to text using OpenAI's Whisper model.
+        Transcribe an audio file to text.
         
         Args:
             audio_path: Path to the audio file
@@ -34,8 +29,7 @@ class SpeechToTextService:
                 raise FileNotFoundError(f"Audio file not found: {audio_path}")
             
             # Transcribe audio
-            result = self.model.transcribe(audio_path)
-            return result["text"]
+            return self.backend.transcribe(audio_path).text
             
         except Exception as e:
             print(f"Error transcribing audio: {str(e)}")
@@ -56,9 +50,8 @@ class SpeechToTextService:
             if not Path(audio_path).exists():
                 raise FileNotFoundError(f"Audio file not found: {audio_path}")
             
-            # Transcribe audio with word-level timestamps
-            result = self.model.transcribe(audio_path, word_timestamps=True)
-            return result
+            # Transcribe audio with segment timestamps
+            return self.backend.transcribe_with_timestamps(audio_path).to_dict()
             
         except Exception as e:
             print(f"Error transcribing audio with timestamps: {str(e)}")
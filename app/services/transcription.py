@@ -1,26 +1,33 @@
-import whisper
 from pathlib import Path
 import tempfile
-import torch
 from typing import Optional, Dict, Any
 import json
 
+from fastapi.concurrency import run_in_threadpool
+
+from app.services.asr import ASRBackend, get_backend
+
 class TranscriptionService:
-    def __init__(self):
-        self.model = whisper.load_model("base")
+    def __init__(self, backend: Optional[ASRBackend] = None):
+        # The configured ASR backend (Settings.ASR_BACKEND) unless one is given
+        self._backend = backend
+        
+    @property
+    def backend(self) -> ASRBackend:
+        return self._backend or get_backend()
         
     async def transcribe_audio(self, audio_file: Path) -> Dict[str, Any]:
         """
-        Transcribe audio file using OpenAI's Whisper model
+        Transcribe audio file with the configured ASR backend
         """
         try:
-            # Transcribe audio
-            result = self.model.transcribe(str(audio_file))
+            # Transcribe audio (blocking, so in the threadpool)
+            result = await run_in_threadpool(self.backend.transcribe, str(audio_file))
             
             return {
                 "status": "success",
-                "text": result["text"],
-                "language": result.get("language", "en")
+                "text": result.text,
+                "language": result.language or "en"
             }
         except Exception as e:
             return {
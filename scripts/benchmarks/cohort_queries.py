@@ -0,0 +1,165 @@
+"""
+Benchmark cohort queries (JSONB containment on patients.risk_factors).
+
+Seeds a synthetic population with generate_series, then times the cohort
+query used by GET /patients/cohort and prints the plan of the unscoped
+containment query so the GIN index usage is visible.
+
+Requires Postgres at DATABASE_URL, migrated to head:
+
+    python scripts/benchmarks/cohort_queries.py --patients 1000000
+"""
+import argparse
+import json
+import statistics
+import sys
+import time
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parents[2]))
+
+from sqlalchemy import text
+
+from app.db.database import SessionLocal, engine
+from app.models.doctor import Doctor
+from app.crud.patient import get_patient_cohort
+
+BENCH_EMAIL_DOMAIN = "bench.medicai.test"
+
+SEED_DOCTORS_SQL = """
+INSERT INTO doctors (
+    email, hashed_password, first_name, last_name, medical_license_number,
+    qualifications, specialty, years_of_experience, doctor_type, date_of_birth,
+    gender, contact_number, department, join_date, is_active
+)
+SELECT
+    'consultant' || n || '@' || :domain, '!', 'Bench', 'Consultant' || n, 'BENCH' || n,
+    'MD', 'Cardiology', 10, 'consultant', DATE '1970-01-01',
+    'other', '+10000000000', 'Cardiology', CURRENT_DATE, true
+FROM generate_series(1, :consultants) AS n
+ON CONFLICT (email) DO NOTHING
+"""
+
+SEED_PATIENTS_SQL = """
+INSERT INTO patients (
+    name, age, gender, consultant_id, risk_factors,
+    family_history, surgical_history, additional_notes, created_at, updated_at
+)
+SELECT
+    'Bench Patient ' || n,
+    18 + (random() * 70)::int,
+    CASE WHEN random() < 0.5 THEN 'female' ELSE 'male' END,
+    consultants.ids[1 + (n % array_length(consultants.ids, 1))],
+    jsonb_build_object(
+        'diabetes', random() < 0.10,
+        'hypertension', random() < 0.30,
+        'smoking', random() < 0.15,
+        'hyperlipidemia', random() < 0.20,
+        'obesity', random() < 0.25
+    ),
+    '[]'::jsonb, '[]'::jsonb, '[]'::jsonb, now(), now()
+FROM generate_series(1, :patients) AS n,
+    (SELECT array_agg(id ORDER BY id) AS ids FROM doctors WHERE email LIKE '%@' || :domain) AS consultants
+"""
+
+CLEANUP_SQL = [
+    "DELETE FROM patients WHERE consultant_id IN (SELECT id FROM doctors WHERE email LIKE '%@' || :domain)",
+    "DELETE FROM doctors WHERE email LIKE '%@' || :domain",
+]
+
+UNSCOPED_COHORT_SQL = "SELECT count(*) FROM patients WHERE risk_factors @> CAST(:cohort AS jsonb)"
+
+def seed(patients: int, consultants: int, seed_value: float) -> None:
+    with engine.begin() as conn:
+        conn.execute(text("SELECT setseed(:seed)"), {"seed": seed_value})
+        conn.execute(text(SEED_DOCTORS_SQL), {"domain": BENCH_EMAIL_DOMAIN, "consultants": consultants})
+        conn.execute(text(SEED_PATIENTS_SQL), {"domain": BENCH_EMAIL_DOMAIN, "patients": patients})
+    with engine.connect() as conn:
+        conn.execution_options(isolation_level="AUTOCOMMIT").execute(text("ANALYZE patients"))
+
+def cleanup() -> None:
+    with engine.begin() as conn:
+        for statement in CLEANUP_SQL:
+            conn.execute(text(statement), {"domain": BENCH_EMAIL_DOMAIN})
+
+def time_runs(fn, runs: int) -> dict:
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        fn()
+        timings.append((time.perf_counter() - start) * 1000)
+    timings.sort()
+    return {
+        "p50_ms": statistics.median(timings),
+        "p95_ms": timings[max(0, int(len(timings) * 0.95) - 1)],
+        "max_ms": timings[-1],
+    }
+
+def run(runs: int, risk_factors: list) -> None:
+    db = SessionLocal()
+    try:
+        consultant = db.query(Doctor)\
+            .filter(Doctor.email.like(f"%@{BENCH_EMAIL_DOMAIN}"))\
+            .order_by(Doctor.id)\
+            .first()
+        if consultant is None:
+            raise RuntimeError("No benchmark data found; run with --seed first")
+
+        total = db.execute(text("SELECT count(*) FROM patients")).scalar()
+        print(f"patients in table: {total}")
+
+        cohort = {"cohort": json.dumps({factor: True for factor in risk_factors})}
+        plan = db.execute(text("EXPLAIN (ANALYZE, BUFFERS) " + UNSCOPED_COHORT_SQL), cohort).scalars().all()
+        print(f"\nplan (unscoped {' + '.join(risk_factors)}):")
+        for line in plan:
+            print(f"  {line}")
+
+        results = {
+            "unscoped count": time_runs(
+                lambda: db.execute(text(UNSCOPED_COHORT_SQL), cohort).scalar(), runs
+            ),
+            "scoped cohort page": time_runs(
+                lambda: get_patient_cohort(
+                    db, doctor=consultant, risk_factors=risk_factors, limit=100
+                ),
+                runs
+            ),
+        }
+        print()
+        for name, stats in results.items():
+            print(
+                f"{name:<20} p50 {stats['p50_ms']:8.2f} ms  "
+                f"p95 {stats['p95_ms']:8.2f} ms  max {stats['max_ms']:8.2f} ms"
+            )
+    finally:
+        db.close()
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--patients", type=int, default=1_000_000)
+    parser.add_argument("--consultants", type=int, default=100)
+    parser.add_argument("--runs", type=int, default=20)
+    parser.add_argument(
+        "--risk-factors",
+        default="diabetes,hypertension",
+        help="comma-separated cohort, e.g. diabetes,smoking,obesity"
+    )
+    parser.add_argument("--random-seed", type=float, default=0.42)
+    parser.add_argument("--seed", action="store_true", help="insert synthetic data before running")
+    parser.add_argument("--cleanup", action="store_true", help="delete synthetic data and exit")
+    args = parser.parse_args()
+
+    if engine.dialect.name != "postgresql":
+        raise SystemExit("The cohort benchmark requires Postgres (JSONB + GIN)")
+
+    if args.cleanup:
+        cleanup()
+        return
+    if args.seed:
+        start = time.perf_counter()
+        seed(args.patients, args.consultants, args.random_seed)
+        print(f"seeded {args.patients} patients in {time.perf_counter() - start:.1f}s")
+    run(args.runs, args.risk_factors.split(","))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,385 @@
+"""
+Load test with scripted clinical workflows.
+
+    seed     create load-test doctors, patients and records in DATABASE_URL
+             (Postgres or SQLite) with app.db.synthetic_data; all doctors
+             share --password
+    run      drive a running server with virtual users for --duration
+             seconds and write a JSON report
+    compare  compare two reports and flag latency/throughput regressions
+
+Scenarios, each run by its own number of virtual users:
+
+    login_storm        doctors logging in back to back
+    consultant_browse  consultants listing their patients and opening one
+    resident_upload    residents uploading recordings, then polling them
+    status_poll        consultants polling a patient's records (conditional GET)
+
+Start the server with the stub ASR backend so uploads don't need Whisper
+and their cost is deterministic, then:
+
+    python scripts/benchmarks/load_test.py seed --consultants 10 --residents 20
+    ASR_BACKEND=stub uvicorn app.main:app --workers 4
+    python scripts/benchmarks/load_test.py run --duration 60 \\
+        --users login_storm=2,consultant_browse=20,resident_upload=5,status_poll=20 \\
+        --output before.json
+    python scripts/benchmarks/load_test.py compare before.json after.json
+
+Reports record the git commit, the scenario mix and, per request type,
+throughput and latency percentiles. Think times come from a seeded RNG, so
+two runs with the same arguments issue the same request sequence per user.
+
+Requires httpx.
+"""
+import argparse
+import asyncio
+import io
+import json
+import math
+import random
+import struct
+import subprocess
+import sys
+import time
+import wave
+from collections import defaultdict
+from datetime import datetime
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, List, Optional
+
+try:
+    import httpx
+except ImportError:
+    raise SystemExit("The load test requires httpx (pip install httpx)")
+
+ROOT = Path(__file__).resolve().parents[2]
+sys.path.append(str(ROOT))
+
+LOADTEST_EMAIL_DOMAIN = "loadtest.example.com"
+SCENARIOS = ("login_storm", "consultant_browse", "resident_upload", "status_poll")
+PERCENTILES = (50, 90, 95, 99)
+
+# Seeding
+
+def seed(consultants: int, residents: int, patients_per_consultant: int, records_per_patient: str, password: str) -> None:
+    from app.db.database import SessionLocal
+    from app.db.synthetic_data import DatasetSpec, Distribution, generate_dataset
+    import app.models  # noqa: F401  (configure all mappers)
+
+    spec = DatasetSpec(
+        departments={"Cardiology": (consultants, residents)},
+        patients_per_consultant=Distribution("fixed", (patients_per_consultant,)),
+        records_per_patient=Distribution.parse(records_per_patient),
+        email_domain=LOADTEST_EMAIL_DOMAIN,
+        password=password
+    )
+    db = SessionLocal()
+    try:
+        counts = generate_dataset(db, spec)
+    except ValueError as e:
+        raise SystemExit(str(e))
+    finally:
+        db.close()
+    print(
+        f"seeded {consultants} consultants, {residents} residents, {counts['patients']} patients, "
+        f"{counts['clinical_records']} records (@{LOADTEST_EMAIL_DOMAIN})"
+    )
+
+# Driving the server
+
+@lru_cache(maxsize=None)
+def make_wav(seconds: float, variant: int) -> bytes:
+    """A mono 16 kHz tone; `variant` changes the pitch, and so the stub transcript."""
+    rate = 16000
+    frames = b"".join(
+        struct.pack("<h", int(8000 * math.sin(2 * math.pi * (220 + 40 * variant) * n / rate)))
+        for n in range(int(seconds * rate))
+    )
+    buffer = io.BytesIO()
+    with wave.open(buffer, "wb") as wav:
+        wav.setnchannels(1)
+        wav.setsampwidth(2)
+        wav.setframerate(rate)
+        wav.writeframes(frames)
+    return buffer.getvalue()
+
+class Stats:
+    def __init__(self):
+        self.timings: Dict[str, List[float]] = defaultdict(list)
+        self.statuses: Dict[str, Dict[str, int]] = defaultdict(lambda: defaultdict(int))
+
+    def record(self, name: str, elapsed_ms: float, status) -> None:
+        self.timings[name].append(elapsed_ms)
+        self.statuses[name][str(status)] += 1
+
+class VirtualUser:
+    def __init__(self, client: httpx.AsyncClient, stats: Stats, rng: random.Random, args):
+        self.client = client
+        self.stats = stats
+        self.rng = rng
+        self.args = args
+        self.headers: Dict[str, str] = {}
+
+    async def request(self, name: str, method: str, url: str, **kwargs) -> Optional[httpx.Response]:
+        start = time.perf_counter()
+        try:
+            response = await self.client.request(method, url, **kwargs)
+        except httpx.HTTPError as e:
+            self.stats.record(name, (time.perf_counter() - start) * 1000, type(e).__name__)
+            return None
+        self.stats.record(name, (time.perf_counter() - start) * 1000, response.status_code)
+        return response
+
+    async def think(self) -> None:
+        await asyncio.sleep(self.rng.uniform(0, 2 * self.args.think_time))
+
+    async def login(self, email: str) -> bool:
+        response = await self.request(
+            "POST /auth/token", "POST", "/auth/token",
+            data={"username": email, "password": self.args.password}
+        )
+        if response is None or response.status_code != 200:
+            return False
+        self.headers = {"Authorization": f"Bearer {response.json()['access_token']}"}
+        return True
+
+    async def my_patient_ids(self) -> List[int]:
+        response = await self.request(
+            "GET /patients/my-patients", "GET", "/patients/my-patients", headers=self.headers
+        )
+        if response is None or response.status_code != 200:
+            return []
+        return [patient["id"] for patient in response.json()]
+
+def email(kind: str, rng: random.Random, count: int) -> str:
+    return f"{kind}{rng.randrange(count)}@{LOADTEST_EMAIL_DOMAIN}"
+
+async def login_storm(user: VirtualUser, deadline: float) -> None:
+    while time.perf_counter() < deadline:
+        kind = user.rng.choice(["consultant", "resident"])
+        count = user.args.consultants if kind == "consultant" else user.args.residents
+        await user.login(email(kind, user.rng, count))
+
+async def consultant_browse(user: VirtualUser, deadline: float) -> None:
+    if not await user.login(email("consultant", user.rng, user.args.consultants)):
+        return
+    while time.perf_counter() < deadline:
+        patient_ids = await user.my_patient_ids()
+        if patient_ids:
+            await user.think()
+            patient_id = user.rng.choice(patient_ids)
+            await user.request("GET /patients/{id}", "GET", f"/patients/{patient_id}", headers=user.headers)
+        await user.think()
+
+async def resident_upload(user: VirtualUser, deadline: float) -> None:
+    if not await user.login(email("resident", user.rng, user.args.residents)):
+        return
+    patient_ids = await user.my_patient_ids()
+    if not patient_ids:
+        return
+    recordings = [make_wav(user.args.recording_seconds, variant) for variant in range(4)]
+    while time.perf_counter() < deadline:
+        patient_id = user.rng.choice(patient_ids)
+        files = {"audio_file": ("loadtest.wav", user.rng.choice(recordings), "audio/wav")}
+        response = await user.request(
+            "POST /patients/{id}/clinical-records", "POST",
+            f"/patients/{patient_id}/clinical-records", headers=user.headers, files=files
+        )
+        if response is not None and response.status_code == 200:
+            # Check on the new record, as the client UI does after an upload
+            for _ in range(3):
+                await user.think()
+                await user.request(
+                    "GET /patients/{id}/clinical-records", "GET",
+                    f"/patients/{patient_id}/clinical-records", headers=user.headers
+                )
+        await user.think()
+
+async def status_poll(user: VirtualUser, deadline: float) -> None:
+    if not await user.login(email("consultant", user.rng, user.args.consultants)):
+        return
+    patient_ids = await user.my_patient_ids()
+    if not patient_ids:
+        return
+    etags: Dict[int, str] = {}
+    while time.perf_counter() < deadline:
+        patient_id = user.rng.choice(patient_ids)
+        headers = dict(user.headers)
+        if patient_id in etags:
+            headers["If-None-Match"] = etags[patient_id]
+        response = await user.request(
+            "GET /patients/{id}/clinical-records (poll)", "GET",
+            f"/patients/{patient_id}/clinical-records", headers=headers
+        )
+        if response is not None and "etag" in response.headers:
+            etags[patient_id] = response.headers["etag"]
+        await user.think()
+
+def parse_users(spec: str) -> Dict[str, int]:
+    users = {}
+    for part in filter(None, spec.split(",")):
+        name, _, count = part.partition("=")
+        if name not in SCENARIOS:
+            raise SystemExit(f"Unknown scenario {name!r}; choose from {', '.join(SCENARIOS)}")
+        users[name] = int(count)
+    return users
+
+def percentile(sorted_values: List[float], p: float) -> float:
+    """Nearest-rank percentile."""
+    rank = max(1, math.ceil(p / 100 * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+def summarize(stats: Stats, elapsed: float) -> Dict[str, dict]:
+    summary = {}
+    for name, timings in sorted(stats.timings.items()):
+        timings = sorted(timings)
+        statuses = dict(stats.statuses[name])
+        errors = sum(
+            count for status, count in statuses.items()
+            if not status.isdigit() or int(status) >= 400
+        )
+        summary[name] = {
+            "requests": len(timings),
+            "errors": errors,
+            "throughput_rps": len(timings) / elapsed,
+            "mean_ms": sum(timings) / len(timings),
+            **{f"p{p}_ms": percentile(timings, p) for p in PERCENTILES},
+            "max_ms": timings[-1],
+            "statuses": statuses,
+        }
+    return summary
+
+def git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=ROOT,
+            capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+async def run(args) -> dict:
+    users = parse_users(args.users)
+    scenario_functions = {
+        "login_storm": login_storm,
+        "consultant_browse": consultant_browse,
+        "resident_upload": resident_upload,
+        "status_poll": status_poll,
+    }
+    stats = Stats()
+    limits = httpx.Limits(max_connections=sum(users.values()) + 1)
+    async with httpx.AsyncClient(base_url=args.url, timeout=args.timeout, limits=limits) as client:
+        started_at = datetime.utcnow()
+        start = time.perf_counter()
+        deadline = start + args.duration
+        tasks = []
+        for name, count in users.items():
+            for n in range(count):
+                rng = random.Random(f"{args.seed}-{name}-{n}")
+                user = VirtualUser(client, stats, rng, args)
+                tasks.append(scenario_functions[name](user, deadline))
+        await asyncio.gather(*tasks)
+        elapsed = time.perf_counter() - start
+
+    return {
+        "meta": {
+            "commit": git_commit(),
+            "started_at": started_at.isoformat(),
+            "duration_s": elapsed,
+            "url": args.url,
+            "users": users,
+            "think_time_s": args.think_time,
+            "recording_seconds": args.recording_seconds,
+            "seed": args.seed,
+        },
+        "requests": summarize(stats, elapsed),
+    }
+
+def print_report(report: dict) -> None:
+    meta = report["meta"]
+    print(f"commit {meta['commit']}  {meta['duration_s']:.0f}s  users {meta['users']}")
+    print(f"{'request':45} {'count':>7} {'err':>5} {'rps':>7} " + " ".join(f"{'p' + str(p):>8}" for p in PERCENTILES) + f" {'max':>8}")
+    for name, result in report["requests"].items():
+        print(
+            f"{name:45} {result['requests']:7d} {result['errors']:5d} {result['throughput_rps']:7.1f} "
+            + " ".join(f"{result[f'p{p}_ms']:8.1f}" for p in PERCENTILES)
+            + f" {result['max_ms']:8.1f}"
+        )
+
+def compare(baseline: dict, candidate: dict, threshold: float) -> bool:
+    """Print the change per request type; True if anything regressed past `threshold` %."""
+    print(f"baseline {baseline['meta']['commit']} -> candidate {candidate['meta']['commit']}")
+    if baseline["meta"]["users"] != candidate["meta"]["users"]:
+        print("warning: the runs used different scenario mixes")
+    regressed = False
+    for name, new in candidate["requests"].items():
+        old = baseline["requests"].get(name)
+        if old is None:
+            print(f"{name:45} (new)")
+            continue
+        changes = []
+        for key in ("p50_ms", "p95_ms", "p99_ms", "throughput_rps"):
+            delta = (new[key] - old[key]) / old[key] * 100 if old[key] else 0.0
+            # Latency going up and throughput going down are regressions
+            worse = delta > threshold if key.endswith("_ms") else delta < -threshold
+            regressed |= worse
+            changes.append(f"{key[:-3] if key.endswith('_ms') else 'rps'} {delta:+6.1f}%{'!' if worse else ' '}")
+        print(f"{name:45} " + "  ".join(changes))
+    return regressed
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    seed_parser = subparsers.add_parser("seed", help="create load-test doctors and patients")
+    seed_parser.add_argument("--consultants", type=int, default=10)
+    seed_parser.add_argument("--residents", type=int, default=20)
+    seed_parser.add_argument("--patients-per-consultant", type=int, default=50)
+    seed_parser.add_argument(
+        "--records-per-patient", default="poisson:3",
+        help="distribution, see app.db.synthetic_data"
+    )
+    seed_parser.add_argument("--password", default="LoadTest123")
+
+    run_parser = subparsers.add_parser("run", help="run the scenarios against a server")
+    run_parser.add_argument("--url", default="http://localhost:8000")
+    run_parser.add_argument("--duration", type=float, default=60.0)
+    run_parser.add_argument(
+        "--users",
+        default="login_storm=2,consultant_browse=20,resident_upload=5,status_poll=20",
+        help="virtual users per scenario"
+    )
+    run_parser.add_argument("--consultants", type=int, default=10, help="as seeded")
+    run_parser.add_argument("--residents", type=int, default=20, help="as seeded")
+    run_parser.add_argument("--password", default="LoadTest123")
+    run_parser.add_argument("--think-time", type=float, default=0.5, help="mean seconds between actions")
+    run_parser.add_argument("--recording-seconds", type=float, default=30.0)
+    run_parser.add_argument("--seed", default="0")
+    run_parser.add_argument("--timeout", type=float, default=120.0)
+    run_parser.add_argument("--output", help="write the JSON report here")
+
+    compare_parser = subparsers.add_parser("compare", help="compare two reports")
+    compare_parser.add_argument("baseline")
+    compare_parser.add_argument("candidate")
+    compare_parser.add_argument("--threshold", type=float, default=10.0, help="regression threshold in percent")
+    args = parser.parse_args()
+
+    if args.command == "seed":
+        seed(
+            args.consultants, args.residents, args.patients_per_consultant,
+            args.records_per_patient, args.password
+        )
+    elif args.command == "run":
+        report = asyncio.run(run(args))
+        print_report(report)
+        if args.output:
+            Path(args.output).write_text(json.dumps(report, indent=2))
+    else:
+        baseline = json.loads(Path(args.baseline).read_text())
+        candidate = json.loads(Path(args.candidate).read_text())
+        if compare(baseline, candidate, args.threshold):
+            sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+"""
+Benchmark login throughput and event-loop responsiveness under a login storm.
+
+Fires --logins POST /auth/token requests with --concurrency in flight
+against a running server, while a probe requests GET /health every
+--probe-interval seconds. Blocking bcrypt on the event loop shows up as
+probe latency in the hundreds of milliseconds; with hashing on the
+password pool the probe should stay fast, and excess logins get 503.
+
+    python scripts/benchmarks/login_throughput.py --url http://localhost:8000 \\
+        --email doctor@example.com --password secret --concurrency 50
+
+Requires httpx.
+"""
+import argparse
+import asyncio
+import statistics
+import time
+from collections import Counter
+
+try:
+    import httpx
+except ImportError:
+    raise SystemExit("The login benchmark requires httpx (pip install httpx)")
+
+def summarize(timings: list) -> str:
+    if not timings:
+        return "no samples"
+    timings = sorted(timings)
+    p95 = timings[max(0, int(len(timings) * 0.95) - 1)]
+    return (
+        f"p50 {statistics.median(timings):8.1f} ms  "
+        f"p95 {p95:8.1f} ms  max {timings[-1]:8.1f} ms"
+    )
+
+async def login_worker(client, queue, credentials, timings, statuses) -> None:
+    while True:
+        try:
+            queue.get_nowait()
+        except asyncio.QueueEmpty:
+            return
+        start = time.perf_counter()
+        try:
+            response = await client.post("/auth/token", data=credentials)
+            statuses[response.status_code] += 1
+        except httpx.HTTPError as e:
+            statuses[type(e).__name__] += 1
+        timings.append((time.perf_counter() - start) * 1000)
+
+async def probe(client, interval, timings, stop) -> None:
+    while not stop.is_set():
+        start = time.perf_counter()
+        try:
+            await client.get("/health")
+            timings.append((time.perf_counter() - start) * 1000)
+        except httpx.HTTPError:
+            pass
+        await asyncio.sleep(interval)
+
+async def run(args) -> None:
+    credentials = {"username": args.email, "password": args.password}
+    queue = asyncio.Queue()
+    for _ in range(args.logins):
+        queue.put_nowait(None)
+
+    login_timings, probe_timings, statuses = [], [], Counter()
+    limits = httpx.Limits(max_connections=args.concurrency + 1)
+    async with httpx.AsyncClient(base_url=args.url, timeout=args.timeout, limits=limits) as client:
+        stop = asyncio.Event()
+        probe_task = asyncio.create_task(probe(client, args.probe_interval, probe_timings, stop))
+
+        start = time.perf_counter()
+        await asyncio.gather(*(
+            login_worker(client, queue, credentials, login_timings, statuses)
+            for _ in range(args.concurrency)
+        ))
+        elapsed = time.perf_counter() - start
+
+        stop.set()
+        await probe_task
+
+    print(f"logins:      {args.logins} in {elapsed:.1f}s ({args.logins / elapsed:.1f}/s), concurrency {args.concurrency}")
+    print(f"statuses:    {dict(statuses)}")
+    print(f"login        {summarize(login_timings)}")
+    print(f"/health      {summarize(probe_timings)}  ({len(probe_timings)} probes)")
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", default="http://localhost:8000")
+    parser.add_argument("--email", required=True)
+    parser.add_argument("--password", required=True)
+    parser.add_argument("--logins", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--probe-interval", type=float, default=0.05)
+    parser.add_argument("--timeout", type=float, default=60.0)
+    asyncio.run(run(parser.parse_args()))
+
+if __name__ == "__main__":
+    main()
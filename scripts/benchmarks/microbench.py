@@ -0,0 +1,444 @@
+"""
+Microbenchmarks for hot paths: CRUD queries, response serialization and
+NLP extraction.
+
+    run      time every benchmark (or those matching a --filter) and
+             optionally --save the results as JSON; exits 1 when a
+             benchmark failed
+    compare  compare two result files; exits 1 when a benchmark's median
+             got slower than --threshold percent
+    list     print the benchmark names
+
+Each benchmark is calibrated to run for at least --min-time seconds per
+round and timed over --rounds rounds; the median time per call is what
+compare looks at. CRUD benchmarks use their own database, in-memory
+SQLite by default or a scratch database via --database-url (tables are
+created, rows are added and never cleaned up). With --synthetic-domain
+they run against a population generated by app.db.synthetic_data instead,
+around its patient with the most records. NLP benchmarks need spaCy
+and en_core_web_sm, and are skipped without them. A benchmark that
+raises is reported as failed and the run carries on.
+
+Numbers only compare on the same hardware and Python. CI
+(.github/workflows/benchmarks.yml) runs a pull request and its base on
+the same runner and compares the two. scripts/benchmarks/baselines/
+reference.json holds reference numbers for the CRUD and serialization
+benchmarks (its meta says where they were taken); keep a baseline per
+machine next to it for local comparisons:
+
+    python scripts/benchmarks/microbench.py run --save scripts/benchmarks/baselines/$(hostname).json
+    python scripts/benchmarks/microbench.py run --save current.json
+    python scripts/benchmarks/microbench.py compare scripts/benchmarks/baselines/$(hostname).json current.json
+"""
+import argparse
+import asyncio
+import fnmatch
+import json
+import os
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import time
+from datetime import date, datetime, timedelta
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional
+
+ROOT = Path(__file__).resolve().parents[2]
+sys.path.append(str(ROOT))
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+# Registry: name -> setup function returning the zero-argument callable to time
+BENCHMARKS: Dict[str, Callable[["Context"], Callable[[], Any]]] = {}
+
+# Spoken clinical notes run at roughly this many words per minute
+WORDS_PER_MINUTE = 140
+TRANSCRIPT_MINUTES = (1, 10, 60)
+
+class SkipBenchmark(Exception):
+    pass
+
+def benchmark(name: str):
+    def register(setup: Callable[["Context"], Callable[[], Any]]):
+        BENCHMARKS[name] = setup
+        return setup
+    return register
+
+class Context:
+    """Shared fixtures, built on first use."""
+    def __init__(self, database_url: str, patients: int, synthetic_domain: Optional[str] = None):
+        self.database_url = database_url
+        self.patient_count = patients
+        self.synthetic_domain = synthetic_domain
+        self._session = None
+        self._seeded = None
+
+    @property
+    def session(self):
+        if self._session is None:
+            from app.db.base import Base
+            import app.models  # noqa: F401  (configure all mappers)
+
+            if self.database_url.startswith("sqlite"):
+                engine = create_engine(
+                    self.database_url,
+                    connect_args={"check_same_thread": False},
+                    poolclass=StaticPool
+                )
+            else:
+                engine = create_engine(self.database_url)
+            Base.metadata.create_all(bind=engine)
+            self._session = sessionmaker(autocommit=False, autoflush=False, bind=engine)()
+        return self._session
+
+    @property
+    def seeded(self) -> Dict[str, Any]:
+        """A consultant with `patients` patients; the first has 100 records."""
+        if self._seeded is None:
+            if self.synthetic_domain:
+                self._seeded = find_synthetic(self.session, self.synthetic_domain)
+            else:
+                self._seeded = seed(self.session, self.patient_count)
+        return self._seeded
+
+def seed(db, patient_count: int) -> Dict[str, Any]:
+    from app.models.doctor import Doctor
+    from app.models.patient import ClinicalRecord, Patient
+
+    suffix = datetime.utcnow().strftime("%Y%m%d%H%M%S%f")
+    common = dict(
+        hashed_password="!", qualifications="MD", specialty="Cardiology",
+        date_of_birth=date(1980, 1, 1), gender="other", contact_number="+10000000000",
+        department="Cardiology", join_date=date(2020, 1, 1), is_active=True
+    )
+    consultant = Doctor(
+        email=f"consultant-{suffix}@bench.example.com", first_name="Bench", last_name="Consultant",
+        medical_license_number=f"MBC{suffix}", years_of_experience=10, doctor_type="consultant", **common
+    )
+    db.add(consultant)
+    db.flush()
+    resident = Doctor(
+        email=f"resident-{suffix}@bench.example.com", first_name="Bench", last_name="Resident",
+        medical_license_number=f"MBR{suffix}", years_of_experience=1, doctor_type="resident",
+        supervisor_id=consultant.id, **common
+    )
+    db.add(resident)
+    db.flush()
+
+    patients = [
+        Patient(
+            name=f"Bench Patient {n}", age=18 + n % 70, gender="female" if n % 2 else "male",
+            consultant_id=consultant.id, current_resident_id=resident.id,
+            risk_factors={"diabetes": n % 10 == 0, "hypertension": n % 3 == 0}
+        )
+        for n in range(patient_count)
+    ]
+    db.add_all(patients)
+    db.flush()
+
+    transcript = transcript_of(1)
+    now = datetime.utcnow()
+    for n in range(100):
+        db.add(ClinicalRecord(
+            patient_id=patients[0].id, created_by_id=resident.id,
+            recorded_at=now - timedelta(days=n), audio_file_path=f"uploads/bench-{n}.wav",
+            transcription=transcript,
+            extracted_data={"vital_signs": {"blood_pressure": "150/95", "heart_rate": 92}},
+            is_processed=True, processing_status="processed"
+        ))
+    db.commit()
+    return {
+        "consultant": consultant,
+        "resident": resident,
+        "patient_id": patients[0].id,
+        # Records created while benchmarking go here, not to the serialized patient
+        "scratch_patient_id": patients[-1].id,
+    }
+
+def find_synthetic(db, email_domain: str) -> Dict[str, Any]:
+    """The patient with the most records in a population from app.db.synthetic_data."""
+    from sqlalchemy import func
+    from app.models.doctor import Doctor
+    from app.models.patient import ClinicalRecord, Patient
+
+    busiest = db.query(ClinicalRecord.patient_id) \
+        .join(Patient, Patient.id == ClinicalRecord.patient_id) \
+        .join(Doctor, Doctor.id == Patient.consultant_id) \
+        .filter(Doctor.email.like(f"%@{email_domain}")) \
+        .group_by(ClinicalRecord.patient_id) \
+        .order_by(func.count().desc()) \
+        .first()
+    if busiest is None:
+        raise SystemExit(f"No records of patients of doctors @{email_domain}")
+    patient = db.get(Patient, busiest.patient_id)
+    consultant = db.get(Doctor, patient.consultant_id)
+    scratch = db.query(Patient.id) \
+        .filter(Patient.consultant_id == consultant.id, Patient.id != patient.id) \
+        .order_by(Patient.id) \
+        .first()
+    return {
+        "consultant": consultant,
+        "resident": db.get(Doctor, patient.current_resident_id) if patient.current_resident_id else consultant,
+        "patient_id": patient.id,
+        "scratch_patient_id": scratch.id if scratch else patient.id,
+    }
+
+def transcript_of(minutes: int) -> str:
+    from app.db.synthetic_data import transcript
+
+    text, _ = transcript(random.Random(minutes), minutes * WORDS_PER_MINUTE)
+    return text
+
+# CRUD
+
+@benchmark("crud.get_patient_summaries_by_consultant")
+def bench_get_patient_summaries_by_consultant(ctx: Context):
+    from app.crud.patient import get_patient_summaries_by_consultant
+
+    db, consultant_id = ctx.session, ctx.seeded["consultant"].id
+
+    def run():
+        patients = get_patient_summaries_by_consultant(db, consultant_id=consultant_id, limit=100)
+        db.expire_all()  # Measure loading, not the identity map
+        return patients
+    return run
+
+@benchmark("crud.create_clinical_record")
+def bench_create_clinical_record(ctx: Context):
+    from app.crud.patient import create_clinical_record
+    from app.schemas.patient import ClinicalRecordCreate
+
+    db, seeded = ctx.session, ctx.seeded
+    record = ClinicalRecordCreate(
+        patient_id=seeded["scratch_patient_id"],
+        audio_file_path="uploads/bench.wav",
+        transcription=transcript_of(1),
+        extracted_data={
+            "vital_signs": {"blood_pressure": "150/95", "heart_rate": 92},
+            "medications": [{"name": "aspirin", "dosage": "81 mg"}],
+        }
+    )
+    resident_id = seeded["resident"].id
+    return lambda: create_clinical_record(db, record=record, created_by_id=resident_id)
+
+# Serialization
+
+def _patient_detail(ctx: Context):
+    from app.crud.patient import get_patient_detail
+
+    patient = get_patient_detail(ctx.session, ctx.seeded["patient_id"])
+    ctx.session.expunge_all()  # Detached, fully loaded: serialization only
+    return patient
+
+@benchmark("schema.patient_detail")
+def bench_patient_detail(ctx: Context):
+    from app.schemas.patient import Patient
+
+    patient = _patient_detail(ctx)
+    return lambda: Patient.model_validate(patient).model_dump_json()
+
+@benchmark("schema.clinical_records_100")
+def bench_clinical_records(ctx: Context):
+    from typing import List as ListType
+    from pydantic import TypeAdapter
+    from app.schemas.patient import ClinicalRecordInDB
+
+    records = list(_patient_detail(ctx).clinical_records)
+    adapter = TypeAdapter(ListType[ClinicalRecordInDB])
+    return lambda: adapter.dump_json(adapter.validate_python(records, from_attributes=True))
+
+@benchmark("schema.clinical_records_100_fast_path")
+def bench_clinical_records_fast_path(ctx: Context):
+    from app.core.responses import model_list_response
+    from app.schemas.patient import ClinicalRecordInDB
+
+    records = list(_patient_detail(ctx).clinical_records)
+    return lambda: model_list_response(ClinicalRecordInDB, records)
+
+# NLP
+
+def _nlp_benchmark(minutes: int, load: Callable[[], Callable[[str], Any]]):
+    def setup(ctx: Context):
+        try:
+            extract = load()
+        except (ImportError, OSError) as e:  # spaCy or its model missing
+            raise SkipBenchmark(str(e))
+        text = transcript_of(minutes)
+        loop = asyncio.new_event_loop()
+        return lambda: loop.run_until_complete(extract(text))
+    return setup
+
+def _load_extract_medical_data():
+    from app.services.nlp_processing import extract_medical_data
+    return extract_medical_data
+
+def _load_process_medical_text():
+    from app.services.medical_nlp import medical_nlp_service
+    return medical_nlp_service.process_medical_text
+
+for _minutes in TRANSCRIPT_MINUTES:
+    benchmark(f"nlp.extract_medical_data[{_minutes}min]")(_nlp_benchmark(_minutes, _load_extract_medical_data))
+    benchmark(f"nlp.process_medical_text[{_minutes}min]")(_nlp_benchmark(_minutes, _load_process_medical_text))
+
+# Harness
+
+def calibrate(fn: Callable[[], Any], min_time: float) -> int:
+    """Calls per round so that a round takes at least `min_time` seconds."""
+    number = 1
+    while True:
+        for multiplier in (1, 2, 5):
+            calls = number * multiplier
+            start = time.perf_counter()
+            for _ in range(calls):
+                fn()
+            if time.perf_counter() - start >= min_time:
+                return calls
+        number *= 10
+
+def measure(fn: Callable[[], Any], rounds: int, min_time: float) -> Dict[str, Any]:
+    fn()  # Warm up caches (schema plans, statement cache, lazy imports)
+    number = calibrate(fn, min_time)
+    per_call = []
+    for _ in range(rounds):
+        start = time.perf_counter()
+        for _ in range(number):
+            fn()
+        per_call.append((time.perf_counter() - start) / number)
+    return {
+        "median_s": statistics.median(per_call),
+        "min_s": min(per_call),
+        "mean_s": statistics.mean(per_call),
+        "stdev_s": statistics.stdev(per_call) if len(per_call) > 1 else 0.0,
+        "rounds": rounds,
+        "calls_per_round": number,
+    }
+
+def git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=ROOT,
+            capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def format_time(seconds: float) -> str:
+    for unit, scale in (("s", 1), ("ms", 1e-3), ("us", 1e-6)):
+        if seconds >= scale:
+            return f"{seconds / scale:8.2f} {unit}"
+    return f"{seconds / 1e-9:8.0f} ns"
+
+def run(args) -> Dict[str, Any]:
+    ctx = Context(args.database_url, args.patients, args.synthetic_domain)
+    results, skipped, failed = {}, {}, {}
+    for name, setup in BENCHMARKS.items():
+        if args.filter and not any(fnmatch.fnmatch(name, pattern) for pattern in args.filter):
+            continue
+        try:
+            fn = setup(ctx)
+        except SkipBenchmark as e:
+            skipped[name] = str(e)
+            print(f"{name:45} skipped: {e}")
+            continue
+        try:
+            result = results[name] = measure(fn, args.rounds, args.min_time)
+        except Exception as e:
+            failed[name] = f"{type(e).__name__}: {e}"
+            print(f"{name:45} failed: {failed[name]}")
+            continue
+        print(
+            f"{name:45} median {format_time(result['median_s'])}  "
+            f"min {format_time(result['min_s'])}  "
+            f"stdev {result['stdev_s'] / result['median_s'] * 100:5.1f}%"
+        )
+    return {
+        "meta": {
+            "commit": git_commit(),
+            "created_at": datetime.utcnow().isoformat(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "machine": platform.machine(),
+            "cpu_count": os.cpu_count(),
+            "database": ctx.database_url.split("://")[0],
+        },
+        "results": results,
+        "skipped": skipped,
+        "failed": failed,
+    }
+
+def compare(baseline: Dict[str, Any], current: Dict[str, Any], threshold: float) -> bool:
+    """Print each benchmark's change in median; True if any slowed down past `threshold` %."""
+    for key in ("python", "machine", "cpu_count", "database"):
+        if baseline["meta"].get(key) != current["meta"].get(key):
+            print(f"warning: {key} differs ({baseline['meta'].get(key)} vs {current['meta'].get(key)})")
+    print(f"baseline {baseline['meta']['commit']} -> current {current['meta']['commit']}")
+    regressed = False
+    for name, result in current["results"].items():
+        old = baseline["results"].get(name)
+        if old is None:
+            print(f"{name:45} {format_time(result['median_s'])}  (new)")
+            continue
+        change = (result["median_s"] - old["median_s"]) / old["median_s"] * 100
+        flag = ""
+        if change > threshold:
+            regressed = True
+            flag = "  REGRESSION"
+        elif change < -threshold:
+            flag = "  faster"
+        print(
+            f"{name:45} {format_time(old['median_s'])} -> {format_time(result['median_s'])}  "
+            f"{change:+6.1f}%{flag}"
+        )
+    for name in baseline["results"]:
+        if name not in current["results"]:
+            print(f"{name:45} missing from current run")
+    return regressed
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = subparsers.add_parser("run", help="run the benchmarks")
+    run_parser.add_argument(
+        "--filter", action="append",
+        help="glob on benchmark names, e.g. 'nlp.*'; repeat for several"
+    )
+    run_parser.add_argument("--rounds", type=int, default=7)
+    run_parser.add_argument("--min-time", type=float, default=0.1, help="seconds per round")
+    run_parser.add_argument("--database-url", default="sqlite://")
+    run_parser.add_argument("--patients", type=int, default=1000, help="patients of the benchmark consultant")
+    run_parser.add_argument(
+        "--synthetic-domain", metavar="DOMAIN",
+        help="use a population from app.db.synthetic_data (doctors @DOMAIN) instead of seeding"
+    )
+    run_parser.add_argument("--save", help="write the results as JSON")
+
+    compare_parser = subparsers.add_parser("compare", help="compare two result files")
+    compare_parser.add_argument("baseline")
+    compare_parser.add_argument("current")
+    compare_parser.add_argument("--threshold", type=float, default=10.0, help="regression threshold in percent")
+
+    subparsers.add_parser("list", help="list the benchmarks")
+    args = parser.parse_args()
+
+    if args.command == "list":
+        print("\n".join(BENCHMARKS))
+    elif args.command == "run":
+        report = run(args)
+        if args.save:
+            Path(args.save).parent.mkdir(parents=True, exist_ok=True)
+            Path(args.save).write_text(json.dumps(report, indent=2))
+        if report["failed"]:
+            sys.exit(1)
+    else:
+        baseline = json.loads(Path(args.baseline).read_text())
+        current = json.loads(Path(args.current).read_text())
+        if compare(baseline, current, args.threshold):
+            sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+"""
+Benchmark CPU per response for large list payloads.
+
+Builds --rows transient Patient rows (with consultant and resident, shaped
+like GET /patients/my-patients) and serves them from a throwaway FastAPI
+app three ways:
+
+    response_model  FastAPI default: response_model validation + JSONResponse
+    orjson          response_model with ORJSONResponse as the response class
+    fast_path       model_list_response(), one validate + dump_json pass
+
+Each variant is requested --requests times in-process and the process CPU
+time per response is reported, so no database or server is needed:
+
+    python scripts/benchmarks/serialization.py --rows 1000 --requests 200
+
+Requires httpx (for the test client).
+"""
+import argparse
+import statistics
+import sys
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import List
+
+sys.path.append(str(Path(__file__).resolve().parents[2]))
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.core.responses import ORJSONResponse, model_list_response
+import app.models  # noqa: F401  (configure all mappers)
+from app.models.doctor import Doctor
+from app.models.patient import Patient
+from app.schemas.patient import PatientSummary
+
+def build_rows(count: int) -> List[Patient]:
+    consultant = Doctor(id=1, first_name="Bench", last_name="Consultant")
+    resident = Doctor(id=2, first_name="Bench", last_name="Resident")
+    now = datetime.utcnow()
+    rows = []
+    for n in range(count):
+        patient = Patient(
+            id=n + 1,
+            name=f"Bench Patient {n}",
+            age=18 + n % 70,
+            gender="female" if n % 2 else "male",
+            updated_at=now - timedelta(minutes=n),
+            consultant_id=1,
+            current_resident_id=2
+        )
+        patient.consultant = consultant
+        patient.current_resident = resident
+        patient.record_count = n % 40
+        patient.last_record_at = now - timedelta(days=n % 365)
+        rows.append(patient)
+    return rows
+
+def build_app(rows: List[Patient]) -> FastAPI:
+    app = FastAPI()
+
+    @app.get("/response_model", response_model=List[PatientSummary])
+    def response_model():
+        return rows
+
+    @app.get("/orjson", response_model=List[PatientSummary], response_class=ORJSONResponse)
+    def orjson_response():
+        return rows
+
+    @app.get("/fast_path", response_model=List[PatientSummary])
+    def fast_path():
+        return model_list_response(PatientSummary, rows)
+
+    return app
+
+def measure(client: TestClient, path: str, requests: int) -> dict:
+    body = client.get(path).content  # Warm up (schema/adapter caches)
+    cpu, wall = [], []
+    for _ in range(requests):
+        cpu_start, wall_start = time.process_time(), time.perf_counter()
+        response = client.get(path)
+        cpu.append((time.process_time() - cpu_start) * 1000)
+        wall.append((time.perf_counter() - wall_start) * 1000)
+        response.raise_for_status()
+    return {
+        "cpu_ms": statistics.mean(cpu),
+        "wall_p50_ms": statistics.median(wall),
+        "bytes": len(body),
+    }
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=1000)
+    parser.add_argument("--requests", type=int, default=200)
+    args = parser.parse_args()
+
+    rows = build_rows(args.rows)
+    client = TestClient(build_app(rows))
+    results = {
+        variant: measure(client, f"/{variant}", args.requests)
+        for variant in ("response_model", "orjson", "fast_path")
+    }
+
+    baseline = results["response_model"]["cpu_ms"]
+    print(f"{args.rows} rows, {args.requests} requests per variant")
+    for variant, result in results.items():
+        print(
+            f"{variant:15} cpu {result['cpu_ms']:8.2f} ms/response "
+            f"({baseline / result['cpu_ms']:4.1f}x)  wall p50 {result['wall_p50_ms']:8.2f} ms  "
+            f"{result['bytes']} bytes"
+        )
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,10 @@
+#!/bin/bash
+# Runs once on a fresh primary data directory (docker-entrypoint-initdb.d).
+# Creates the role the "replica" compose profile streams WAL with.
+set -e
+
+psql -v ON_ERROR_STOP=1 --username "$POSTGRES_USER" --dbname "$POSTGRES_DB" <<-EOSQL
+    CREATE ROLE replicator WITH REPLICATION LOGIN PASSWORD '${REPLICATION_PASSWORD:-replicator}';
+EOSQL
+
+echo "host replication replicator all md5" >> "$PGDATA/pg_hba.conf"
@@ -0,0 +1,180 @@
+"""
+Shared fixtures.
+
+The app runs against TEST_DATABASE_URL, by default a throwaway SQLite file
+created from the models. A Postgres database must already be migrated to
+head (alembic upgrade head); tests marked `postgres` only run there:
+
+    pytest
+    TEST_DATABASE_URL=postgresql://.../medicai_test pytest
+
+Every table is emptied after each test. Tests run in a scratch directory,
+which also holds uploads, archives and exports. Speech recognition uses
+the stub backend, without its simulated inference time.
+"""
+import itertools
+import os
+import tempfile
+from datetime import date, datetime
+from typing import Any, Callable, Dict, Optional
+
+# Settings are read at import time, so the environment comes first
+_scratch = tempfile.mkdtemp(prefix="medicai-tests-")
+os.environ["DATABASE_URL"] = os.environ.get("TEST_DATABASE_URL") or f"sqlite:///{_scratch}/test.db"
+os.environ["ASR_BACKEND"] = "stub"
+os.environ["ASR_STUB_REAL_TIME_FACTOR"] = "0"
+os.environ["ADMIN_EMAILS"] = '["admin@example.com"]'
+os.environ["ARCHIVE_STORAGE_DIR"] = os.path.join(_scratch, "archive")
+os.environ["EXPORT_DIR"] = os.path.join(_scratch, "exports")
+os.environ["PROFILE_DIR"] = os.path.join(_scratch, "profiles")
+os.environ.setdefault("LOG_LEVEL", "WARNING")
+# Uploads are written relative to the working directory
+os.chdir(_scratch)
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy.orm import Session
+
+from app.core.principal_cache import principal_cache
+from app.core.security import create_access_token, get_password_hash
+from app.crud import observation as crud_observation
+from app.db.base import Base
+from app.db.database import SessionLocal, engine, replica_router
+from app.main import app
+from app.models.doctor import Doctor
+from app.models.patient import ClinicalRecord, Patient
+from app.models.patient_assignment import PatientAssignment
+
+PASSWORD = "Password123"
+HASHED_PASSWORD = get_password_hash(PASSWORD)  # Once: bcrypt is slow on purpose
+
+_numbers = itertools.count(1)
+
+def pytest_collection_modifyitems(config, items):
+    if engine.dialect.name == "postgresql":
+        return
+    skip = pytest.mark.skip(reason="needs TEST_DATABASE_URL pointing at Postgres")
+    for item in items:
+        if "postgres" in item.keywords:
+            item.add_marker(skip)
+
+@pytest.fixture(scope="session", autouse=True)
+def schema():
+    if engine.dialect.name == "sqlite":
+        Base.metadata.create_all(bind=engine)
+    yield
+
+@pytest.fixture(autouse=True)
+def clean_state():
+    yield
+    with engine.begin() as conn:
+        for table in reversed(Base.metadata.sorted_tables):
+            conn.execute(table.delete())
+    principal_cache.clear()
+    replica_router.reset()
+
+@pytest.fixture
+def db() -> Session:
+    session = SessionLocal()
+    try:
+        yield session
+    finally:
+        session.close()
+
+@pytest.fixture
+def client() -> TestClient:
+    # Not entered as a context manager: startup would start the background threads
+    return TestClient(app)
+
+@pytest.fixture
+def auth_headers() -> Callable[[Doctor], Dict[str, str]]:
+    def headers(doctor: Doctor) -> Dict[str, str]:
+        return {"Authorization": f"Bearer {create_access_token(doctor.id)}"}
+    return headers
+
+@pytest.fixture
+def make_doctor(db: Session) -> Callable[..., Doctor]:
+    def make(doctor_type: str = "consultant", **fields: Any) -> Doctor:
+        n = next(_numbers)
+        values = dict(
+            email=f"{doctor_type}{n}@example.com",
+            hashed_password=HASHED_PASSWORD,
+            first_name="Test",
+            last_name=f"{doctor_type.title()}{n}",
+            medical_license_number=f"TEST-{n:06d}",
+            qualifications="MD",
+            specialty="Cardiology",
+            years_of_experience=10,
+            doctor_type=doctor_type,
+            date_of_birth=date(1980, 1, 1),
+            gender="female",
+            contact_number="+15550000000",
+            department="Cardiology",
+            join_date=date(2015, 1, 1),
+        )
+        values.update(fields)
+        doctor = Doctor(**values)
+        db.add(doctor)
+        db.commit()
+        return doctor
+    return make
+
+@pytest.fixture
+def consultant(make_doctor) -> Doctor:
+    return make_doctor("consultant")
+
+@pytest.fixture
+def resident(make_doctor, consultant: Doctor) -> Doctor:
+    return make_doctor("resident", supervisor_id=consultant.id)
+
+@pytest.fixture
+def make_patient(db: Session) -> Callable[..., Patient]:
+    def make(consultant: Doctor, resident: Optional[Doctor] = None, **fields: Any) -> Patient:
+        values = dict(
+            name=f"Patient {next(_numbers)}",
+            age=60,
+            gender="male",
+            consultant_id=consultant.id,
+            current_resident_id=resident.id if resident is not None else None,
+            risk_factors={},
+            family_history=[],
+            surgical_history=[],
+            additional_notes=[],
+        )
+        values.update(fields)
+        patient = Patient(**values)
+        db.add(patient)
+        db.flush()
+        if resident is not None:
+            db.add(PatientAssignment(patient_id=patient.id, resident_id=resident.id))
+        db.commit()
+        return patient
+    return make
+
+@pytest.fixture
+def make_record(db: Session) -> Callable[..., ClinicalRecord]:
+    def make(
+        patient: Patient,
+        created_by: Doctor,
+        transcription: str = "45 year old man with chest pain. BP 140/90, heart rate 88 bpm.",
+        extracted_data: Optional[Dict[str, Any]] = None,
+        recorded_at: Optional[datetime] = None
+    ) -> ClinicalRecord:
+        record = ClinicalRecord(
+            patient_id=patient.id,
+            created_by_id=created_by.id,
+            audio_file_path="uploads/audio/test.wav",
+            transcription=transcription,
+            extracted_data=extracted_data if extracted_data is not None else {
+                "vital_signs": {"blood_pressure": "140/90", "heart_rate": "88"}
+            },
+            is_processed=True,
+            processing_status="processed",
+            recorded_at=recorded_at or datetime.utcnow(),
+        )
+        db.add(record)
+        db.flush()
+        crud_observation.add_record_observations(db, record)
+        db.commit()
+        return record
+    return make
@@ -0,0 +1,58 @@
+import io
+import wave
+
+import pytest
+
+def _wav() -> bytes:
+    buffer = io.BytesIO()
+    with wave.open(buffer, "wb") as wav:
+        wav.setnchannels(1)
+        wav.setsampwidth(2)
+        wav.setframerate(16000)
+        wav.writeframes(b"\0" * 32000)
+    return buffer.getvalue()
+
+@pytest.fixture
+def patient(consultant, resident, make_patient):
+    return make_patient(consultant, resident)
+
+@pytest.fixture
+def outsider(make_doctor):
+    """A consultant and resident with no link to `patient`."""
+    consultant = make_doctor("consultant")
+    return {"consultant": consultant, "resident": make_doctor("resident", supervisor_id=consultant.id)}
+
+MISSING_ID = 999999
+
+@pytest.mark.parametrize("role", ["consultant", "resident"])
+def test_patient_detail_is_scoped(client, auth_headers, patient, outsider, role, consultant, resident):
+    own = {"consultant": consultant, "resident": resident}[role]
+
+    assert client.get(f"/patients/{patient.id}", headers=auth_headers(own)).status_code == 200
+    assert client.get(f"/patients/{patient.id}", headers=auth_headers(outsider[role])).status_code == 403
+    assert client.get(f"/patients/{MISSING_ID}", headers=auth_headers(own)).status_code == 404
+
+def test_record_detail_is_scoped(client, auth_headers, patient, outsider, resident, make_record):
+    record = make_record(patient, resident)
+
+    assert client.get(f"/records/{record.id}", headers=auth_headers(resident)).status_code == 200
+    assert client.get(f"/records/{record.id}", headers=auth_headers(outsider["resident"])).status_code == 403
+    assert client.get(f"/records/{MISSING_ID}", headers=auth_headers(resident)).status_code == 404
+
+def test_only_the_assigned_resident_creates_records(client, auth_headers, patient, outsider, consultant, resident):
+    def upload(doctor, patient_id):
+        return client.post(
+            f"/patients/{patient_id}/clinical-records",
+            headers=auth_headers(doctor),
+            files={"audio_file": ("visit.wav", _wav(), "audio/wav")}
+        )
+
+    # Missing patients are 404 for everyone, before the role check
+    assert upload(consultant, MISSING_ID).status_code == 404
+    assert upload(resident, MISSING_ID).status_code == 404
+    assert upload(consultant, patient.id).status_code == 403
+    assert upload(outsider["resident"], patient.id).status_code == 403
+
+    response = upload(resident, patient.id)
+    assert response.status_code == 200
+    assert response.json()["patient_id"] == patient.id
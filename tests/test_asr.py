@@ -0,0 +1,131 @@
+import asyncio
+import io
+import sys
+import time
+import types
+import wave
+from pathlib import Path
+from types import SimpleNamespace
+
+from fastapi import UploadFile
+
+from app.services import audio_processing
+from app.services.asr.quantized import QuantizedWhisperBackend
+from app.services.asr.stub import StubBackend
+from app.services.asr.whisper_backend import WhisperBackend
+
+def _wav(path, seconds: float = 1.0) -> str:
+    with wave.open(str(path), "wb") as wav:
+        wav.setnchannels(1)
+        wav.setsampwidth(2)
+        wav.setframerate(16000)
+        wav.writeframes(b"\0" * int(32000 * seconds))
+    return str(path)
+
+class FakeFasterWhisperModel:
+    """Records the options it was called with; words only when asked for."""
+    def __init__(self, model_size, device, compute_type, download_root):
+        self.compute_type = compute_type
+        self.calls = []
+
+    def transcribe(self, audio_path, **options):
+        self.calls.append(options)
+        words = [
+            SimpleNamespace(start=0.0, end=0.4, word=" Chest", probability=0.9),
+            SimpleNamespace(start=0.4, end=1.0, word=" pain.", probability=0.8),
+        ] if options.get("word_timestamps") else None
+        segments = iter([SimpleNamespace(start=0.0, end=1.0, text=" Chest pain.", words=words)])
+        return segments, SimpleNamespace(language="en", duration=1.0)
+
+def _quantized_backend(monkeypatch) -> QuantizedWhisperBackend:
+    module = types.ModuleType("faster_whisper")
+    module.WhisperModel = FakeFasterWhisperModel
+    monkeypatch.setitem(sys.modules, "faster_whisper", module)
+    return QuantizedWhisperBackend("base", compute_type="int8")
+
+def test_quantized_transcribe_skips_timestamps(monkeypatch):
+    backend = _quantized_backend(monkeypatch)
+
+    transcript = backend.transcribe("recording.wav")
+
+    assert backend.get_model().calls == [{"without_timestamps": True}]
+    assert backend.get_model().compute_type == "int8"
+    assert transcript.text == " Chest pain."
+    assert (transcript.language, transcript.duration) == ("en", 1.0)
+    assert transcript.segments[0].words == []
+
+def test_quantized_transcribe_with_timestamps_keeps_words(monkeypatch):
+    backend = _quantized_backend(monkeypatch)
+
+    result = backend.transcribe_with_timestamps("recording.wav").to_dict()
+
+    assert backend.get_model().calls == [{"word_timestamps": True}]
+    assert result["segments"] == [{
+        "start": 0.0,
+        "end": 1.0,
+        "text": " Chest pain.",
+        "words": [
+            {"word": " Chest", "start": 0.0, "end": 0.4, "probability": 0.9},
+            {"word": " pain.", "start": 0.4, "end": 1.0, "probability": 0.8},
+        ],
+    }]
+
+def test_whisper_transcribe_with_timestamps_asks_for_words(monkeypatch):
+    calls = []
+
+    class Model:
+        def transcribe(self, audio, **options):
+            calls.append(options)
+            return {"text": " Hi.", "language": "en", "segments": [{
+                "start": 0.0, "end": 0.5, "text": " Hi.",
+                "words": [{"word": " Hi.", "start": 0.0, "end": 0.5, "probability": 0.7}],
+            }]}
+
+    whisper = types.ModuleType("whisper")
+    whisper.load_audio = lambda path: [0.0] * 8000
+    whisper.audio = SimpleNamespace(SAMPLE_RATE=16000)
+    monkeypatch.setitem(sys.modules, "whisper", whisper)
+    backend = WhisperBackend("base")
+    backend._model = Model()
+
+    segment = backend.transcribe_with_timestamps("recording.wav").segments[0]
+
+    assert calls == [{"word_timestamps": True}]
+    assert [(word.word, word.start, word.end) for word in segment.words] == [(" Hi.", 0.0, 0.5)]
+
+def test_stub_words_cover_their_segment(tmp_path):
+    transcript = StubBackend(real_time_factor=0).transcribe_with_timestamps(_wav(tmp_path / "a.wav", 3))
+
+    for segment in transcript.segments:
+        assert " ".join(word.word.strip() for word in segment.words) == segment.text.strip()
+        assert segment.words[0].start == segment.start
+        assert abs(segment.words[-1].end - segment.end) < 1e-9
+
+def test_process_audio_file_keeps_the_event_loop_free(monkeypatch, tmp_path):
+    monkeypatch.chdir(tmp_path)
+    # Half a second of audio at real time: the transcription blocks for 0.5 s
+    monkeypatch.setattr(audio_processing, "get_backend", lambda: StubBackend(real_time_factor=1.0))
+    audio = Path(_wav(tmp_path / "in.wav", 0.5)).read_bytes()
+    upload = UploadFile(file=io.BytesIO(audio), filename="in.wav")
+
+    async def run():
+        ticks = 0
+        async def ticker():
+            nonlocal ticks
+            while True:
+                await asyncio.sleep(0.01)
+                ticks += 1
+        task = asyncio.ensure_future(ticker())
+        start = time.perf_counter()
+        path, text = await audio_processing.process_audio_file(upload)
+        elapsed = time.perf_counter() - start
+        task.cancel()
+        return path, text, ticks, elapsed
+
+    path, text, ticks, elapsed = asyncio.run(run())
+
+    assert text
+    assert (tmp_path / path).exists()
+    assert elapsed >= 0.5
+    # A blocked loop would not tick at all while transcribing
+    assert ticks >= 20
@@ -0,0 +1,52 @@
+from datetime import date, timedelta
+
+import pytest
+
+from app.api.endpoints import auth
+
+def _registration(email: str) -> dict:
+    return {
+        "email": email,
+        "password": "Resident123",
+        "first_name": "New",
+        "last_name": "Resident",
+        "medical_license_number": "REG-00001",
+        "qualifications": "MBBS",
+        "specialty": "Cardiology",
+        "years_of_experience": 1,
+        "doctor_type": "resident",
+        "date_of_birth": "1995-05-05",
+        "gender": "other",
+        "contact_number": "+15551234567",
+        "department": "Cardiology",
+        "join_date": date.today().isoformat(),
+        "graduation_date": (date.today() + timedelta(days=365)).isoformat(),
+    }
+
+@pytest.fixture
+def hash_calls(monkeypatch):
+    calls = []
+    original = auth.get_password_hash_async
+
+    async def counting_hash(password):
+        calls.append(password)
+        return await original(password)
+    monkeypatch.setattr(auth, "get_password_hash_async", counting_hash)
+    return calls
+
+def test_register_then_log_in(client, consultant, hash_calls):
+    response = client.post("/auth/register", json=_registration("new.resident@example.com"))
+
+    assert response.status_code == 200
+    assert response.json()["supervisor_id"] == consultant.id
+    assert hash_calls == ["Resident123"]
+    response = client.post("/auth/token", data={"username": "new.resident@example.com", "password": "Resident123"})
+    assert response.status_code == 200
+    assert response.json()["access_token"]
+
+def test_duplicate_email_is_rejected_before_hashing(client, consultant, hash_calls):
+    response = client.post("/auth/register", json=_registration(consultant.email))
+
+    assert response.status_code == 400
+    assert response.json()["detail"] == "Email already registered"
+    assert hash_calls == []
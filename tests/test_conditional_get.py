@@ -0,0 +1,85 @@
+import pytest
+
+from app.db.instrumentation import assert_max_queries
+
+@pytest.fixture
+def patient(consultant, resident, make_patient, make_record):
+    patient = make_patient(consultant, resident)
+    make_record(patient, resident)
+    return patient
+
+@pytest.fixture(params=["", "/clinical-records"])
+def url(request, patient):
+    return f"/patients/{patient.id}{request.param}"
+
+def _get(client, headers, url, **conditions):
+    return client.get(url, headers={**headers, **conditions})
+
+def test_responses_carry_validators(client, auth_headers, consultant, url):
+    response = _get(client, auth_headers(consultant), url)
+
+    assert response.status_code == 200
+    assert response.headers["ETag"].startswith('W/"')
+    assert response.headers["Last-Modified"].endswith(" GMT")
+    assert response.headers["Cache-Control"] == "private, no-cache"
+
+def test_matching_etag_answers_304_from_the_metadata_query(client, auth_headers, consultant, url):
+    headers = auth_headers(consultant)
+    etag = _get(client, headers, url).headers["ETag"]
+
+    with assert_max_queries(1):  # The doctor comes from the principal cache
+        response = _get(client, headers, url, **{"If-None-Match": etag})
+
+    assert response.status_code == 304
+    assert response.content == b""
+    assert response.headers["ETag"] == etag
+    assert _get(client, headers, url, **{"If-None-Match": f'"other", {etag[2:]}'}).status_code == 304
+
+def test_if_modified_since(client, auth_headers, consultant, url):
+    headers = auth_headers(consultant)
+    first = _get(client, headers, url)
+
+    assert _get(client, headers, url, **{"If-Modified-Since": first.headers["Last-Modified"]}).status_code == 304
+    assert _get(client, headers, url, **{"If-Modified-Since": "Mon, 01 Jan 2001 00:00:00 GMT"}).status_code == 200
+    assert _get(client, headers, url, **{"If-Modified-Since": "not a date"}).status_code == 200
+    # If-None-Match takes precedence
+    assert _get(client, headers, url, **{
+        "If-None-Match": 'W/"stale"', "If-Modified-Since": first.headers["Last-Modified"]
+    }).status_code == 200
+
+@pytest.mark.parametrize("change", ["patient", "record", "author", "reassignment"])
+def test_changes_alter_the_etag(
+    client, auth_headers, consultant, resident, make_doctor, make_record, patient, url, change
+):
+    headers = auth_headers(consultant)
+    etag = _get(client, headers, url).headers["ETag"]
+
+    if change == "patient":
+        client.put(f"/patients/{patient.id}", headers=headers, json={"age": 61})
+    elif change == "record":
+        make_record(patient, resident, transcription="Follow-up visit")
+    elif change == "author":
+        client.put("/doctors/me", headers=auth_headers(resident), json={"first_name": "Renamed"})
+    else:
+        incoming = make_doctor("resident", supervisor_id=consultant.id)
+        client.post("/patients/reassign", headers=headers, json={
+            "patient_ids": [patient.id], "resident_id": incoming.id
+        })
+
+    response = _get(client, headers, url, **{"If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.headers["ETag"] != etag
+
+def test_access_is_checked_before_the_etag(
+    client, auth_headers, consultant, resident, make_doctor, patient, url
+):
+    etag = _get(client, auth_headers(consultant), url).headers["ETag"]
+    incoming = make_doctor("resident", supervisor_id=consultant.id)
+    client.post("/patients/reassign", headers=auth_headers(consultant), json={
+        "patient_ids": [patient.id], "resident_id": incoming.id
+    })
+
+    # The previous resident loses access, cached copy or not
+    assert _get(client, auth_headers(resident), url, **{"If-None-Match": "*"}).status_code == 403
+    assert _get(client, auth_headers(make_doctor("consultant")), url, **{"If-None-Match": etag}).status_code == 403
+    assert _get(client, auth_headers(consultant), "/patients/999999", **{"If-None-Match": "*"}).status_code == 404
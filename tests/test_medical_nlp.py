@@ -0,0 +1,25 @@
+import asyncio
+
+import pytest
+
+spacy = pytest.importorskip("spacy")
+if not spacy.util.is_package("en_core_web_sm"):
+    pytest.skip("needs en_core_web_sm", allow_module_level=True)
+
+from app.services.medical_nlp import MedicalNLPService
+
+def test_medical_entities_come_from_the_terms_file():
+    service = MedicalNLPService()
+
+    assert "dizziness" in service.medical_terms["medical_entities"]
+    assert "surgical_procedures" in service.medical_terms
+
+def test_process_medical_text_finds_entities():
+    service = MedicalNLPService()
+
+    result = asyncio.run(service.process_medical_text(
+        "45 year old man with chest pain and dizziness. Father had a heart attack."
+    ))
+
+    assert {"chest pain", "dizziness"} <= set(result["medical_entities"])
+    assert result["demographics"] == {"age": 45, "gender": "male"}
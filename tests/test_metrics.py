@@ -0,0 +1,37 @@
+import pytest
+from fastapi.testclient import TestClient
+
+from app.core.config import settings
+from app.main import app
+
+def _client(host: str) -> TestClient:
+    return TestClient(app, client=(host, 50000))
+
+@pytest.fixture
+def metrics_token(monkeypatch):
+    monkeypatch.setattr(settings, "METRICS_TOKEN", "scrape-secret")
+    return "scrape-secret"
+
+def test_metrics_from_loopback():
+    response = _client("127.0.0.1").get("/metrics")
+
+    assert response.status_code == 200
+    assert b"http_request_duration_seconds" in response.content
+
+def test_metrics_refused_from_other_hosts():
+    assert _client("203.0.113.7").get("/metrics").status_code == 403
+
+def test_metrics_from_allowed_network(monkeypatch):
+    monkeypatch.setattr(settings, "METRICS_ALLOWED_NETWORKS", ["10.0.0.0/8"])
+
+    assert _client("10.1.2.3").get("/metrics").status_code == 200
+    assert _client("127.0.0.1").get("/metrics").status_code == 403
+
+def test_metrics_with_token(metrics_token):
+    client = _client("203.0.113.7")
+
+    assert client.get("/metrics", headers={"Authorization": f"Bearer {metrics_token}"}).status_code == 200
+    assert client.get("/metrics", headers={"Authorization": "Bearer wrong"}).status_code == 403
+
+def test_doctor_tokens_do_not_open_metrics(auth_headers, consultant):
+    assert _client("203.0.113.7").get("/metrics", headers=auth_headers(consultant)).status_code == 403
@@ -0,0 +1,81 @@
+from datetime import datetime, timedelta
+
+import pytest
+
+from app.crud import observation as crud_observation
+from app.models.observation import Observation
+
+START = datetime(2024, 1, 1)
+END = datetime(2024, 1, 11)  # Ten days: with buckets=10, one per day
+
+@pytest.fixture
+def heart_rates(db, consultant, make_patient):
+    """Hourly heart rates over the ten days, plus rows the series must ignore."""
+    patient = make_patient(consultant)
+    values = {}
+    for hour in range(240):
+        recorded_at = START + timedelta(hours=hour)
+        values[recorded_at] = 60.0 + hour % 24
+        db.add(Observation(patient_id=patient.id, code="heart_rate", value_num=values[recorded_at],
+                           unit="bpm", recorded_at=recorded_at))
+    db.add_all([
+        Observation(patient_id=patient.id, code="heart_rate", value_num=500, unit="bpm", recorded_at=END),
+        Observation(patient_id=patient.id, code="heart_rate", value_num=500, unit="bpm",
+                    recorded_at=START - timedelta(seconds=1)),
+        Observation(patient_id=patient.id, code="temperature", value_num=37.0, recorded_at=START),
+    ])
+    db.commit()
+    return patient, values
+
+def test_series_is_bucketed_by_the_database(db, heart_rates):
+    patient, values = heart_rates
+
+    series = crud_observation.get_observation_series(db, patient.id, "heart_rate", START, END, buckets=10)
+
+    assert series["unit"] == "bpm"
+    assert len(series["points"]) == 10
+    for day, point in enumerate(series["points"]):
+        day_start = START + timedelta(days=day)
+        assert (point["start"], point["end"]) == (day_start, day_start + timedelta(days=1))
+        assert point["count"] == 24
+        assert (point["min"], point["max"]) == (60.0, 83.0)
+        assert point["avg"] == pytest.approx(71.5)
+    assert sum(point["count"] for point in series["points"]) == len(values)
+
+def test_series_returns_at_most_the_requested_points(db, heart_rates):
+    patient, _ = heart_rates
+
+    series = crud_observation.get_observation_series(db, patient.id, "heart_rate", START, END, buckets=3)
+
+    assert len(series["points"]) == 3
+    assert [point["count"] for point in series["points"]] == [80, 80, 80]
+
+def test_empty_buckets_are_left_out(db, heart_rates):
+    patient, _ = heart_rates
+
+    series = crud_observation.get_observation_series(
+        db, patient.id, "heart_rate", START, START + timedelta(days=30), buckets=30
+    )
+
+    # Ten days of hourly values, then the single reading at END
+    assert [point["count"] for point in series["points"]] == [24] * 10 + [1]
+    assert series["points"][-1]["start"] == END
+
+def test_observation_endpoint(client, auth_headers, consultant, heart_rates):
+    patient, _ = heart_rates
+    headers = auth_headers(consultant)
+
+    response = client.get(
+        f"/patients/{patient.id}/observations/heart_rate",
+        headers=headers,
+        params={"start": START.isoformat(), "end": END.isoformat(), "buckets": 5}
+    )
+    assert response.status_code == 200
+    assert [point["count"] for point in response.json()["points"]] == [48] * 5
+
+    response = client.get(
+        f"/patients/{patient.id}/observations/heart_rate",
+        headers=headers,
+        params={"start": END.isoformat(), "end": START.isoformat()}
+    )
+    assert response.status_code == 400
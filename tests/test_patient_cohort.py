@@ -0,0 +1,37 @@
+import pytest
+
+def _cohort(client, headers, **params):
+    response = client.get("/patients/cohort", headers=headers, params=params)
+    assert response.status_code == 200
+    return sorted(patient["name"] for patient in response.json())
+
+@pytest.fixture
+def population(consultant, resident, make_doctor, make_patient, make_record):
+    both = make_patient(consultant, resident, name="Both",
+                        risk_factors={"diabetes": True, "hypertension": True})
+    make_patient(consultant, resident, name="Diabetic", risk_factors={"diabetes": True, "hypertension": False})
+    make_patient(consultant, resident, name="None", risk_factors={})
+    other = make_patient(make_doctor("consultant"), name="Elsewhere",
+                         risk_factors={"diabetes": True, "hypertension": True})
+    make_record(both, resident, extracted_data={"diagnoses": ["angina", "type 2 diabetes"]})
+    make_record(both, resident, extracted_data={"diagnoses": ["gout"]})
+    make_record(other, resident, extracted_data={"diagnoses": ["angina"]})
+
+def test_cohort_requires_every_risk_factor(client, auth_headers, consultant, population):
+    headers = auth_headers(consultant)
+
+    assert _cohort(client, headers, risk_factor="diabetes") == ["Both", "Diabetic"]
+    assert _cohort(client, headers, risk_factor=["diabetes", "hypertension"]) == ["Both"]
+    assert _cohort(client, headers, risk_factor="smoker") == []
+
+def test_cohort_filters_on_recorded_diagnoses(client, auth_headers, consultant, resident, population):
+    assert _cohort(client, auth_headers(consultant), diagnosis="angina") == ["Both"]
+    # Diagnoses may come from different records; partial names don't match
+    assert _cohort(client, auth_headers(resident), diagnosis=["angina", "gout"]) == ["Both"]
+    assert _cohort(client, auth_headers(consultant), diagnosis="diabetes") == []
+    assert _cohort(client, auth_headers(consultant), risk_factor="diabetes", diagnosis="gout") == ["Both"]
+
+def test_cohort_requires_a_filter(client, auth_headers, consultant):
+    response = client.get("/patients/cohort", headers=auth_headers(consultant))
+
+    assert response.status_code == 400
@@ -0,0 +1,65 @@
+import json
+
+from app.db.database import replica_router
+from app.models.patient import Patient
+
+def _ndjson(rows):
+    return "".join(json.dumps(row) + "\n" for row in rows).encode()
+
+def _import(client, headers, content: bytes, filename: str):
+    return client.post("/patients/import", headers=headers, files={"file": (filename, content)})
+
+def test_import_csv_validates_rows_independently(client, auth_headers, db, consultant, resident):
+    content = (
+        "name,age,gender,current_resident_id,risk_factors\n"
+        f'Alice,54,female,{resident.id},"{{""diabetes"": true}}"\n'
+        "Bob,not-a-number,male,,\n"
+        'Carol,61,female,,"{broken"\n'
+        "Dan,47,male,,\n"
+    ).encode()
+
+    response = _import(client, auth_headers(consultant), content, "patients.csv")
+
+    assert response.status_code == 200
+    report = response.json()
+    assert (report["format"], report["total_rows"], report["imported"], report["failed"]) == ("csv", 4, 2, 2)
+    assert [error["row"] for error in report["errors"]] == [3, 4]
+    imported = {patient.name: patient for patient in db.query(Patient).all()}
+    assert set(imported) == {"Alice", "Dan"}
+    assert imported["Alice"].risk_factors == {"diabetes": True}
+    assert imported["Alice"].current_resident_id == resident.id
+    assert imported["Dan"].consultant_id == consultant.id
+
+def test_import_checks_doctor_references_and_types(client, auth_headers, db, consultant, resident, make_doctor):
+    other_consultant = make_doctor("consultant")
+    rows = [
+        {"name": "Valid", "age": 40, "gender": "male", "current_resident_id": resident.id},
+        {"name": "Ghost", "age": 40, "gender": "male", "consultant_id": 999999},
+        {"name": "Swapped", "age": 40, "gender": "male", "consultant_id": resident.id,
+         "current_resident_id": other_consultant.id},
+    ]
+
+    response = _import(client, auth_headers(consultant), _ndjson(rows), "patients.ndjson")
+
+    report = response.json()
+    assert (report["imported"], report["failed"]) == (1, 2)
+    errors = {error["row"]: error["errors"] for error in report["errors"]}
+    assert errors[2] == [{"loc": ["consultant_id"], "msg": "Doctor not found"}]
+    assert errors[3] == [
+        {"loc": ["consultant_id"], "msg": "Doctor is not a consultant"},
+        {"loc": ["current_resident_id"], "msg": "Doctor is not a resident"},
+    ]
+    assert [patient.name for patient in db.query(Patient).all()] == ["Valid"]
+
+def test_import_marks_the_doctor_for_read_your_writes(client, auth_headers, consultant):
+    response = _import(client, auth_headers(consultant), _ndjson([
+        {"name": "Eve", "age": 33, "gender": "female"},
+    ]), "patients.ndjson")
+
+    assert response.json()["imported"] == 1
+    assert replica_router.wrote_recently(consultant.id)
+
+def test_import_is_for_consultants(client, auth_headers, resident):
+    response = _import(client, auth_headers(resident), _ndjson([]), "patients.ndjson")
+
+    assert response.status_code == 403
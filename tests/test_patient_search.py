@@ -0,0 +1,40 @@
+import pytest
+
+def _search(client, headers, q, **params):
+    response = client.get("/patients/search", headers=headers, params={"q": q, **params})
+    assert response.status_code == 200
+    return [patient["name"] for patient in response.json()]
+
+@pytest.fixture
+def patients(consultant, resident, make_patient):
+    for name in ("Anna Smith", "Hannah Jones", "Annabel Lee", "Bob Stone", "50% Discount_Test"):
+        make_patient(consultant, resident, name=name)
+
+def test_search_lists_prefix_matches_first(client, auth_headers, consultant, patients):
+    names = _search(client, auth_headers(consultant), "Ann")
+
+    assert names[:2] == ["Anna Smith", "Annabel Lee"]
+    assert "Hannah Jones" in names
+    assert "Bob Stone" not in names
+
+def test_search_is_case_insensitive_and_limited(client, auth_headers, consultant, patients):
+    assert _search(client, auth_headers(consultant), "bob") == ["Bob Stone"]
+    assert len(_search(client, auth_headers(consultant), "ann", limit=1)) == 1
+
+def test_search_escapes_like_wildcards(client, auth_headers, consultant, patients):
+    assert _search(client, auth_headers(consultant), "%") == ["50% Discount_Test"]
+    assert _search(client, auth_headers(consultant), "c_u") == []
+
+def test_search_is_scoped_to_the_doctors_patients(
+    client, auth_headers, consultant, resident, make_doctor, make_patient, patients
+):
+    other_consultant = make_doctor("consultant")
+    make_patient(other_consultant, name="Anna Other")
+
+    assert "Anna Other" not in _search(client, auth_headers(consultant), "Anna")
+    assert "Anna Other" not in _search(client, auth_headers(resident), "Anna")
+    assert _search(client, auth_headers(other_consultant), "Anna") == ["Anna Other"]
+
+@pytest.mark.postgres
+def test_search_tolerates_typos(client, auth_headers, consultant, patients):
+    assert _search(client, auth_headers(consultant), "Hanah")[:1] == ["Hannah Jones"]
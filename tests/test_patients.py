@@ -0,0 +1,56 @@
+import pytest
+
+from app.db.instrumentation import assert_max_queries
+
+# Auth, the write and the detail reload; records add no queries per record
+WRITE_QUERY_BUDGET = 8
+
+@pytest.fixture
+def patient_with_records(consultant, resident, make_patient, make_record):
+    patient = make_patient(consultant, resident)
+    for n in range(5):
+        make_record(patient, resident, transcription=f"Visit {n}: aspirin 81 mg")
+    return patient
+
+def test_create_patient_returns_the_detail(client, auth_headers, consultant):
+    with assert_max_queries(WRITE_QUERY_BUDGET):
+        response = client.post("/patients/", headers=auth_headers(consultant), json={
+            "name": "New Patient", "age": 50, "gender": "female", "consultant_id": consultant.id,
+        })
+
+    assert response.status_code == 200
+    assert response.json()["name"] == "New Patient"
+    assert response.json()["clinical_records"] == []
+
+def test_update_patient_loads_records_in_bulk(client, auth_headers, consultant, patient_with_records):
+    with assert_max_queries(WRITE_QUERY_BUDGET):
+        response = client.put(
+            f"/patients/{patient_with_records.id}",
+            headers=auth_headers(consultant),
+            json={"age": 61}
+        )
+
+    assert response.status_code == 200
+    body = response.json()
+    assert body["age"] == 61
+    assert sorted(record["transcription"] for record in body["clinical_records"]) == [
+        f"Visit {n}: aspirin 81 mg" for n in range(5)
+    ]
+
+def test_assign_patient_loads_records_in_bulk(
+    client, auth_headers, consultant, make_doctor, patient_with_records
+):
+    new_resident = make_doctor("resident", supervisor_id=consultant.id)
+
+    with assert_max_queries(WRITE_QUERY_BUDGET + 4):  # Plus the reassignment statements
+        response = client.post(
+            f"/patients/{patient_with_records.id}/assign",
+            headers=auth_headers(consultant),
+            params={"resident_id": new_resident.id}
+        )
+
+    assert response.status_code == 200
+    body = response.json()
+    assert body["current_resident"]["id"] == new_resident.id
+    assert len(body["clinical_records"]) == 5
+    assert all(record["extracted_data"] for record in body["clinical_records"])
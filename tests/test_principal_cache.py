@@ -0,0 +1,102 @@
+import time
+
+import pytest
+from sqlalchemy import text
+
+from app.core import principal_cache as principal_cache_module
+from app.core.config import settings
+from app.core.principal_cache import principal_cache
+from app.crud import doctor as crud_doctor
+from app.db.database import SessionLocal, engine
+from app.db.instrumentation import assert_max_queries
+
+def _me(client, headers):
+    response = client.get("/doctors/me", headers=headers)
+    assert response.status_code == 200
+    return response.json()
+
+def test_authenticated_doctor_is_cached(client, auth_headers, consultant):
+    headers = auth_headers(consultant)
+    _me(client, headers)
+
+    with assert_max_queries(0):
+        assert _me(client, headers)["id"] == consultant.id
+
+def test_own_update_invalidates_the_cache(client, auth_headers, consultant):
+    headers = auth_headers(consultant)
+    _me(client, headers)
+
+    response = client.put("/doctors/me", headers=headers, json={"first_name": "Renamed"})
+
+    assert response.status_code == 200
+    assert _me(client, headers)["first_name"] == "Renamed"
+
+def test_update_by_another_doctor_invalidates_the_cache(client, auth_headers, consultant, resident):
+    _me(client, auth_headers(resident))
+
+    response = client.put(f"/doctors/{resident.id}", headers=auth_headers(consultant), json={"department": "ICU"})
+
+    assert response.status_code == 200
+    assert _me(client, auth_headers(resident))["department"] == "ICU"
+
+def test_deleted_doctor_is_not_served_from_the_cache(client, auth_headers, db, make_doctor):
+    doctor = make_doctor("consultant")
+    headers = auth_headers(doctor)
+    _me(client, headers)
+
+    crud_doctor.delete_doctor(db, doctor.id)
+
+    assert client.get("/doctors/me", headers=headers).status_code == 404
+
+def test_loads_racing_an_invalidation_are_not_cached(db, consultant):
+    generation = principal_cache.generation(consultant.id)
+    principal_cache.invalidate(consultant.id)
+
+    principal_cache.put(consultant, generation)
+
+    assert principal_cache.get(consultant.id) is None
+    principal_cache.put(consultant, principal_cache.generation(consultant.id))
+    assert principal_cache.get(consultant.id)["id"] == consultant.id
+
+def test_entries_expire(monkeypatch, db, consultant):
+    monkeypatch.setattr(principal_cache, "ttl", 0.01)
+    principal_cache.put(consultant, principal_cache.generation(consultant.id))
+
+    time.sleep(0.02)
+
+    assert principal_cache.get(consultant.id) is None
+
+def test_cache_is_bounded(monkeypatch, db, make_doctor):
+    monkeypatch.setattr(principal_cache, "max_entries", 2)
+    doctors = [make_doctor("consultant") for _ in range(3)]
+
+    for doctor in doctors:
+        principal_cache.put(doctor, principal_cache.generation(doctor.id))
+
+    assert principal_cache.get(doctors[0].id) is None
+    assert [principal_cache.get(doctor.id)["id"] for doctor in doctors[1:]] == [doctor.id for doctor in doctors[1:]]
+
+@pytest.mark.postgres
+def test_invalidations_reach_other_workers(monkeypatch, db, consultant):
+    monkeypatch.setattr(settings, "PRINCIPAL_CACHE_NOTIFY", True)
+    principal_cache_module.start_invalidation_listener()
+    listening = text(
+        "SELECT count(*) FROM pg_stat_activity WHERE query = :listen AND pid <> pg_backend_pid()"
+    )
+    deadline = time.monotonic() + 5
+    with engine.connect() as conn:
+        while not conn.execute(listening, {"listen": f"LISTEN {principal_cache_module.NOTIFY_CHANNEL}"}).scalar():
+            assert time.monotonic() < deadline, "listener did not start"
+            time.sleep(0.05)
+
+    principal_cache.put(consultant, principal_cache.generation(consultant.id))
+    # As another worker would: only the notification reaches this worker's cache
+    with SessionLocal() as other_worker:
+        other_worker.execute(text("SELECT pg_notify(:channel, :payload)"), {
+            "channel": principal_cache_module.NOTIFY_CHANNEL, "payload": str(consultant.id)
+        })
+        other_worker.commit()
+
+    while principal_cache.get(consultant.id) is not None:
+        assert time.monotonic() < deadline, "invalidation was not received"
+        time.sleep(0.05)
@@ -0,0 +1,77 @@
+"""
+Every endpoint declared with @query_budget stays within its budget when
+called as a consultant with several patients and records behind it, so an
+N+1 regression fails here instead of in production.
+"""
+from types import ModuleType
+from typing import Callable, List
+
+import pytest
+
+from app.api import api
+from app.api.endpoints import doctors, patients, records
+from app.db.instrumentation import assert_max_queries, get_query_budget
+
+def budgeted_endpoints() -> List[Callable]:
+    """Every endpoint of the mounted routers (app.api.api) declared with @query_budget."""
+    found = []
+    for module in vars(api).values():
+        if not isinstance(module, ModuleType):
+            continue
+        for value in vars(module).values():
+            if callable(value) and get_query_budget(value) is not None and value not in found:
+                found.append(value)
+    return found
+
+BUDGETED = budgeted_endpoints()
+
+# Budgeted endpoint -> (path, query parameters), formatted with the population's ids
+REQUESTS = {
+    doctors.read_consultants: ("/doctors/consultants", {}),
+    doctors.read_residents: ("/doctors/residents", {}),
+    patients.read_my_patients: ("/patients/my-patients", {}),
+    patients.search_patients: ("/patients/search", {"q": "{name_prefix}"}),
+    patients.read_patient_cohort: ("/patients/cohort", {"risk_factor": "hypertension"}),
+    patients.read_patient: ("/patients/{patient_id}", {}),
+    patients.read_patient_assignments: ("/patients/{patient_id}/assignments", {}),
+    patients.read_patient_clinical_records: ("/patients/{patient_id}/clinical-records", {}),
+    patients.read_patient_observations: ("/patients/{patient_id}/observations/heart_rate", {}),
+    records.search_clinical_records: ("/records/search", {"q": "aspirin"}),
+    records.read_clinical_record: ("/records/{record_id}", {}),
+}
+
+@pytest.fixture
+def population(consultant, make_doctor, make_patient, make_record, auth_headers):
+    residents = [make_doctor("resident", supervisor_id=consultant.id) for _ in range(2)]
+    for n in range(6):
+        patient = make_patient(
+            consultant, residents[n % 2], name=f"Budget Patient {n}", risk_factors={"hypertension": True}
+        )
+        for _ in range(3):
+            record = make_record(patient, residents[n % 2], transcription="Taking aspirin 81 mg daily. BP 130/85.")
+    return {
+        "headers": auth_headers(consultant),
+        "patient_id": patient.id,
+        "record_id": record.id,
+        "name_prefix": "Bud",
+    }
+
+def test_every_budgeted_endpoint_has_a_request():
+    assert [endpoint.__name__ for endpoint in BUDGETED if endpoint not in REQUESTS] == []
+
+@pytest.mark.parametrize("endpoint", BUDGETED, ids=lambda endpoint: endpoint.__name__)
+def test_endpoint_within_query_budget(endpoint, client, population):
+    if endpoint not in REQUESTS:
+        pytest.skip("no request defined; see test_every_budgeted_endpoint_has_a_request")
+    path, params = REQUESTS[endpoint]
+    headers = population["headers"]
+    # Budgets describe steady state: the first request caches the doctor
+    client.get("/patients/my-patients", headers=headers)
+
+    with assert_max_queries(endpoint):
+        response = client.get(
+            path.format(**population),
+            params={key: value.format(**population) for key, value in params.items()},
+            headers=headers
+        )
+    assert response.status_code == 200, response.text
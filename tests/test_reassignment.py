@@ -0,0 +1,79 @@
+import pytest
+
+from app.models.patient import Patient
+from app.models.patient_assignment import PatientAssignment
+
+def _reassign(client, headers, **body):
+    return client.post("/patients/reassign", headers=headers, json=body)
+
+@pytest.fixture
+def rotation(consultant, resident, make_doctor, make_patient):
+    """Three patients with the outgoing resident, one with another resident."""
+    incoming = make_doctor("resident", supervisor_id=consultant.id)
+    other = make_doctor("resident", supervisor_id=consultant.id)
+    outgoing_patients = [make_patient(consultant, resident) for _ in range(3)]
+    other_patient = make_patient(consultant, other)
+    return incoming, outgoing_patients, other_patient
+
+def _open_assignments(db, patient_id):
+    return db.query(PatientAssignment.resident_id)\
+        .filter(PatientAssignment.patient_id == patient_id, PatientAssignment.ended_at.is_(None))\
+        .all()
+
+def test_reassign_moves_patients_and_their_assignments(client, auth_headers, db, consultant, resident, rotation):
+    incoming, outgoing_patients, _ = rotation
+    ids = [patient.id for patient in outgoing_patients]
+
+    response = _reassign(client, auth_headers(consultant), patient_ids=ids + ids[:1], resident_id=incoming.id)
+
+    assert response.status_code == 200
+    assert response.json() == {"resident_id": incoming.id, "reassigned": ids, "unchanged": []}
+    db.expire_all()
+    for patient_id in ids:
+        assert db.get(Patient, patient_id).current_resident_id == incoming.id
+        assert _open_assignments(db, patient_id) == [(incoming.id,)]
+        history = db.query(PatientAssignment).filter(PatientAssignment.patient_id == patient_id).all()
+        assert sorted((row.resident_id, row.ended_at is None) for row in history) == sorted(
+            [(resident.id, False), (incoming.id, True)]
+        )
+
+def test_reassign_leaves_current_and_other_residents_patients(
+    client, auth_headers, db, consultant, resident, rotation
+):
+    incoming, outgoing_patients, other_patient = rotation
+    already_moved = outgoing_patients[0]
+    _reassign(client, auth_headers(consultant), patient_ids=[already_moved.id], resident_id=incoming.id)
+    ids = [patient.id for patient in outgoing_patients] + [other_patient.id]
+
+    response = _reassign(
+        client, auth_headers(consultant), patient_ids=ids, resident_id=incoming.id, from_resident_id=resident.id
+    )
+
+    assert response.status_code == 200
+    assert response.json()["reassigned"] == [patient.id for patient in outgoing_patients[1:]]
+    assert response.json()["unchanged"] == [already_moved.id, other_patient.id]
+    db.expire_all()
+    assert db.get(Patient, other_patient.id).current_resident_id != incoming.id
+    assert len(_open_assignments(db, already_moved.id)) == 1
+
+def test_reassign_changes_nothing_if_any_patient_is_not_the_consultants(
+    client, auth_headers, db, consultant, resident, make_doctor, make_patient, rotation
+):
+    incoming, outgoing_patients, _ = rotation
+    foreign = make_patient(make_doctor("consultant"))
+    ids = [outgoing_patients[0].id, foreign.id, 999999]
+
+    response = _reassign(client, auth_headers(consultant), patient_ids=ids, resident_id=incoming.id)
+
+    assert response.status_code == 403
+    assert response.json()["detail"]["patient_ids"] == [foreign.id, 999999]
+    db.expire_all()
+    assert db.get(Patient, outgoing_patients[0].id).current_resident_id == resident.id
+
+def test_reassign_validates_the_caller_and_target(client, auth_headers, consultant, resident, rotation):
+    _, outgoing_patients, _ = rotation
+    ids = [patient.id for patient in outgoing_patients]
+
+    assert _reassign(client, auth_headers(resident), patient_ids=ids, resident_id=resident.id).status_code == 403
+    assert _reassign(client, auth_headers(consultant), patient_ids=ids, resident_id=consultant.id).status_code == 400
+    assert _reassign(client, auth_headers(consultant), patient_ids=[], resident_id=resident.id).status_code == 422
@@ -0,0 +1,138 @@
+import gzip
+import io
+from datetime import date, datetime
+
+import pytest
+from sqlalchemy import text
+
+from app.db.database import engine
+from app.models.clinical_record_archive import ClinicalRecordArchive, ClinicalRecordArchiveEntry
+from app.services import record_archive
+from app.services.record_archive import LocalArchiveStorage
+
+def test_chunks_are_gzip_members_readable_on_their_own():
+    rows = [{"id": n, "transcription": f"note {n}"} for n in range(1, 8)]
+    f = io.BytesIO()
+
+    chunks = list(record_archive.write_chunks(f, rows, chunk_rows=3))
+
+    assert [[row["id"] for row in chunk] for chunk, _, _ in chunks] == [[1, 2, 3], [4, 5, 6], [7]]
+    data = f.getvalue()
+    # The whole file is still one valid .gz
+    assert gzip.decompress(data).decode().count("\n") == 7
+    _, offset, length = chunks[1]
+    assert gzip.decompress(data[offset:offset + length]).decode().splitlines()[0] == '{"id": 4, "transcription": "note 4"}'
+
+def _month(months_ago: int) -> date:
+    month = date.today().replace(day=1)
+    return record_archive._add_months(month, -months_ago)
+
+def _drop_partition(name: str) -> None:
+    with engine.begin() as conn:
+        conn.execute(text(f'DROP TABLE IF EXISTS "{name}"'))
+
+@pytest.fixture
+def old_month(db):
+    """A month past the retention window, without a partition."""
+    month = _month(record_archive.settings.ARCHIVE_AFTER_MONTHS + 6)
+    _drop_partition(record_archive.partition_name(month))
+    yield month
+    db.close()
+    _drop_partition(record_archive.partition_name(month))
+
+# Partition DDL waits for every open transaction that read clinical_records:
+# tests end the session's transaction first and check through own connections
+def _count(table: str, record_id: int) -> int:
+    with engine.connect() as conn:
+        return conn.execute(text(f'SELECT count(*) FROM "{table}" WHERE id = :id'), {"id": record_id}).scalar()
+
+def _record_ids(patient_id: int):
+    with engine.connect() as conn:
+        return {row.id for row in conn.execute(
+            text("SELECT id FROM clinical_records WHERE patient_id = :p"), {"p": patient_id}
+        )}
+
+@pytest.mark.postgres
+def test_ensure_partitions_moves_rows_out_of_the_default_partition(db, consultant, make_patient, make_record, old_month):
+    patient = make_patient(consultant)
+    record_id = make_record(patient, consultant, recorded_at=datetime.combine(old_month, datetime.min.time())).id
+    db.rollback()
+    assert _count("clinical_records_default", record_id) == 1
+
+    created = record_archive.ensure_partitions(engine, months_ahead=0, since=old_month)
+
+    name = record_archive.partition_name(old_month)
+    assert name in created
+    assert _count(name, record_id) == 1
+    assert _count("clinical_records_default", record_id) == 0
+
+@pytest.mark.postgres
+def test_archive_reads_back_through_the_api(
+    db, client, auth_headers, consultant, make_patient, make_record, old_month, monkeypatch
+):
+    monkeypatch.setattr(record_archive.settings, "ARCHIVE_CHUNK_ROWS", 2)
+    patient = make_patient(consultant)
+    # Back-dated: these rows sit in the default partition
+    record_ids = [
+        make_record(patient, consultant, transcription=f"Visit {n}", recorded_at=datetime.combine(old_month, datetime.min.time())).id
+        for n in range(5)
+    ]
+    patient_id = patient.id
+    headers = auth_headers(consultant)
+    db.rollback()
+    before = record_archive._add_months(old_month, 1)
+
+    dry_run = record_archive.archive_partitions(engine, before=before, dry_run=True)
+    assert {"partition_name": record_archive.partition_name(old_month), "rows_in_default_partition": 5} in dry_run
+
+    results = record_archive.archive_partitions(engine, before=before)
+
+    assert [r["row_count"] for r in results if r["partition_name"] == record_archive.partition_name(old_month)] == [5]
+    assert _record_ids(patient_id) == set()
+    entries = db.query(ClinicalRecordArchiveEntry).order_by(ClinicalRecordArchiveEntry.record_id).all()
+    assert [entry.record_id for entry in entries] == record_ids
+    # Chunks of two records: three gzip members
+    assert len({entry.chunk_offset for entry in entries}) == 3
+
+    response = client.get(f"/records/{record_ids[3]}", headers=headers)
+    assert response.status_code == 200
+    assert response.json()["transcription"] == "Visit 3"
+
+@pytest.mark.postgres
+def test_failed_dump_leaves_the_partition_in_place(db, consultant, make_patient, make_record, old_month, monkeypatch):
+    patient = make_patient(consultant)
+    record_id = make_record(patient, consultant, recorded_at=datetime.combine(old_month, datetime.min.time())).id
+    patient_id = patient.id
+    db.rollback()
+    record_archive.ensure_partitions(engine, months_ahead=0, since=old_month)
+
+    def broken_write(self, key):
+        raise OSError("disk full")
+    monkeypatch.setattr(LocalArchiveStorage, "open_write", broken_write)
+
+    with pytest.raises(OSError):
+        record_archive.archive_partitions(engine, before=record_archive._add_months(old_month, 1))
+
+    assert _record_ids(patient_id) == {record_id}
+    assert db.query(ClinicalRecordArchive).count() == 0
+    with engine.connect() as conn:
+        partitions = {p["name"]: p for p in record_archive.list_monthly_partitions(conn)}
+    assert partitions[record_archive.partition_name(old_month)]["attached"]
+
+def test_archives_without_chunk_offsets_are_scanned(db, consultant, tmp_path):
+    storage = LocalArchiveStorage(str(tmp_path))
+    rows = [
+        {"id": n, "patient_id": 1, "created_by_id": consultant.id, "transcription": f"note {n}",
+         "recorded_at": "2020-01-15T10:00:00", "created_at": "2020-01-15T10:00:00"}
+        for n in (3, 5, 8)
+    ]
+    with storage.open_write("legacy.ndjson.gz") as f:
+        list(record_archive.write_chunks(f, rows, chunk_rows=2))
+    archive = ClinicalRecordArchive(partition_name="clinical_records_y2020m01", location="legacy.ndjson.gz")
+
+    record = record_archive._read_archived_record(db, storage, archive, 8)
+
+    assert record.transcription == "note 8"
+    assert record.recorded_at == datetime(2020, 1, 15, 10)
+    assert record.created_by.id == consultant.id
+    assert record_archive._read_archived_record(db, storage, archive, 4) is None
@@ -0,0 +1,48 @@
+import json
+
+import pytest
+
+from app.services import record_export
+
+@pytest.fixture
+def records(consultant, resident, make_doctor, make_patient, make_record):
+    patient = make_patient(consultant, resident)
+    mine = [make_record(patient, resident, extracted_data={"diagnoses": ["angina"]}) for _ in range(3)]
+    other = make_doctor("consultant")
+    make_record(make_patient(other), other)
+    return mine
+
+def test_ndjson_export_is_scoped_to_the_consultant(client, auth_headers, consultant, records):
+    response = client.get("/records/export", headers=auth_headers(consultant))
+
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/x-ndjson"
+    rows = [json.loads(line) for line in response.text.splitlines()]
+    assert [row["id"] for row in rows] == [record.id for record in records]
+    assert rows[0]["diagnoses"] == ["angina"]
+
+def test_export_is_for_consultants_and_admins(client, auth_headers, consultant, resident, make_doctor, records):
+    assert client.get("/records/export", headers=auth_headers(resident)).status_code == 403
+    assert client.get(
+        "/records/export", headers=auth_headers(consultant), params={"consultant_id": consultant.id + 1000}
+    ).status_code == 403
+
+    admin = make_doctor("consultant", email="admin@example.com")
+    response = client.get("/records/export", headers=auth_headers(admin))
+    assert len(response.text.splitlines()) == len(records) + 1
+
+@pytest.mark.skipif(record_export.pa is None, reason="needs pyarrow")
+def test_parquet_export(client, auth_headers, consultant, records):
+    response = client.get("/records/export", headers=auth_headers(consultant), params={"format": "parquet"})
+
+    assert response.status_code == 200
+    table = record_export.pq.read_table(record_export.pa.BufferReader(response.content))
+    assert table.column("id").to_pylist() == [record.id for record in records]
+    assert table.column("diagnoses").to_pylist() == [["angina"]] * len(records)
+
+def test_parquet_export_without_pyarrow(monkeypatch, client, auth_headers, consultant):
+    monkeypatch.setattr(record_export, "pa", None)
+
+    response = client.get("/records/export", headers=auth_headers(consultant), params={"format": "parquet"})
+
+    assert response.status_code == 501
@@ -0,0 +1,57 @@
+from app.crud import patient as crud_patient
+
+def _search(client, headers, q, **params):
+    response = client.get("/records/search", headers=headers, params={"q": q, **params})
+    assert response.status_code == 200
+    return response.json()
+
+def test_search_ranks_matches_and_highlights_them(
+    client, auth_headers, consultant, resident, make_patient, make_record
+):
+    patient = make_patient(consultant, resident)
+    often = make_record(patient, resident, transcription="Aspirin started. Aspirin 81 mg daily, aspirin well tolerated.")
+    once = make_record(patient, resident, transcription="Chest pain on exertion; continue aspirin and review in a week.")
+    make_record(patient, resident, transcription="Knee pain after a fall, no medication changes.")
+
+    hits = _search(client, auth_headers(consultant), "aspirin")
+
+    assert [hit["id"] for hit in hits] == [often.id, once.id]
+    assert hits[0]["rank"] > hits[1]["rank"]
+    assert hits[0]["patient_name"] == patient.name
+    assert all("<mark>" in hit["snippet"].lower() for hit in hits)
+
+def test_search_requires_every_term(client, auth_headers, consultant, resident, make_patient, make_record):
+    patient = make_patient(consultant, resident)
+    both = make_record(patient, resident, transcription="Chest pain, started aspirin.")
+    make_record(patient, resident, transcription="Chest pain, started a beta blocker.")
+
+    hits = _search(client, auth_headers(resident), "chest aspirin")
+
+    assert [hit["id"] for hit in hits] == [both.id]
+
+def test_search_is_scoped_to_the_doctors_patients(
+    client, auth_headers, consultant, resident, make_doctor, make_patient, make_record
+):
+    other_consultant = make_doctor("consultant")
+    mine = make_record(make_patient(consultant, resident), resident, transcription="Aspirin 81 mg")
+    make_record(make_patient(other_consultant), other_consultant, transcription="Aspirin 81 mg")
+
+    assert [hit["id"] for hit in _search(client, auth_headers(consultant), "aspirin")] == [mine.id]
+    assert [hit["id"] for hit in _search(client, auth_headers(resident), "aspirin")] == [mine.id]
+    assert _search(client, auth_headers(other_consultant), "metformin") == []
+
+def test_search_follows_edited_transcriptions(db, consultant, resident, make_patient, make_record):
+    record = make_record(make_patient(consultant, resident), resident, transcription="Started aspirin")
+
+    record.transcription = "Started metformin"
+    db.commit()
+
+    assert crud_patient.search_clinical_records(db, text="aspirin", doctor=consultant) == []
+    assert [hit.id for hit in crud_patient.search_clinical_records(db, text="metformin", doctor=consultant)] == [record.id]
+
+def test_search_treats_query_syntax_as_text(client, auth_headers, consultant, resident, make_patient, make_record):
+    make_record(make_patient(consultant, resident), resident, transcription="Aspirin 81 mg")
+
+    for q in ('aspirin"', "aspirin OR", "NEAR(aspirin", "-aspirin*", '""'):
+        response = client.get("/records/search", headers=auth_headers(consultant), params={"q": q})
+        assert response.status_code == 200, q
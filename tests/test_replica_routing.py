@@ -0,0 +1,98 @@
+import time
+
+import pytest
+from sqlalchemy import create_engine, event
+
+from app.db import database
+from app.db.database import SessionLocal, engine, mark_write, replica_router
+
+@pytest.fixture
+def replica(monkeypatch):
+    """A second engine on the test database standing in for a replica, checked healthy."""
+    replica_engine = create_engine(engine.url)
+    checkouts = []
+    event.listen(replica_engine, "checkout", lambda *args: checkouts.append(1))
+    monkeypatch.setattr(replica_router, "engines", [replica_engine])
+    monkeypatch.setattr(replica_router, "_check_lag", lambda index: True)
+    replica_router.refresh_health()
+    replica_engine.checkouts = checkouts
+    yield replica_engine
+    replica_engine.dispose()
+
+def test_replicas_are_unused_until_checked(replica):
+    replica_router.reset()
+    assert replica_router.get_read_engine(1) is None
+
+    replica_router.refresh_health()
+    assert replica_router.get_read_engine(1) is replica
+
+def test_stale_health_samples_fall_back_to_the_primary(monkeypatch, replica):
+    monkeypatch.setattr(replica_router, "check_interval", 0.01)
+    time.sleep(0.05)
+
+    assert replica_router.get_read_engine(1) is None
+
+def test_unhealthy_replica_is_skipped(monkeypatch, replica):
+    monkeypatch.setattr(replica_router, "_check_lag", lambda index: False)
+    replica_router.refresh_health()
+
+    assert replica_router.get_read_engine(1) is None
+
+def test_reads_follow_the_doctors_own_writes(client, auth_headers, consultant, make_patient, replica):
+    patient = make_patient(consultant)
+    headers = auth_headers(consultant)
+
+    assert client.get("/patients/my-patients", headers=headers).status_code == 200
+    assert replica.checkouts
+
+    replica.checkouts.clear()
+    assert client.put(f"/patients/{patient.id}", headers=headers, json={"age": 70}).status_code == 200
+    assert client.get("/patients/my-patients", headers=headers).json()[0]["age"] == 70
+    assert not replica.checkouts
+
+def test_commit_without_writes_is_not_sticky(db, consultant):
+    db.info["doctor_id"] = consultant.id
+    db.get(type(consultant), consultant.id)
+    db.commit()
+
+    assert not replica_router.wrote_recently(consultant.id)
+
+def test_mark_write_covers_writes_the_orm_does_not_see(db, consultant):
+    db.info["doctor_id"] = consultant.id
+    mark_write(db)
+    db.commit()
+
+    assert replica_router.wrote_recently(consultant.id)
+
+def test_rolled_back_writes_are_not_sticky(db, consultant):
+    db.info["doctor_id"] = consultant.id
+    consultant_in_db = db.get(type(consultant), consultant.id)
+    consultant_in_db.years_of_experience += 1
+    db.flush()
+    db.rollback()
+
+    assert not replica_router.wrote_recently(consultant.id)
+
+@pytest.mark.postgres
+def test_writes_are_broadcast_to_other_workers(consultant, monkeypatch, replica):
+    raw_connection = engine.raw_connection()
+    listener = raw_connection.dbapi_connection
+    listener.autocommit = True
+    try:
+        with listener.cursor() as cursor:
+            cursor.execute(f"LISTEN {database.WRITES_CHANNEL}")
+
+        session = SessionLocal()
+        session.info["doctor_id"] = consultant.id
+        session.get(type(consultant), consultant.id).years_of_experience += 1
+        session.commit()
+        session.close()
+
+        # Another worker: only knows about the write through the notification
+        replica_router.reset()
+        deadline = time.monotonic() + 5
+        while not replica_router.wrote_recently(consultant.id) and time.monotonic() < deadline:
+            replica_router._wait_for_writes(listener, 0.5)
+        assert replica_router.wrote_recently(consultant.id)
+    finally:
+        raw_connection.close()
@@ -0,0 +1,78 @@
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+from typing import Dict, List, Optional
+
+import pytest
+from pydantic import BaseModel, field_validator
+
+from app.core import responses
+from app.core.responses import model_list_response, validated_json
+from app.crud import patient as crud_patient
+from app.schemas.doctor import Doctor as DoctorSchema
+from app.schemas.patient import ClinicalRecordInDB, ClinicalRecordSearchHit, PatientSummary
+
+pytestmark = pytest.mark.skipif(responses.orjson is None, reason="needs orjson")
+
+class Tag(BaseModel):
+    label: str
+    weight: Optional[float] = None
+
+class Sample(BaseModel):
+    id: int
+    name: str
+    at: datetime
+    score: float
+    tags: List[Tag] = []
+    extra: Optional[Dict[str, object]] = None
+
+class ValidatedSample(Sample):
+    @field_validator("name")
+    @classmethod
+    def strip_name(cls, value):
+        return value.strip()
+
+def _sample_rows():
+    return [
+        SimpleNamespace(
+            id=1, name="  Zoë O'Brien ", at=datetime(2024, 3, 1, 8, 30, 0, 123456),
+            score=0.1, tags=[SimpleNamespace(label="bp", weight=1e-05)], extra={"nested": [1, 2.5, None]}
+        ),
+        SimpleNamespace(
+            id=2, name="Ana", at=datetime(2024, 3, 1, tzinfo=timezone.utc),
+            score=12345678.9, tags=[], extra=None
+        ),
+        SimpleNamespace(
+            id=3, name="Li", at=datetime(2024, 3, 1, tzinfo=timezone(timedelta(hours=2))),
+            score=-0.0, tags=[SimpleNamespace(label="hr", weight=None)], extra={}
+        ),
+    ]
+
+def test_fast_path_matches_pydantic_bytes():
+    rows = _sample_rows()
+
+    assert responses._field_plan(Sample) is not None
+    assert model_list_response(Sample, rows).body == validated_json(Sample, rows)
+
+def test_validators_take_the_pydantic_path():
+    rows = _sample_rows()
+
+    assert responses._field_plan(ValidatedSample) is None
+    assert responses._field_plan(DoctorSchema) is None  # Inherits DoctorBase's validators
+    body = model_list_response(ValidatedSample, rows).body
+    assert body == validated_json(ValidatedSample, rows)
+    assert b'"name":"Zo\xc3\xab O\'Brien"' in body
+
+def test_api_schemas_match_pydantic_bytes(db, consultant, resident, make_patient, make_record):
+    patient = make_patient(consultant, resident, risk_factors={"hypertension": True})
+    make_record(patient, resident, transcription="Chest pain, aspirin 81 mg")
+    make_record(patient, resident, extracted_data={"medications": [{"name": "metformin", "dosage": "500 mg"}]})
+
+    summaries = crud_patient.get_patient_summaries_by_consultant(db, consultant.id)
+    records = crud_patient.get_patient_clinical_records(db, patient.id)
+    hits = [SimpleNamespace(
+        id=1, patient_id=patient.id, patient_name=patient.name,
+        recorded_at=datetime(2024, 1, 2, 3, 4, 5), rank=0.0607927, snippet="<b>aspirin</b> 81 mg"
+    )]
+
+    for model, rows in ((PatientSummary, summaries), (ClinicalRecordInDB, records), (ClinicalRecordSearchHit, hits)):
+        assert model_list_response(model, rows).body == validated_json(model, rows), model.__name__